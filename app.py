@@ -1,761 +1,203 @@
 # app.py
-# Streamlit tool: Upload specsheet Excel (2 cột Key | Value) -> build tên sản phẩm theo rule
+# Streamlit tool: Upload specsheet (2 cột Key | Value: .xlsx/.csv/.tsv/.jsonl/.parquet) -> build tên sản phẩm theo rule
 # Yêu cầu: streamlit, pandas, openpyxl, xlsxwriter
+# Logic đặt tên nằm ở package product_name (import được từ script/worker, không cần Streamlit)
 import streamlit as st
 import pandas as pd
+import collections
+import contextlib
+import hashlib
 import io
-import re
+import threading
+import time
 
-st.set_page_config(page_title="Product Name", page_icon="🧩")
-
-# =========================
-# Config & Helpers
-# =========================
-RESOLUTION_MAP = {
-    "1366x768": "HD",
-    "1920x1080": "FHD",
-    "1920x1200": "WUXGA",
-    "2560x1440": "QHD",
-    "2560x1600": "WQXGA",
-    "3840x2160": "4K",
-}
-
-#Color ID -> map sang tiếng Việt IN HOA có dấu
-_ALLOWED_COLOR_MAP = {
-    "BLACK": "ĐEN",
-    "WHITE": "TRẮNG",
-    "SILVER": "BẠC",
-    "GRAY": "XÁM", "GREY": "XÁM", "GRAPHITE": "XÁM", "SPACE GRAY": "XÁM",
-}
+from product_name.core import GROUPS, _kv_map_from_specsheet, _norm_key, _to_str, kv_fingerprint, segment_sources
+from product_name.export import EXPORT_COLUMNS, RESULT_COLUMNS, write_results
+from product_name.batch import duplicate_groups, expand_sheets, expand_uploads, name_long_table, run_batch
+from product_name.cache import DEFAULT_CACHE_PATH
+from product_name.incremental import IncrementalNamer
+from product_name.limits import over_budget
+from product_name.reader import SPEC_FORMATS, iter_rows, kv_from_rows, list_sheets, spec_format
+from product_name.timing import StageTimer, enable_json_log, log_timings, summarize
+from product_name.wide import build_names_wide
 
-# từ “trang trí/marketing” để bỏ
-_COLOR_ADJ = [
-    "STAR", "STARRY", "STARLIGHT", "QUIET", "MOONLIGHT", "MATTE", "GLOSSY",
-    "DARK", "LIGHT", "MIDNIGHT", "SPACE", "OCEAN", "FOREST", "MINT", "ICE",
-    "SKY", "DEEP", "PURE", "SNOW",
-]
-
-def _group_prefix(group: str) -> str:
-    g = (group or "").upper()
-    mapping = {
-        "NB":     "MÁY TÍNH XÁCH TAY (NB) ASUS",
-        "PC":     "MÁY TÍNH ĐỂ BÀN (PC) ASUS",
-        "AIO":    "MÁY TÍNH ĐỂ BÀN (PC) ASUS AIO",
-        "SERVER": "MÁY CHỦ (SERVER) ASUS",
-        "ACCY":   "(ACCY) ASUS",
-    }
-    return mapping.get(g, "")
-
-import re
-
-def simplify_battery(text: str, group: str) -> tuple[str, list]:
-    """
-    Battery (NB):
-    - Cells: chỉ lấy từ "N-cell" (chấp nhận: 3-cell / 3 cell / 3cell / 3 cells / 3 cell(s))
-    - WHr: chấp nhận WHr/WHrs/Wh/WH...
-    """
-    errors = []
-    if not text:
-        if group == "NB":
-            errors.append("Thiếu Battery cho NB")
-            return "N/A_Battery", errors
-        return "", errors
-
-    t = _to_str(text)
-
-    # Cells: linh hoạt hơn
-    m_cell = re.search(r"\b(\d+)\s*-?\s*cell(?:s|\(s\))?\b", t, flags=re.IGNORECASE)
-    cells = m_cell.group(1) if m_cell else ""
+SPEC_TYPES = sorted({ext.lstrip(".") for ext in SPEC_FORMATS})
 
-    # WHr: linh hoạt hơn + chuẩn hoá
-    m_wh = re.search(r"\b(\d{2,4})\s*W\s*H(?:\s*R)?(?:s)?\b", t, flags=re.IGNORECASE)
-    wh = f"{int(m_wh.group(1))}WHr" if m_wh else ""
-
-    if cells and wh:
-        return f"{cells}C{wh}", errors
-    if wh:
-        return f"?C{wh}", errors
-    if cells:
-        return f"{cells}C??WHr", errors
-
-    if group == "NB":
-        errors.append("Không nhận dạng được Battery cho NB")
-        return "N/A_Battery", errors
-    return "", errors
+st.set_page_config(page_title="Product Name", page_icon="🧩")
+enable_json_log()  # thời gian từng stage -> stderr (JSON lines)
 
 
-def _extract_base_color_token(text: str) -> str:
-    """
-    Trả về token màu gốc đầu tiên (BLACK/WHITE/SILVER/GRAY/BLUE/RED/...)
-    - Bỏ tính từ marketing
-    - Tách theo / , + ; & 'and'
-    """
-    t = _to_str(text).upper()
-    if not t:
-        return ""
-
-    # gom nhiều key 'color/colour' → tách thành mảnh để giữ thứ tự
-    chunks = re.split(r"[\/,+;&]|\band\b", t)
-    for raw in chunks:
-        s = raw.strip()
-        if not s:
-            continue
-        for adj in _COLOR_ADJ:
-            s = re.sub(rf"\b{re.escape(adj)}\b", " ", s)
-        s = re.sub(r"\s+", " ", s).strip()
-
-        # ưu tiên cụm 2 từ như SPACE GRAY trước
-        for k in sorted(_ALLOWED_COLOR_MAP.keys(), key=len, reverse=True):
-            if re.search(rf"\b{re.escape(k)}\b", s):
-                return k
-
-        # nếu không rơi vào allowed, vẫn cố gắng nhận BLUE/GREEN/... để ghi N/A_<COLORID>
-        m = re.search(r"\b(BLACK|WHITE|SILVER|GRAY|GREY|GRAPHITE|BLUE|GREEN|RED|ORANGE|PURPLE|VIOLET|PINK|ROSE|GOLD|BROWN)\b", s)
-        if m:
-            return m.group(1)
-
-    return ""
-
-def simplify_color_from_kv(kv: dict) -> str:
+# =========================
+# Cache (dùng chung mọi session; Streamlit chạy lại cả script mỗi lần bấm widget)
+# =========================
+@st.cache_data(max_entries=64, show_spinner=False)
+def _parse_upload(digest: str, _data: bytes, fmt: str = "xlsx", sheet: str = None):
     """
-    - Tìm value từ mọi key chứa 'color' hoặc 'colour'
-    - Lấy màu đầu tiên
-    - Nếu thuộc 4 nhóm hợp lệ -> trả VI (ĐEN/TRẮNG/BẠC/XÁM)
-    - Nếu ra màu khác -> trả 'N/A_<COLORID>' (vd N/A_BLUE)
-    - Nếu không thấy -> trả ""
+    Parse specsheet theo sha256 của bytes upload (tham số '_data' không bị hash lại) -> (raw_df, kv, timings).
+    sheet: tên sheet của workbook nhiều sheet (None: sheet đầu).
     """
-    values = []
-    for k_norm, v in kv.items():
-        if "color" in k_norm or "colour" in k_norm:
-            if _to_str(v):
-                values.append(str(v))
-    if not values:
-        return ""
-
-    token = _extract_base_color_token(" / ".join(values))
-    if not token:
-        return ""
-
-    if token in _ALLOWED_COLOR_MAP:
-        return _ALLOWED_COLOR_MAP[token]  # ĐEN/TRẮNG/BẠC/XÁM
+    timer = StageTimer()
+    if fmt == "xlsx":
+        raw_df = pd.read_excel(io.BytesIO(_data), header=None, sheet_name=sheet if sheet is not None else 0)
+        timer.lap("read_excel")
+        kv = _kv_map_from_specsheet(raw_df)
     else:
-        return token  # ví dụ: BLUE, GREEN, RED...
+        # csv/tsv/jsonl/parquet: đọc hàng trực tiếp, DataFrame chỉ để xem nhanh
+        rows = list(iter_rows(_data, fmt))
+        timer.lap(f"read_{fmt}")
+        kv = kv_from_rows(rows)
+        raw_df = pd.DataFrame(rows)
+    timer.lap("kv_map")
+    return raw_df, kv, timer.as_ms()
 
 
-def _to_str(x):
-    if x is None or (isinstance(x, float) and pd.isna(x)):
-        return ""
-    s = str(x).strip()
-    return "" if s.lower() in ("nan", "none", "null", "-") else s
-
-def _norm_key(s: str) -> str:
-    s = _to_str(s).lower()
-    s = re.sub(r"\s+", " ", s)
-    s = s.replace("&", "and")
-    return s
-
-def _kv_map_from_specsheet(df: pd.DataFrame) -> dict:
-    """
-    Nhận DataFrame specsheet 2 cột (Key|Value), trả về dict {key_norm: value}
-    - Nếu >2 cột: dùng 2 cột đầu
-    - Nếu chỉ 1 cột dạng "Key: Value" thì cố gắng tách
-    """
-    if df.shape[1] < 2:
-        df2 = df.copy()
-        df2["__key__"] = df2.iloc[:, 0].apply(lambda x: str(x).split(":", 1)[0] if pd.notna(x) else "")
-        df2["__val__"] = df2.iloc[:, 0].apply(lambda x: str(x).split(":", 1)[1] if (pd.notna(x) and ":" in str(x)) else "")
-        key_col, val_col = "__key__", "__val__"
-    else:
-        key_col, val_col = df.columns[0], df.columns[1]
-
-    kv = {}
-    for _, row in df.iterrows():
-        k = _norm_key(row.get(key_col, ""))
-        v = _to_str(row.get(val_col, ""))
-        if k:
-            kv[k] = v
-    return kv
-
-def _get(kv: dict, *keys) -> str:
-    """Lấy value theo danh sách khóa ứng viên (đã normalize)."""
-    for k in keys:
-        v = kv.get(_norm_key(k), "")
-        if v:
-            return v
-    return ""
-
-def _normalize_resolution(res: str) -> str:
-    raw = _to_str(res)
-    if not raw:
-        return ""
-    s = raw.upper().replace(" ", "")
-    # đã là mã (FHD/WUXGA/...) -> giữ
-    if s in {v.upper() for v in RESOLUTION_MAP.values()}:
-        return s
-    # map theo số: 1920x1080 -> FHD ...
-    mapped = RESOLUTION_MAP.get(s.lower(), "")
-    return mapped if mapped else raw
-
-def simplify_cpu(text: str) -> str:
-    t = text.replace("®", "").replace("™", "").strip()
-
-    # Rule 1: Core i3/i5/i7/i9
-    m = re.search(r"(i[3579]-\d+[A-Za-z0-9]*)", t)
-    if m:
-        return m.group(1)
-
-    # Rule 2: Core Ultra
-    m0 = re.search(r"Core\s*™?\s*Ultra\s*(\d+)\s*(?:Processor\s*)?([0-9]{3}[A-Za-z0-9]*)", t, re.I)
-    if m0:
-        return f"U{m0.group(1)}-{m0.group(2)}"
-
-    # Rule 3: Core (chỉ số thế hệ, không có i, không Ultra)
-    m3 = re.search(r"Core\s+(\d+)\s*Processor\s*([0-9]{3}[A-Za-z0-9]*)", t, re.I)
-    if m3:
-        return f"Core {m3.group(1)}-{m3.group(2)}"
-
-    # Rule AMD Ryzen: "AMD Ryzen™ 7 260" -> "R7-260"
-    m_amd = re.search(
-        r"""
-        AMD\s*Ryzen\s*            # AMD Ryzen
-        (?P<tier>\d+)             # 5 / 7 / 9
-        \s*(?:Processor\s*)?      # optional 'Processor'
-        (?P<sku>\d{3})            # 260
-        """,
-        t,                        # <-- sửa từ s thành t
-        re.IGNORECASE | re.VERBOSE,
-    )
-    if m_amd:
-        return f"R{m_amd.group('tier')}-{m_amd.group('sku')}"
-    
-    # fallback: giữ nguyên
-    return t
+_NAME_CACHE_SIZE = 512
 
-def simplify_ram(text: str) -> str:
-    """
-    Chuẩn hóa RAM: <Dung lượng><DDR>*<Số thanh nếu >1>
-    - "16GB DDR5 5600MHz (2x8GB DIMM)" -> "16GD5*2"
-    - "8GB DDR4" -> "8GD4"
-    - "32GB LPDDR5X" -> "32GD5X"
-    - "16GB DDR5 SO-DIMM" -> "16GD5"
-    - "8GB DDR5 U-DIMM *2" -> "8GD5*2"
-    """
-    t = _to_str(text).upper()
 
-    # dung lượng (GB)
-    m_total = re.search(r"(\d+)\s*GB", t)
-    size = f"{m_total.group(1)}G" if m_total else ""
+@st.cache_resource(show_spinner=False)
+def _name_cache():
+    """(kv_fingerprint, group) -> (final_name, errors) dùng chung mọi session (LRU _NAME_CACHE_SIZE dòng) + lock."""
+    return collections.OrderedDict(), threading.Lock()
 
-    # loại DDR
-    ddr = ""
-    if "LPDDR5X" in t:
-        ddr = "D5X"
-    elif "DDR5" in t:
-        ddr = "D5"
-    elif "DDR4" in t:
-        ddr = "D4"
 
-    # số thanh (pattern 2x8GB, 4x…)
-    m_stick = re.search(r"(\d+)X\d+\s*GB", t)
-    qty = m_stick.group(1) if m_stick else ""
-
-    # build kết quả
-    result = size + ddr
-    if qty and qty != "1":
-        result += f"*{qty}"
-    return result if result else t
-
-#Chuẩn hóa cách đọc SSD - Storage
-from collections import OrderedDict
-
-
-def _ssd_parse_counts(text: str, assume_is_ssd: bool = False) -> OrderedDict:
-    """
-    Trả về OrderedDict { '512G': 2, '256G': 1, '1T': 1, ... } theo đúng thứ tự xuất hiện.
-    - Chỉ lấy các cụm dung lượng SSD trong 'text'.
-    - Nếu assume_is_ssd=True (ví dụ key là 'SSD'), coi toàn bộ text là SSD, không cần từ 'SSD'.
-    - Không chuyển GB<->TB; chỉ đổi đuôi: GB->G, TB->T.
-    """
-    t = _to_str(text).upper()
-    if not t:
-        return OrderedDict()
-
-    # nếu không assume và text không có 'SSD' -> bỏ
-    if not assume_is_ssd and "SSD" not in t:
-        return OrderedDict()
-
-    # tách theo + / , ; & để giữ thứ tự xuất hiện từng mảnh
-    chunks = re.split(r"[+,/;&]", t)
-
-    counts = OrderedDict()
-    def add(size_num: str, unit: str, qty: int):
-        # unit = GB|TB -> G|T
-        unit_short = "G" if unit == "GB" else "T"
-        key = f"{size_num}{unit_short}"
-        if key not in counts:
-            counts[key] = 0
-        counts[key] += qty
-
-    for raw in chunks:
-        c = raw.strip()
-        if not c:
-            continue
-        if (not assume_is_ssd) and ("SSD" not in c):
-            # với chunks từ 'Storage'… chỉ nhận mảnh có SSD
-            continue
-
-        # Pattern 1: 2x512GB | 3x1TB
-        for m in re.finditer(r"(\d+)\s*[Xx]\s*(\d+)\s*(GB|TB)", c):
-            qty = int(m.group(1))
-            size = m.group(2)
-            unit = m.group(3)
-            add(size, unit, qty)
-
-        # Pattern 2: 512GB*2 | 1TB * 3
-        for m in re.finditer(r"(\d+)\s*(GB|TB)\s*\*\s*(\d+)", c):
-            size = m.group(1)
-            unit = m.group(2)
-            qty  = int(m.group(3))
-            add(size, unit, qty)
-
-        # Pattern 3: đơn lẻ 512GB | 1TB (không có *n hay 2x…)
-        # tránh đếm trùng những cái đã match ở trên nên ta remove tạm thời rồi quét nốt phần còn lại
-        c_tmp = re.sub(r"(\d+\s*[Xx]\s*\d+\s*(GB|TB))", " ", c)
-        c_tmp = re.sub(r"(\d+\s*(GB|TB)\s*\*\s*\d+)", " ", c_tmp)
-        for m in re.finditer(r"(\d+)\s*(GB|TB)", c_tmp):
-            size = m.group(1)
-            unit = m.group(2)
-            add(size, unit, 1)
-
-    return counts
-
-def _ssd_format_output(counts: OrderedDict) -> str:
-    """
-    Biến counts -> chuỗi theo rule:
-    - Nếu chỉ 1 loại dung lượng: 512G-SSD hoặc 512G-SSD*2
-    - Nếu nhiều loại: 512G+256G*2-SSD (nối bằng '+', mỗi loại có *qty nếu >1, '-SSD' ở cuối)
+def _build_name(namer: IncrementalNamer, kv: dict, group: str, timer: StageTimer):
     """
-    if not counts:
-        return ""
-    parts = []
-    for size, qty in counts.items():
-        if qty > 1:
-            parts.append(f"{size}*{qty}")
-        else:
-            parts.append(size)
-    return "+".join(parts) + "-SSD"
-
-
-def simplify_display(panel: str, res: str, group: str) -> tuple[str, list]:
-    """
-    Chuẩn hóa Display theo rule:
-    - Panel Size: chuẩn hóa xx.x (1 chữ số thập phân).
-    - Resolution: giữ nguyên FHD/WUXGA/...; nếu chỉ số thì giữ nguyên dạng số.
-    - Ghép thành <size><res>.
-    - Nếu thiếu 1 phần -> thêm N/A.
-    - Nếu thiếu cả 2 -> bỏ qua (trừ NB/AIO thì báo lỗi).
+    Tra cache chung trước: đổi nhóm qua lại (NB -> PC -> NB) hay user khác mở cùng spec không build lại.
+    Miss -> namer của session (chỉ tính lại node có input đổi); kết quả hết budget không lưu.
     """
-    errors = []
-
-    panel_val = ""
-    res_val = ""
-
-    # --- Panel Size ---
-    if panel:
-        m = re.search(r"(\d+[.,]?\d*)", str(panel))
-        if m:
-            try:
-                panel_num = float(m.group(1).replace(",", "."))
-                panel_val = f"{panel_num:.1f}"  # 1 số thập phân
-            except:
-                panel_val = "N/A"
-        else:
-            panel_val = "N/A"
-
-    # --- Resolution ---
-    if res:
-        r = str(res).upper()
-        # lấy các từ khoá gọn
-        if any(short in r for short in ["FHD", "WUXGA", "WQXGA", "QHD", "4K"]):
-            if "FHD" in r: res_val = "FHD"
-            elif "WUXGA" in r: res_val = "WUXGA"
-            elif "WQXGA" in r: res_val = "WQXGA"
-            elif "QHD" in r: res_val = "QHD"
-            elif "4K" in r: res_val = "4K"
-        else:
-            # nếu chỉ có dạng số (1920x1080 …) thì giữ nguyên
-            m = re.search(r"\d{3,4}x\d{3,4}", r)
-            if m:
-                res_val = m.group(0)
-            else:
-                res_val = "N/A"
-
-    # --- Build result ---
-    if not panel_val and not res_val:
-        # thiếu cả 2
-        if group in {"NB", "AIO"}:
-            errors.append(f"Thiếu Display (Panel Size/Resolution) cho nhóm {group}")
-        return "", errors
-    elif panel_val and res_val:
-        return f"{panel_val}{res_val}", errors
-    elif panel_val and not res_val:
-        return f"{panel_val}N/A", errors
-    elif not panel_val and res_val:
-        return f"N/A{res_val}", errors
-
-def has_fingerprint(kv: dict) -> bool:
-    """Trả về True nếu specsheet có Finger Print/Fingerprint với value chứa 'Support'."""
-    val = _get(kv, "Finger Print", "Fingerprint")
-    return "support" in val.lower() if val else False
-
-def has_numpad(kv: dict) -> bool:
-    """Trả về True nếu specsheet có Number Pad/NumberPad với value chứa 'Support'."""
-    val = _get(kv, "Number Pad", "NumberPad")
-    return "support" in val.lower() if val else False
-
-
-def _wifi_code(wireless: str) -> str:
-    t = _to_str(wireless).upper()
-    if not t:
-        return ""
-    if "6E" in t or "WI-FI 6E" in t or "WIFI 6E" in t:
-        return "WF6E"
-    if re.search(r"\b6\b", t) or "WI-FI 6" in t or "WIFI 6" in t:
-        return "WF6"
-    if re.search(r"\b5\b", t) or "WI-FI 5" in t or "WIFI 5" in t:
-        return "WF5"
-    if "WIFI" in t or "WI-FI" in t:
-        return "WF"
-    return ""
-
-def _has_bt(wireless: str) -> bool:
-    t = _to_str(wireless).upper()
-    return "BT" in t or "BLUETOOTH" in t
-
-def _touch_code(val: str) -> str:
-    t = _to_str(val).lower()
-    return "T" if any(x in t for x in ["yes", "touch", "capacitive", "multi-touch", "multi touch"]) else ""
-
-def simplify_psu(text: str) -> str:
-    """
-    Chuẩn hóa PSU: <Watt>*<qty>
-    - "180W" -> "180W"
-    - "2x180W" -> "180W*2"
-    - "180W*3" -> "180W*3"
-    """
-    t = _to_str(text).upper()
-    if not t:
-        return ""
-
-    # pattern 2x180W
-    m = re.search(r"(\d+)[Xx]\s*(\d+)\s*W", t)
-    if m:
-        qty = m.group(1)
-        watts = m.group(2)
-        return f"{watts}W*{qty}"
-
-    # pattern 180W*3
-    m = re.search(r"(\d+)\s*W\s*\*\s*(\d+)", t)
-    if m:
-        watts = m.group(1)
-        qty = m.group(2)
-        return f"{watts}W*{qty}"
+    names, lock = _name_cache()
+    key = (kv_fingerprint(kv), group)
+    with lock:
+        hit = names.get(key)
+        if hit is not None:
+            names.move_to_end(key)
+    timer.lap("cache_lookup")
+    if hit is not None:
+        namer.recomputed = []
+        return hit[0], list(hit[1])
+    final_name, errors = namer.build(kv, group, timer=timer)
+    if not over_budget(errors):
+        with lock:
+            names[key] = (final_name, tuple(errors))
+            if len(names) > _NAME_CACHE_SIZE:
+                names.popitem(last=False)
+    return final_name, errors
 
-    # pattern đơn lẻ 180W
-    m = re.search(r"(\d+)\s*W", t)
-    if m:
-        return f"{m.group(1)}W"
 
-    return ""
+@st.cache_data(max_entries=64, show_spinner=False)
+def _sheet_names(digest: str, _data: bytes) -> list:
+    """Tên các worksheet (chỉ đọc mục lục workbook); file hỏng -> [] để pd.read_excel báo lỗi như cũ."""
+    try:
+        return list_sheets(_data)
+    except Exception:
+        return []
 
 
-def _truthy(val: str) -> bool:
-    t = _to_str(val).lower()
-    return bool(t) and t not in ("no", "không", "none", "n/a", "na", "0")
+@st.cache_data(max_entries=64, show_spinner=False)
+def _build_names_wide_cached(digest: str, group: str, file_name: str, _raw_df: pd.DataFrame):
+    """Tên cho mọi SKU của sheet wide theo (sha256 upload, group)."""
+    return build_names_wide(_raw_df, group, label=file_name)
 
 
-def _kbm_code(kb_mouse: str, included_box: str, group: str) -> str:
-    """
-    PC/AIO:  KB&M | WL_KB&M
-    NB:      M | WL_M
-    Khác:    không ghi gì
-    """
-    src = f"{_to_str(kb_mouse)} {_to_str(included_box)}".lower()
-    src = re.sub(r'["“”]', " ", src)
-    src = re.sub(r"\s+", " ", src).strip()
-    if not src:
-        return ""
-
-    is_wireless = ("wireless" in src) or ("bluetooth" in src) or bool(
-        re.search(r"(2\.4g|2\.4 ghz)", src)
-    )
-    has_kb = ("keyboard" in src) or ("kb" in src) or ("keyboard&mouse" in src) or ("combo" in src)
-    has_m  = ("mouse" in src)
+_EXPORT_MIME = {
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "csv": "text/csv",
+}
 
-    if group in {"PC", "AIO"}:
-        # chỉ xuất khi thấy dấu hiệu có bộ KB/M
-        if has_kb or has_m or "combo" in src:
-            return "WL_KB&M" if is_wireless else "KB&M"
-        return ""
 
-    if group == "NB":
-        if has_m:  # chỉ quan tâm chuột
-            return "WL_M" if is_wireless else "M"
-        return ""
+def _export_bytes(results: list, fmt: str, columns: list) -> bytes:
+    """File kết quả (ghi từng dòng, xem product_name.export); chỉ chạy khi bấm tải."""
+    if fmt == "csv":
+        buf = io.StringIO()
+        write_results(results, buf, "csv", columns)
+        return buf.getvalue().encode("utf-8-sig")  # BOM để Excel đọc đúng tiếng Việt
+    buf = io.BytesIO()
+    write_results(results, buf, "xlsx", columns)
+    return buf.getvalue()
 
-    # Server/ACCY: bỏ qua
-    return ""
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def _row_keys(digest: str, _raw_df: pd.DataFrame) -> list:
+    """key_norm của từng dòng file input (để biết dòng nào cấp value cho segment nào)."""
+    col = _raw_df.iloc[:, 0] if _raw_df.shape[1] else []
+    if _raw_df.shape[1] < 2:
+        return [_norm_key(_to_str(x).split(":", 1)[0]) for x in col]  # 1 cột dạng "Key: Value"
+    return [_norm_key(x) for x in col]
 
-def _os_code(os_text: str) -> str:
-    """
-    Chuẩn hóa hệ điều hành:
-    1. Có 'Windows 11 Home' -> W11H
-    2. Có 'Windows 11 Pro' (mà không có Home) -> W11P
-    3. Có 'Windows' nhưng không rõ Home/Pro -> WIN
-    4. Nếu trống -> NOS
-    """
-    t = _to_str(os_text).upper()
-    if not t:
-        return "NOS"
 
-    if "WINDOWS 11 HOME" in t:
-        return "W11H"
-    if "WINDOWS 11 PRO" in t:
-        return "W11P"
-    if "WINDOWS" in t:
-        return "WIN"
+PAGE_SIZE = 50
+_HIGHLIGHT = "background-color: rgba(255, 215, 0, 0.25)"
 
-    return "NOS"
 
-def _warranty_code_from_text(txt: str) -> str:
+@st.fragment
+def _paged_table(df: pd.DataFrame, key: str, highlight: dict):
     """
-    Format: ?Y-Type
-    Type:
-      - Onsite / On-site / On site / on_site / OSS  -> OSS
-      - PUR / Pick up and return                    -> PUR
+    Chỉ gửi 1 trang (PAGE_SIZE dòng) xuống trình duyệt; đổi trang chỉ chạy lại fragment này.
+    highlight: {vị trí dòng: "cpu, ram"} -> thêm cột segment + tô nền các dòng đã dùng để đặt tên.
     """
-    if not txt:
-        return "Warranty_input"
-
-    
-    t = _to_str(txt)  # giữ nguyên, dùng re.I để không phân biệt hoa/thường
-
-    # years: '3Y', '3 Y', '3y'...
-    m_year = re.search(r"(\d+)\s*Y\b", t, flags=re.I)
-    years = m_year.group(1) if m_year else "?"
-
-    is_onsite = bool(
-        re.search(r"\bon[\s\-_]*site\b", t, flags=re.I) or
-        re.search(r"\boss\b", t, flags=re.I)
-    )
-    is_pur = bool(
-        re.search(r"\bPUR\b", t, flags=re.I) or
-        re.search(r"\bpick[\s\-_]*up[\s\-_]*and[\s\-_]*return\b", t, flags=re.I)
-    )
-
-    if is_onsite:
-        return f"{years}Y-OSS"
-    if is_pur:
-        return f"{years}Y-PUR"
-    return "Warranty_input"
-
-def _warranty_code_from_kv(kv: dict) -> str:
-    # Ưu tiên 'Base Warranty', nếu không có thì lấy dòng đầu tiên có chữ 'warranty' trong key.
-    val = _get(kv, "Base Warranty")
-    if not val:
-        for k_norm, v in kv.items():
-            if "warranty" in k_norm:
-                val = v
-                break
-    return _warranty_code_from_text(val)
-
-
-# =========================
-# Core build logic
-# =========================
-def build_name_from_kv(kv: dict, group: str):
-    errors = []
-    
+    c1, c2 = st.columns([1, 2])
+    only_used = c2.checkbox("Chỉ dòng dùng để đặt tên", key=f"{key}_only")
+    positions = sorted(highlight) if only_used else range(len(df))
+    pages = max(1, -(-len(positions) // PAGE_SIZE))
+    page = c1.number_input(f"Trang (/{pages})", min_value=1, max_value=pages, value=1, key=f"{key}_page")
+    start = (min(page, pages) - 1) * PAGE_SIZE
+    rows = list(positions[start:start + PAGE_SIZE])
+
+    view = df.iloc[rows].copy()
+    view.columns = [str(c) for c in view.columns]  # cột số (header=None) -> chuỗi cho Arrow
+    view.insert(0, "segment", [highlight.get(i, "") for i in rows])
+    st.dataframe(view.style.apply(lambda r: [_HIGHLIGHT if r["segment"] else ""] * len(r), axis=1))
+    st.caption(f"Dòng {start + 1 if rows else 0}–{start + len(rows)} / {len(positions)}")
+
+
+def _stream_results(pairs, job: dict):
     """
-    Note: chưa hoàn thiện logic HDD, wireless KB&M,GPU warranty
+    Nhận dần (index, kết quả) -> job["results"] (lưu trong session_state nên bị ngắt vẫn giữ phần đã xong).
+    Cập nhật progress + tốc độ + ETA và bảng các tên mới nhất, tối đa ~3 lần/giây.
     """
-    parts = []
-
-    # 1) Model
-    smn = _get(kv, "Sales Model Name")
-    if not smn:
-        raise ValueError("Thiếu 'Sales Model Name'")
-    model = smn.split("-", 1)[0].strip() if "-" in smn else smn.strip()
-    
-    # 2) CPU (tìm key chứa 'processor' hoặc 'on board processor')
-    cpu_raw = ""
-    for k, v in kv.items():
-        if "processor" in k:            # k là key đã normalize (lowercase) của bạn
-            cpu_raw = v
-            break
-    cpu = simplify_cpu(cpu_raw) if cpu_raw else ""   # luôn tạo biến cpu, rỗng nếu không có
-    
-    # Ghép phần đầu
-    first_segment = f"{model} {cpu}".strip()
-
-    # 3) RAM
-    ram_raw = _get(kv, "Memory", "RAM", "System Memory", "Installed Memory", "DIMM Memory")
-    if ram_raw:
-        parts.append(simplify_ram(ram_raw))
-
-    # 4) SSD — dedupe nguồn + parse theo rule
-    ssd_counts = OrderedDict()
-    seen_values = set()
-
-    SSD_KEYS = {"SSD", "Solid State Drive"}
-    STO_KEYS = {"Storage", "Primary Storage", "Storage 1", "Storage 2", "Drive Capacity"}
-
-    for kname in list(SSD_KEYS) + list(STO_KEYS):
-        val = _get(kv, kname)
-        val_norm = _to_str(val)
-        if not val_norm:
-            continue
-        # ❗ tránh đếm 2 lần cùng một chuỗi (ví dụ cả ở SSD và Storage)
-        if val_norm in seen_values:
-            continue
-        seen_values.add(val_norm)
-
-        cdict = _ssd_parse_counts(val_norm, assume_is_ssd=(kname in SSD_KEYS))
-        for k, v in cdict.items():
-            ssd_counts[k] = ssd_counts.get(k, 0) + v
-
-    ssd_out = _ssd_format_output(ssd_counts)
-    if ssd_out:
-        parts.append(ssd_out)
-
-
-    # 5) HDD (nếu có)
-    hdd = _get(kv, "HDD")
-    if hdd: parts.append(f"{hdd}-HDD")
-
-    # 6) TPM (luôn có)
-    parts.append("TPM")
-
-    # 7) Display = Panel Size + Resolution (chuẩn hóa; thiếu 1 nửa -> N/A; thiếu cả 2 -> bỏ)
-    panel = _get(kv, "Panel Size")
-    res   = _get(kv, "Resolution")
-    display, errs = simplify_display(panel, res, group)
-    if display:
-        parts.append(display)
-    errors.extend(errs)
-
-    # 8) Touch — chỉ với nhóm NB/AIO, value "Touch screen"
-    if group in {"NB", "AIO"}:
-        touch_val = _get(kv, "Touch Panel")
-        if touch_val:
-            tv = str(touch_val).strip().lower()
-        # chặn các phủ định trước
-            negatives = ["non-touch", "non touch", "without touch", "no touch"]
-            is_negative = any(n in tv for n in negatives)
-        # chỉ chấp nhận đúng "touch screen" (không dính phủ định)
-            is_touch = (not is_negative) and bool(re.search(r"\btouch\s*screen\b", tv, flags=re.I))
-            if is_touch:
-                parts.append("T")
-    # PC/Server/ACCY: bỏ qua Touch
-
-    # Finger Print
-    if has_fingerprint(kv):
-        parts.append("FP")
-    
-    #  Number Pad
-    if has_numpad(kv):
-        parts.append("num-pad")
-
-    
-    # 9) CAM & MIC — auto cho AIO
-    if group == "AIO":
-        parts.append("CAM")
-        parts.append("MIC")
-
-    # 10) Power Supply — bắt buộc cho PC/Server
-    psu_raw = _get(kv, "Power Supply")
-    psu = simplify_psu(psu_raw)
-
-    if psu:
-        parts.append(psu)
-    else:
-        if group in {"PC", "Server"}:
-            parts.append("PSU_N/A")
-            errors.append(f"Thiếu Power Supply cho nhóm {group}")
-
-    # 10) Battery - bắt buộc cho NB
-    battery, berrs = simplify_battery(_get(kv, "Battery"), group)
-    if battery:
-        parts.append(battery)
-    errors.extend(berrs)
-
-
-    # 11) WF + 12) BT (từ dòng Wireless)
-    wireless = _get(kv, "Wireless", "Connectivity", "LAN/WLAN")
-    wf = _wifi_code(wireless)
-    if wf: parts.append(wf)
-    if _has_bt(wireless): parts.append("BT")
-
-    # 13) KB&M (Keyboard & Mouse hoặc Included in the box)
-    kbm = _kbm_code(
-        _get(kv, "Keyboard & Mouse", "Keyboard and Mouse"),
-        _get(kv, "Included in the box"),
-        group,
-    )
-    if kbm:
-        parts.append(kbm)
-
-    # 14) Windows (bắt buộc -> nếu trống => NOS)
-    parts.append(_os_code(_get(kv, "Operating System")))
-
-    # 15) Warranty
-    warr = _warranty_code_from_kv(kv)
-    if warr:
-        parts.append(warr)
-
-
-    # 16) Color
-
-    # Color — key nào có COLOR/COLOUR đều lấy; chỉ chấp nhận 4 màu, còn lại -> N/A_<COLORID>
-    color_token = simplify_color_from_kv(kv)
-    if color_token:
-        parts.append(color_token)
-    else:
-        parts.append("N/A_Color")
-        errors.append("Thiếu Color")
-
-
-    # 17) Sales Model (trong ngoặc) — ưu tiên "Sales Model", nếu không có thì dùng "Sales Model Name"
-    sales_model = _get(kv, "Sales Model")
-    end_token = sales_model if sales_model else smn
-    #parts.append(f"({end_token})")
-
-    
-    # ---- Build cuối: Model + CPU (first_segment) + body + Color dính Sales Model ----
-    body = "/".join(parts) if parts else ""
-    
-    if body:
-        if color_token:
-            # body không gồm Color
-            body_wo_color = "/".join(parts[:-1])
-            if body_wo_color:
-                # có nhiều phần → thêm "/" giữa body và Color
-                final_name = f"{first_segment}/" + body_wo_color + "/" + color_token + f"({end_token})"
+    total = job["total"]
+    progress = st.progress(0.0, text="⏳ Đang chạy…") if total else st.empty()
+    table = st.empty()
+    t0 = last = time.perf_counter()
+    with contextlib.closing(pairs) if hasattr(pairs, "close") else contextlib.nullcontext():
+        for i, r in pairs:
+            job["results"].append((i, r))
+            now = time.perf_counter()
+            job["seconds"] = now - t0
+            done = len(job["results"])
+            if now - last < 0.3 and done != total:
+                continue
+            last = now
+            rate = done / job["seconds"] if job["seconds"] else 0.0
+            if total:
+                eta = f" · còn ~{(total - done) / rate:.0f}s" if rate else ""
+                progress.progress(done / total, text=f"{done}/{total} · {rate:.1f} specsheet/s{eta}")
             else:
-                # chỉ có mỗi Color trong parts
-                final_name = f"{first_segment}/" + color_token + f"({end_token})"
-        else:
-            final_name = f"{first_segment}/" + body + f"({end_token})"
-    else:
-        final_name = f"{first_segment}({end_token})"
-    
-    # Prefix nhóm (NB/PC/AIO/Server/ACCY)
-    prefix = _group_prefix(group)
-    if prefix:
-        final_name = f"{prefix} {final_name}"
-    
-    return final_name, errors
+                progress.caption(f"⏳ {done} SKU · {rate:.0f} SKU/s")
+            latest = [r for _, r in job["results"][-20:]][::-1]
+            table.dataframe(pd.DataFrame(
+                [{"file": r["file"], "final_name": r["final_name"], "errors": " | ".join(r["errors"])} for r in latest]
+            ), hide_index=True)
+    job["seconds"] = time.perf_counter() - t0
+
+
+def _show_results(results: list, group: str):
+    """Bảng kết quả nhiều tên (batch / wide) + nút tải file (kèm cột segment nếu đã build chi tiết)."""
+    n_err = sum(1 for r in results if r["errors"])
+    columns = EXPORT_COLUMNS if any(r.get("segments") for r in results) else RESULT_COLUMNS
+    st.subheader("✅ Result")
+    st.caption(f"{len(results)} tên · {n_err} có cảnh báo/lỗi")
+    st.dataframe(pd.DataFrame(
+        [{**(r.get("segments") or {}), **r, "errors": " | ".join(r["errors"])} for r in results], columns=columns
+    ))
+    fmt = st.radio("Định dạng tải về", ["xlsx", "csv"], horizontal=True, key="export_fmt")
+    # data là hàm -> file chỉ được tạo khi bấm tải, không tạo lại ở mỗi lần rerun
+    st.download_button(
+        f"⬇️ Tải kết quả (.{fmt})",
+        data=lambda: _export_bytes(results, fmt, columns),
+        file_name=f"product_names_{group}.{fmt}",
+        mime=_EXPORT_MIME[fmt],
+    )
 
 
 # =========================
@@ -766,7 +208,7 @@ st.title("🧩 Product Name Builder")
 # 🔽 Chọn nhóm sản phẩm (không chọn thì không chạy)
 group = st.selectbox(
     "Chọn nhóm sản phẩm",
-    options=["NB", "PC", "AIO", "Server", "ACCY"],
+    options=GROUPS,
     index=None,  # không mặc định
     placeholder="Chọn nhóm…"
 )
@@ -780,31 +222,182 @@ if group is None:
     
     st.stop()
 
-# 📤 Upload file
-uploaded = st.file_uploader("Upload specsheet (.xlsx)", type=["xlsx"])
+# 🔀 Chế độ: 1 file, batch (nhiều file / .zip) hoặc wide (nhiều SKU trong 1 sheet)
+MODE_SINGLE, MODE_BATCH, MODE_WIDE = "Một file", "Batch (nhiều file / .zip)", "Wide (nhiều SKU / sheet)"
+mode = st.radio("Chế độ", [MODE_SINGLE, MODE_BATCH, MODE_WIDE], horizontal=True)
 
-if uploaded is None:
+if mode == MODE_WIDE:
+    # 📊 1 cột Key, mỗi cột sau là 1 SKU
+    uploaded = st.file_uploader("Upload specsheet wide (.xlsx): cột A = Key, mỗi cột tiếp theo = 1 SKU", type=["xlsx"])
     if uploaded is None:
-        st.info("🔼 Upload file Excel specsheet")
+        st.info("🔼 Upload file Excel so sánh nhiều model")
+        st.stop()
+
+    data = uploaded.getvalue()
+    digest = hashlib.sha256(data).hexdigest()
+    raw_df, _, _ = _parse_upload(digest, data)
+    results = _build_names_wide_cached(digest, group, uploaded.name, raw_df)
+    if not results:
+        st.warning("⚠️ Không tìm thấy cột SKU nào (cần ít nhất 2 cột: Key | SKU...)")
+        st.stop()
+    _show_results(results, group)
     st.stop()
 
-# ✅ Đủ điều kiện -> xử lý
-raw_df = pd.read_excel(uploaded, header=None)
-kv = _kv_map_from_specsheet(raw_df)
-
-final_name, errors = build_name_from_kv(kv, group=group) 
-
-st.subheader("✅ Result")
+if mode == MODE_BATCH:
+    # 📦 Upload nhiều specsheet hoặc file .zip chứa các specsheet
+    uploads = st.file_uploader(
+        f"Upload specsheets ({', '.join('.' + t for t in SPEC_TYPES)} hoặc .zip)",
+        type=SPEC_TYPES + ["zip"],
+        accept_multiple_files=True,
+    )
+    if not uploads:
+        st.info("🔼 Upload nhiều file specsheet hoặc 1 file .zip")
+        st.stop()
+
+    items = expand_uploads([(f.name, f.getvalue()) for f in uploads])
+    if not items:
+        st.warning("⚠️ Không tìm thấy specsheet nào trong upload")
+        st.stop()
+    long_table = st.checkbox("📚 Bảng dài nhiều sản phẩm (header: sku, key, value)", value=False)
+    by_sheet = st.checkbox("📑 Workbook nhiều sheet (mỗi sheet .xlsx là 1 SKU)", value=False,
+                           disabled=long_table) and not long_table
+    # giữ kết quả qua các lần rerun (bấm download cũng rerun lại script)
+    batch_sig = (group, long_table, by_sheet, tuple((name, len(data)) for name, data in items))
+    if by_sheet:
+        items = expand_sheets(items)  # chỉ đọc mục lục; sheet được đọc dần trong worker
+    st.caption(f"📄 {len(items)} " + ("file" if long_table else "sheet" if by_sheet else "specsheet"))
+    detail = st.checkbox("🧩 Xuất kèm cột segment (CPU, RAM, SSD, ...) — không dùng cache tên", value=False)
+    use_cache = st.checkbox("💾 Dùng cache tên (bỏ qua specsheet đã đặt tên ở lần chạy trước)", value=True,
+                            disabled=detail)
+    dedup = st.checkbox("♻️ Gộp specsheet trùng (đặt tên 1 lần, dùng chung kết quả)", value=True, disabled=long_table)
+    batch_sig += (detail, dedup)
+
+    # lần chạy trước còn "running" = script đã bị ngắt giữa chừng (bấm Huỷ / đổi widget) -> giữ phần đã xong
+    job = st.session_state.get("batch")
+    if job and job["status"] == "running":
+        job["status"] = "cancelled"
+
+    if st.button("▶️ Chạy batch"):
+        cache_path = DEFAULT_CACHE_PATH if use_cache and not detail else None
+        job = st.session_state["batch"] = {
+            "sig": batch_sig, "status": "running", "results": [], "seconds": 0.0,
+            "total": None if long_table else len(items),  # bảng dài: không biết trước số SKU
+        }
+        # bấm Huỷ -> Streamlit chạy lại script, vòng lặp bị ngắt, pool huỷ các file chưa chạy
+        st.button("⛔ Huỷ", key="batch_cancel")
+        if long_table:
+            pairs = enumerate(r for name, data in items for r in name_long_table(name, data, group, cache_path, detail))
+        else:
+            pairs = run_batch(items, group, cache_path=cache_path, detail=detail, dedup=dedup)
+        try:
+            _stream_results(pairs, job)
+        except ValueError as e:
+            # vd: bảng dài thiếu header sku,key,value
+            job["status"], job["error"] = "error", str(e)
+        else:
+            job["status"] = "done"
+        st.rerun()  # vẽ lại trang kết quả (bỏ nút Huỷ / bảng tạm)
+
+    job = st.session_state.get("batch")
+    if not job or job["sig"] != batch_sig:
+        st.stop()
+    results = [r for _, r in sorted(job["results"], key=lambda x: x[0])]
+    done = len(results)
+    rate = f" · {done / job['seconds']:.1f}/s" if job["seconds"] else ""
+    if job["status"] == "error":
+        st.error(f"❌ {job['error']}")
+    elif job["status"] == "cancelled":
+        total = f"/{job['total']}" if job["total"] else ""
+        st.warning(f"⛔ Đã dừng: {done}{total} xong trong {job['seconds']:.1f}s{rate} — tải được phần đã có")
+    else:
+        st.caption(f"⏱ {done} xong trong {job['seconds']:.1f}s{rate}")
+    if not results:
+        st.stop()
+    _show_results(results, group)
+    groups = duplicate_groups(results)
+    if groups:
+        with st.expander(f"♻️ Spec trùng: {sum(len(g) - 1 for g in groups)} file, {len(groups)} nhóm"):
+            st.dataframe(pd.DataFrame({"Đặt tên từ": [g[0] for g in groups],
+                                       "Bản trùng": [", ".join(g[1:]) for g in groups]}), hide_index=True)
+    timings = [r["timings"] for r in results if r.get("timings")]
+    if timings:
+        with st.expander("⏱ Thời gian xử lý (debug)"):
+            st.caption("ms / specsheet theo stage (cache hit thì không có các stage build)")
+            st.dataframe(pd.DataFrame.from_dict(summarize(timings), orient="index"))
+    st.stop()
 
+# 📤 Upload file
+uploaded = st.file_uploader(f"Upload specsheet ({', '.join('.' + t for t in SPEC_TYPES)})", type=SPEC_TYPES)
 
-st.code(final_name, language="text")
-if errors:
-    st.warning("⚠️ " + " | ".join(errors))
+if uploaded is None:
+    if uploaded is None:
+        st.info("🔼 Upload file specsheet")
+    st.stop()
 
-with st.expander("👀 Xem nhanh file input"):
-    st.dataframe(raw_df)
-with st.expander("🛠 Keys đã đọc (debug)"):
-    st.write(kv)
+# ✅ Đủ điều kiện -> xử lý
+data = uploaded.getvalue()
+digest = hashlib.sha256(data).hexdigest()
+fmt = spec_format(uploaded.name) or "xlsx"
+sheet = None
+if fmt == "xlsx":
+    sheets = _sheet_names(digest, data)
+    if len(sheets) > 1:
+        sheet = st.selectbox(f"📑 Workbook có {len(sheets)} sheet — chọn sheet", sheets)
+raw_df, kv, parse_ms = _parse_upload(digest, data, fmt, sheet)
+if sheet is not None:
+    digest = f"{digest}:{sheet}"  # namer / bảng sửa spec / xem nhanh riêng cho từng sheet
+
+# 🧠 1 namer / file đang mở: spec chưa có trong cache chung -> chỉ tính lại các phần bị ảnh hưởng
+if st.session_state.get("namer_digest") != digest:
+    st.session_state["namer_digest"] = digest
+    st.session_state["namer"] = IncrementalNamer()
+namer = st.session_state["namer"]
+
+result_box = st.container()  # kết quả hiện trên, bảng sửa spec ở dưới
+
+with st.expander("✏️ Sửa spec (tên cập nhật ngay)"):
+    edited = st.data_editor(
+        pd.DataFrame({"Key": list(kv), "Value": list(kv.values())}),
+        num_rows="dynamic",
+        hide_index=True,
+        key=f"spec_editor_{digest}",
+    )
+kv_edit = {}
+for k, v in zip(edited["Key"], edited["Value"]):
+    k = _norm_key(k)
+    if k:
+        kv_edit[k] = _to_str(v)
+
+timer = StageTimer()
+try:
+    final_name, errors = _build_name(namer, kv_edit, group, timer)
+except ValueError as e:
+    final_name, errors = "", [str(e)]
+timings = {**parse_ms, **timer.as_ms()}
+log_timings(timings, file=uploaded.name, group=group, recomputed=namer.recomputed)
+
+with result_box:
+    st.subheader("✅ Result")
+    st.code(final_name, language="text")
+    if errors:
+        st.warning("⚠️ " + " | ".join(errors))
+
+# bảng lớn (5k dòng) chỉ dựng khi bật, mỗi lần 1 trang; dòng nguồn của từng segment được tô nền
+key_segments = {}
+for seg, keys in segment_sources(kv_edit).items():
+    for k in keys:
+        key_segments.setdefault(k, []).append(seg)
+if st.toggle("👀 Xem nhanh file input"):
+    row_keys = _row_keys(digest, raw_df)
+    _paged_table(raw_df, f"raw_{digest}",
+                 {i: ", ".join(key_segments[k]) for i, k in enumerate(row_keys) if k in key_segments})
+if st.toggle("🛠 Keys đã đọc (debug)"):
+    _paged_table(pd.DataFrame({"Key": list(kv_edit), "Value": list(kv_edit.values())}), f"kv_{digest}",
+                 {i: ", ".join(key_segments[k]) for i, k in enumerate(kv_edit) if k in key_segments})
+with st.expander("⏱ Thời gian xử lý (debug)"):
+    st.caption(f"Tổng {sum(timings.values()):.1f} ms · đọc file chỉ tính lần đầu (rerun dùng cache) · "
+               f"tính lại: {', '.join(namer.recomputed) or 'không'}")
+    st.dataframe(pd.DataFrame({"stage": list(timings), "ms": list(timings.values())}), hide_index=True)
 
 
 
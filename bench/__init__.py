@@ -0,0 +1 @@
+# bench: benchmark các stage đặt tên (python -m bench.run)
@@ -0,0 +1,186 @@
+# bench/adversarial.py
+# Stress test input bất thường: blob vài trăm KB trong 1 ô, dãy số / khoảng trắng dài làm regex backtrack,
+# hàng nghìn key màu. Kiểm tra cap độ dài + budget của product_name.limits giữ mỗi specsheet ở mức ms.
+#
+#   python -m bench.adversarial                    # bảng ms từng ca + rule tăng siêu tuyến tính
+#   python -m bench.adversarial --max-ms 50        # exit 1 nếu ca nào > 50 ms / rule nào O(n²) / budget không cắt
+#   python -m bench.adversarial --no-limits        # tắt cap + budget: chỉ còn regex đã sửa (so sánh)
+import argparse
+import statistics
+import sys
+import time
+
+from product_name import limits
+from product_name.core import SpecIndex, build_name_from_kv
+from product_name.incremental import IncrementalNamer
+from product_name.memo import clear_memos
+from product_name.rules import RULES
+
+_BASE = [
+    ("Sales Model Name", "X1504VA-NJ1234W"),
+    ("Processor", "Intel® Core™ i5-1335U Processor 1.3 GHz (12M Cache, up to 4.6 GHz, 10 cores)"),
+    ("Memory", "16GB DDR5 5600MHz (2x8GB DIMM)"),
+    ("SSD", "512GB M.2 NVMe™ PCIe® 4.0 SSD"),
+    ("Panel Size", "15.6-inch"),
+    ("Resolution", "FHD (1920 x 1080) 16:9"),
+    ("Battery", "42WHrs, 3S1P, 3-cell Li-ion"),
+    ("Wireless", "Wi-Fi 6E(802.11ax) (Dual band) 2*2 + Bluetooth® 5.3"),
+    ("Operating System", "Windows 11 Home"),
+    ("Base Warranty", "2 years Pick up and Return"),
+    ("Color", "Quiet Blue"),
+]
+
+_LOREM = "Thiết kế mỏng nhẹ, màn hình NanoEdge, bàn phím ErgoSense, âm thanh SonicMaster. "
+
+
+def _cases(size: int) -> list:
+    """(tên ca, key, value); value thay cho key cùng tên trong _BASE hoặc thêm dòng mới."""
+    return [
+        ("ram: dãy số", "Memory", "1" * size),
+        ("ssd: dãy số", "SSD", "1" * size),
+        ("ssd: NxSIZE", "SSD", "2 X " * (size // 4)),
+        ("psu: dãy số", "Power Supply", "1" * size),
+        ("cpu: Core + khoảng trắng", "Processor", "Core" + " " * size + "x"),
+        ("cpu: Ryzen + số", "Processor", "AMD Ryzen 7" + "1" * size),
+        ("battery: số + khoảng trắng", "Battery", "1" + " " * size + "x"),
+        ("battery: thật + blob", "Battery", "3-cell 50WHrs " + _LOREM * (size // len(_LOREM))),
+        ("display: dãy số", "Panel Size", "1" * size),
+        ("resolution: 1920x lặp", "Resolution", "1920x" * (size // 5)),
+        ("wifi: dãy 6", "Wireless", "6" * size),
+        ("kbm: ngoặc kép", "Keyboard & Mouse", '"' * size),
+        ("warranty: pick up lặp", "Base Warranty", "pick up " * (size // 8)),
+        ("warranty: dãy số", "Base Warranty", "1" * size),
+        ("color: SPACE lặp", "Color", "SPACE " * (size // 6)),
+        ("marketing: key lạ", "Marketing Description", _LOREM * (size // len(_LOREM))),
+        ("key: blob", "x" * size, "1"),
+    ]
+
+
+def _rows(key: str, value: str) -> list:
+    rows = [(k, value if k == key else v) for k, v in _BASE]
+    if key not in dict(_BASE):
+        rows.append((key, value))
+    return rows
+
+
+def _build_ms(rows: list, group: str = "NB") -> tuple:
+    clear_memos()  # không để memo che thời gian của rule
+    t0 = time.perf_counter()
+    final_name, errors = build_name_from_kv(SpecIndex.from_rows(rows), group)
+    return (time.perf_counter() - t0) * 1000, final_name, errors
+
+
+def run_cases(size: int) -> list:
+    out = []
+    for name, key, value in _cases(size):
+        ms, final_name, errors = _build_ms(_rows(key, value))
+        out.append({"case": name, "ms": ms, "name_len": len(final_name), "errors": errors})
+    # hàng nghìn key màu: chỉ đọc limits.MAX_COLOR_VALUES key đầu
+    rows = _BASE + [(f"Color {i}", "SPACE GRAY / " * 40) for i in range(size // 100)]
+    ms, final_name, errors = _build_ms(rows)
+    out.append({"case": f"color: {size // 100} key", "ms": ms, "name_len": len(final_name), "errors": errors})
+    return out
+
+
+def _search_s(pattern, text: str, repeat: int = 5, max_s: float = 1.0) -> float:
+    """
+    Trung vị tối đa repeat lần finditer hết text (giây CPU của process, không phải wall clock: máy bận / ít core
+    thì lần đo dài bị scheduler chen ngang còn lần đo ngắn thì không -> tỉ lệ 4n / n bị thổi lên).
+    Đã chạy quá max_s thì dừng sớm (regex O(n²) thật: 1 lần đo đã đủ rõ).
+    """
+    times = []
+    while len(times) < repeat and sum(times) < max_s:
+        t0 = time.process_time()
+        for _m in pattern.finditer(text):
+            pass
+        times.append(time.process_time() - t0)
+    return statistics.median(times)
+
+
+def _growth(pattern, prefix: str, filler: str, n: int) -> tuple:
+    """(giây ở 4n, tỉ lệ 4n / n) của pattern trên prefix + filler lặp."""
+    small = _search_s(pattern, prefix + filler * (n // len(filler)))
+    big = _search_s(pattern, prefix + filler * (4 * n // len(filler)))
+    return big, (big / small if small else 0.0)
+
+
+_PREFIXES = ["", "1", "Core", "Core Ultra 7", "AMD Ryzen 7", "on", "pick up", "2x", "12 W", "i7-", "3 cell", "512GB"]
+_FILLERS = ["1", " ", "-", "x", "X", "1 ", "1X", ", ", "W", "on", "GB"]
+
+
+def run_rules(n: int = 2000) -> list:
+    """
+    Mọi rule (product_name.rules) x chuỗi tiền tố + ký tự lặp, đo ở n và 4n ký tự.
+    Tuyến tính -> ~4x; O(n²) -> ~16x. Ca nghi (> 8x và > 2 ms ở 4n) được đo lại ở 4n / 16n: ở mức ms nhiễu
+    dễ cho ra x14 với regex tuyến tính, ở vài chục ms thì không. Trả về các rule vẫn tăng > 8x khi đo lại.
+    """
+    slow = []
+    for (field, name), r in RULES.items():
+        worst = None
+        for prefix in _PREFIXES:
+            for filler in _FILLERS:
+                big, growth = _growth(r.pattern, prefix, filler, n)
+                if big <= 0.002 or growth <= 8 or (worst is not None and growth <= worst["growth"]):
+                    continue
+                big, growth = _growth(r.pattern, prefix, filler, 4 * n)
+                if growth > 8 and (worst is None or growth > worst["growth"]):
+                    worst = {"rule": f"{field}.{name}", "input": f"{prefix!r} + {filler!r}*n",
+                             "ms": big * 1000, "growth": growth}
+        if worst:
+            slow.append(worst)
+    return slow
+
+
+def run_budget() -> dict:
+    """Budget gần 0: node sau model phải ra như thiếu field + lỗi budget, không memo trong IncrementalNamer."""
+    saved = limits.SHEET_BUDGET_MS
+    limits.configure_limits(budget_ms=1e-6)
+    try:
+        final_name, errors = build_name_from_kv(SpecIndex.from_rows(_BASE), "NB")
+        namer = IncrementalNamer()
+        namer.build(SpecIndex.from_rows(_BASE), "NB")
+        namer.build(SpecIndex.from_rows(_BASE), "NB")
+    finally:
+        limits.configure_limits(budget_ms=saved)
+    return {"final_name": final_name, "errors": errors, "degraded": limits.over_budget(errors),
+            "recomputed": len(namer.recomputed)}
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.adversarial", description="Stress test input bất thường")
+    parser.add_argument("--size", type=int, default=200_000, help="Số ký tự của mỗi blob")
+    parser.add_argument("--max-ms", type=float, default=None, help="Ngưỡng ms đặt tên 1 specsheet")
+    parser.add_argument("--no-limits", action="store_true", help="Tắt cap độ dài + budget (chỉ đo regex)")
+    args = parser.parse_args(argv)
+
+    if args.no_limits:
+        limits.configure_limits(max_cell=sys.maxsize, max_field=sys.maxsize, budget_ms=0)
+    print(f"limits: {limits.current_limits()}")
+    failed = []
+
+    print(f"\n{'ca':<30}{'ms':>9}  lỗi cuối")
+    for r in run_cases(args.size):
+        print(f"{r['case']:<30}{r['ms']:>9.1f}  {(r['errors'] or ['-'])[-1][:70]}")
+        if args.max_ms is not None and r["ms"] > args.max_ms:
+            failed.append(r["case"])
+
+    slow = run_rules()
+    print(f"\nrule tăng siêu tuyến tính (n -> 4n): {len(slow)}")
+    for s in slow:
+        print(f"  {s['rule']:<24}{s['input']:<28}{s['ms']:>8.1f} ms  x{s['growth']:.0f}")
+    failed += [s["rule"] for s in slow]
+
+    if not args.no_limits:
+        b = run_budget()
+        print(f"\nbudget ~0 ms: {b['final_name']}\n  lỗi: {' | '.join(b['errors'])}")
+        if not b["degraded"] or b["recomputed"] < 2:
+            failed.append("budget")
+
+    if failed:
+        print(f"❌ {', '.join(failed)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# bench/formats.py
+# So sánh tốc độ đọc specsheet theo format (cùng nội dung): xlsx qua pandas, xlsx streaming, csv, tsv, jsonl, parquet
+# + bảng dài (sku, key, value) nhiều sản phẩm: SKU/s và peak bộ nhớ khi đọc dần
+#
+#   python -m bench.formats                      # 500 specsheet, bảng dài 20k SKU
+#   python -m bench.formats --sheets 200 --long 100000
+import argparse
+import importlib.util
+import io
+import sys
+import time
+import tracemalloc
+
+from bench.synth import synth_bytes, synth_corpus, synth_long
+
+_FORMATS = ["xlsx", "csv", "tsv", "jsonl", "parquet"]
+
+
+def _has_pyarrow() -> bool:
+    # chỉ tìm, không nạp: pyarrow nạp mất vài trăm ms và làm lệch peak bộ nhớ của các format khác
+    return importlib.util.find_spec("pyarrow") is not None
+
+
+def bench_sheets(n: int, seed: int = 0) -> list:
+    """µs / specsheet cho mỗi cách đọc, kèm hệ số nhanh hơn so với pd.read_excel + _kv_map_from_specsheet."""
+    import pandas as pd
+
+    from product_name.core import _kv_map_from_specsheet
+    from product_name.reader import read_specsheet_kv
+
+    corpus = synth_corpus(n, seed=seed)
+    formats = [f for f in _FORMATS if f != "parquet" or _has_pyarrow()]
+    data = {f: [synth_bytes(rows, f) for _, rows in corpus] for f in formats}
+
+    readers = {"pandas_xlsx": ("xlsx", lambda b: _kv_map_from_specsheet(pd.read_excel(io.BytesIO(b), header=None)))}
+    for f in formats:
+        readers[f"stream_{f}"] = (f, lambda b, f=f: read_specsheet_kv(b, f))
+
+    # cùng kv cho mọi format (trừ khác biệt kiểu số của xlsx, không có trong corpus giả lập)
+    ref = [readers["pandas_xlsx"][1](b) for b in data["xlsx"][:20]]
+    for name, (f, fn) in readers.items():
+        if [fn(b) for b in data[f][:20]] != ref:
+            print(f"⚠️ {name}: kv khác pandas_xlsx", file=sys.stderr)
+
+    out = []
+    for name, (f, fn) in readers.items():
+        t0 = time.perf_counter()
+        for b in data[f]:
+            fn(b)
+        secs = time.perf_counter() - t0
+        out.append({"reader": name, "sheets": n, "us_per_sheet": secs / n * 1e6})
+    base = out[0]["us_per_sheet"]
+    for r in out:
+        r["speedup"] = base / r["us_per_sheet"]
+    return out
+
+
+def bench_long(n: int, seed: int = 0) -> list:
+    """Bảng dài n SKU: SKU/s và peak KiB (tracemalloc) khi đọc dần bằng iter_long_table."""
+    from product_name.reader import iter_long_table
+
+    corpus = synth_corpus(n, seed=seed)
+    out = []
+    for f in ["csv", "tsv", "jsonl", "parquet"] + (["xlsx"] if n <= 5000 else []):
+        if f == "parquet" and not _has_pyarrow():
+            continue
+        if f == "xlsx":
+            from openpyxl import Workbook
+
+            wb = Workbook(write_only=True)
+            ws = wb.create_sheet("Long")
+            ws.append(["sku", "key", "value"])
+            for i, (_, rows) in enumerate(corpus, start=1):
+                for k, v in rows:
+                    ws.append([f"SKU{i:05d}", k, v])
+            buf = io.BytesIO()
+            wb.save(buf)
+            blob = buf.getvalue()
+        else:
+            blob = synth_long(corpus, f)
+
+        t0 = time.perf_counter()
+        count = sum(1 for _ in iter_long_table(blob, f))
+        secs = time.perf_counter() - t0
+        # đo bộ nhớ ở lượt riêng (tracemalloc làm chậm ~5x)
+        tracemalloc.start()
+        for _ in iter_long_table(blob, f):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        out.append({"format": f, "skus": count, "file_kib": len(blob) / 1024,
+                    "skus_per_sec": count / secs, "peak_kib": peak / 1024})
+    return out
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.formats", description="Benchmark format đầu vào")
+    parser.add_argument("--sheets", type=int, default=500, help="Số specsheet 2 cột mỗi format")
+    parser.add_argument("--long", type=int, default=20000, help="Số SKU trong bảng dài (0 = bỏ qua)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    print(f"{'reader':<16}{'sheets':>8}{'µs/sheet':>12}{'speedup':>9}")
+    for r in bench_sheets(args.sheets, args.seed):
+        print(f"{r['reader']:<16}{r['sheets']:>8}{r['us_per_sheet']:>12.1f}{r['speedup']:>8.1f}x", flush=True)
+
+    if args.long:
+        print(f"\n{'long table':<16}{'SKU':>8}{'file KiB':>10}{'SKU/s':>10}{'peak KiB':>10}")
+        for r in bench_long(args.long, args.seed):
+            print(f"{r['format']:<16}{r['skus']:>8}{r['file_kib']:>10.0f}{r['skus_per_sec']:>10.0f}"
+                  f"{r['peak_kib']:>10.0f}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
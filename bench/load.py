@@ -0,0 +1,98 @@
+# bench/load.py
+# Load test HTTP service (product-name serve) trên localhost, chỉ dùng asyncio
+#
+#   product-name serve --port 8080 &
+#   python -m bench.load --port 8080 --mode name  --requests 20000 --concurrency 64
+#   python -m bench.load --port 8080 --mode batch --requests 200 --batch 500
+#
+# In req/s, tên/s và latency p50/p95/p99; đếm riêng số 503 (backpressure).
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+
+from bench.synth import synth_corpus
+from product_name.timing import _percentile
+
+
+def _payloads(mode: str, n_kinds: int, batch: int, seed: int) -> list:
+    """Body request dựng sẵn (không tính vào thời gian)."""
+    corpus = synth_corpus(n_kinds, seed=seed)
+    reqs = [{"group": g, "kv": dict(rows)} for g, rows in corpus]
+    if mode == "name":
+        return [json.dumps(r, ensure_ascii=False).encode() for r in reqs]
+    rng = random.Random(seed)
+    return [
+        "".join(json.dumps(rng.choice(reqs), ensure_ascii=False) + "\n" for _ in range(batch)).encode()
+        for _ in range(min(n_kinds, 64))
+    ]
+
+
+async def _client(host: str, port: int, path: str, bodies: list, todo: list, stats: dict) -> None:
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while todo:
+            body = bodies[todo.pop() % len(bodies)]
+            t0 = time.perf_counter()
+            writer.write(
+                f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Length: {len(body)}\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+            status = int((await reader.readline()).split()[1])
+            length = 0
+            while True:
+                h = await reader.readline()
+                if h in (b"\r\n", b""):
+                    break
+                if h.lower().startswith(b"content-length:"):
+                    length = int(h.split(b":")[1])
+            await reader.readexactly(length)
+            stats["latency_ms"].append((time.perf_counter() - t0) * 1000)
+            stats[status] = stats.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run(host: str, port: int, mode: str, requests: int, concurrency: int, batch: int, seed: int) -> dict:
+    bodies = _payloads(mode, 500, batch, seed)
+    path = "/name" if mode == "name" else "/name/batch"
+    todo = list(range(requests))
+    stats = {"latency_ms": []}
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, path, bodies, todo, stats) for _ in range(concurrency)))
+    secs = time.perf_counter() - t0
+    ok = stats.get(200, 0)
+    lat = sorted(stats.pop("latency_ms"))
+    return {
+        "mode": mode,
+        "requests": requests,
+        "seconds": secs,
+        "req_per_sec": requests / secs,
+        "names_per_sec": ok * (1 if mode == "name" else batch) / secs,
+        "p50_ms": _percentile(lat, 50),
+        "p95_ms": _percentile(lat, 95),
+        "p99_ms": _percentile(lat, 99),
+        "status": {str(k): v for k, v in stats.items()},
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.load", description="Load test product-name serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--mode", choices=["name", "batch"], default="name")
+    parser.add_argument("--requests", "-n", type=int, default=20000)
+    parser.add_argument("--concurrency", "-c", type=int, default=64, help="Số connection keep-alive song song")
+    parser.add_argument("--batch", type=int, default=500, help="Số tên mỗi request --mode batch")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    r = asyncio.run(run(args.host, args.port, args.mode, args.requests, args.concurrency, args.batch, args.seed))
+    print(json.dumps(r, indent=1))
+    return 0 if set(r["status"]) <= {"200", "503"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
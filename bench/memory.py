@@ -0,0 +1,75 @@
+# bench/memory.py
+# Bộ nhớ giữ 1 catalog đã đặt tên trong process (dedup / diff / xuất file):
+#   dict      : kv {key: value} mỗi sheet (chuỗi mới mỗi lần đọc) + tuple (final_name, errors)
+#   ParsedSpec: list bản ghi __slots__ có kiểu, chuỗi intern
+#   SpecTable : lưu theo cột (array + mã hoá từ điển)
+#
+#   python -m bench.memory                 # 20k sản phẩm
+#   python -m bench.memory --n 100000
+import argparse
+import json
+import sys
+import tracemalloc
+
+from bench.synth import synth_corpus
+from product_name.core import SpecIndex, _to_str, build_name_from_kv
+from product_name.spec import SpecTable, parse_spec
+
+
+def _fresh_rows(rows: list) -> list:
+    """Như đọc từ file: mỗi sheet có object chuỗi riêng (không dùng chung literal của synth)."""
+    return json.loads(json.dumps(rows))
+
+
+def _measure(build) -> tuple:
+    """-> (object, byte giữ lại sau khi dựng) theo tracemalloc."""
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def run(n: int, seed: int = 0) -> list:
+    corpus = [(g, _fresh_rows(rows)) for g, rows in synth_corpus(n, seed=seed)]
+
+    def as_dicts():
+        out = []
+        for i, (g, rows) in enumerate(corpus):
+            # như trước khi intern: key/value của mỗi sheet là object riêng
+            kv = {_to_str(k).lower().replace("&", "and"): _to_str(v) for k, v in rows}
+            out.append((f"sheet{i}.xlsx", kv, build_name_from_kv(kv, g)))
+        return out
+
+    def as_specs():
+        return [parse_spec(SpecIndex.from_rows(rows), g, f"sheet{i}.xlsx") for i, (g, rows) in enumerate(corpus)]
+
+    dicts, dict_bytes = _measure(as_dicts)
+    del dicts
+    specs, spec_bytes = _measure(as_specs)
+    table, table_bytes = _measure(lambda: SpecTable(specs))
+    assert [s.final_name for s in table] == [s.final_name for s in specs]
+    return [
+        {"layout": "dict", "products": n, "bytes": dict_bytes},
+        {"layout": "ParsedSpec", "products": n, "bytes": spec_bytes},
+        {"layout": "SpecTable", "products": n, "bytes": table_bytes},
+    ]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.memory", description="Bộ nhớ giữ catalog đã đặt tên")
+    parser.add_argument("--n", type=int, default=20000, help="Số sản phẩm")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rows = run(args.n, args.seed)
+    base = rows[0]["bytes"]
+    print(f"{'layout':<12}{'products':>10}{'MiB':>9}{'B/product':>11}{'vs dict':>9}")
+    for r in rows:
+        print(f"{r['layout']:<12}{r['products']:>10}{r['bytes'] / 2**20:>9.1f}{r['bytes'] / r['products']:>11.0f}"
+              f"{r['bytes'] / base:>8.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# bench/run.py
+# Benchmark từng stage đặt tên trên specsheet giả lập (bench.synth)
+#
+#   python -m bench.run                              # 1, 1k, 100k sheet
+#   python -m bench.run --sizes 1000 --save base.json
+#   python -m bench.run --sizes 1000 --compare base.json --max-slowdown 1.25   # exit 1 nếu chậm hơn
+#
+# Stage đọc Excel (read_excel / kv_map / read_stream) chỉ chạy tối đa --max-excel file mỗi size
+# (ghi 100k file .xlsx không thực tế); các stage còn lại chạy đủ n.
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+
+from bench.synth import synth_corpus, synth_xlsx
+
+_MEM_SAMPLE = 2000  # số input đo bộ nhớ (tracemalloc làm chậm ~5x nên không chạy đủ n)
+
+
+def _stages(corpus: list, max_excel: int) -> dict:
+    """name -> (list input, hàm nhận 1 input). Input được chuẩn bị trước, không tính vào thời gian."""
+    import pandas as pd
+
+    from product_name.core import (
+        SpecIndex, _kbm_code, _kv_map_from_specsheet, _norm_key, _os_code, _ssd_parse_counts, _to_str,
+        _warranty_code_from_kv, _wifi_code, build_name_from_kv, simplify_battery, simplify_color_from_kv,
+        simplify_cpu, simplify_display, simplify_psu, simplify_ram,
+    )
+    from product_name.reader import read_specsheet_kv
+
+    kvs = [({_norm_key(k): _to_str(v) for k, v in rows}, group) for group, rows in corpus]
+    idxs = [(SpecIndex(kv), group) for kv, group in kvs]
+
+    excel = [synth_xlsx(rows) for _, rows in corpus[:max_excel]]
+    frames = [pd.read_excel(io.BytesIO(b), header=None) for b in excel]
+
+    def values(field):
+        return [v for idx, _ in idxs for v in [idx.get(field)] if v]
+
+    storage = [(v, True) for idx, _ in idxs for v in idx.get_all("ssd")] + \
+              [(v, False) for idx, _ in idxs for v in idx.get_all("storage")]
+
+    return {
+        "read_excel": (excel, lambda b: pd.read_excel(io.BytesIO(b), header=None)),
+        "kv_map": (frames, _kv_map_from_specsheet),
+        "read_stream": (excel, read_specsheet_kv),
+        "simplify_cpu": ([idx.processor for idx, _ in idxs if idx.processor], simplify_cpu),
+        "simplify_ram": (values("ram"), simplify_ram),
+        "ssd_parse": (storage, lambda a: _ssd_parse_counts(a[0], assume_is_ssd=a[1])),
+        "simplify_display": ([(idx.get("panel_size"), idx.get("resolution"), g) for idx, g in idxs],
+                             lambda a: simplify_display(*a)),
+        "simplify_battery": ([(idx.get("battery"), g) for idx, g in idxs], lambda a: simplify_battery(*a)),
+        "simplify_psu": (values("power_supply"), simplify_psu),
+        "wifi_code": (values("wireless"), _wifi_code),
+        "kbm_code": ([(idx.get("kb_mouse"), idx.get("included_box"), g) for idx, g in idxs],
+                     lambda a: _kbm_code(*a)),
+        "os_code": (values("os"), _os_code),
+        "warranty_code": ([idx for idx, _ in idxs], _warranty_code_from_kv),
+        "color": ([idx for idx, _ in idxs], simplify_color_from_kv),
+        "spec_index": ([kv for kv, _ in kvs], SpecIndex),
+        "build_name": (kvs, lambda a: build_name_from_kv(*a)),
+    }
+
+
+def _time(fn, inputs: list) -> float:
+    t0 = time.perf_counter()
+    for x in inputs:
+        fn(x)
+    return time.perf_counter() - t0
+
+
+def _memory(fn, inputs: list) -> tuple:
+    """(peak KiB trong lúc chạy, KiB còn giữ lại sau khi chạy) trên tối đa _MEM_SAMPLE input."""
+    sample = inputs[:_MEM_SAMPLE]
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    for x in sample:
+        fn(x)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (peak - base) / 1024, (current - base) / 1024
+
+
+def run(sizes: list, max_excel: int, only: list = None, seed: int = 0) -> list:
+    from product_name.memo import clear_memos
+
+    results = []
+    for n in sizes:
+        clear_memos()  # mỗi size bắt đầu với memo rỗng
+        corpus = synth_corpus(n, seed=seed)
+        stages = _stages(corpus, min(n, max_excel))
+        for name, (inputs, fn) in stages.items():
+            if only and name not in only:
+                continue
+            if not inputs:
+                continue
+            fn(inputs[0])  # warm-up (import lười, compile, ...)
+            secs = _time(fn, inputs)
+            peak_kib, kept_kib = _memory(fn, inputs)
+            results.append({
+                "stage": name,
+                "sheets": n,
+                "ops": len(inputs),
+                "seconds": secs,
+                "us_per_op": secs / len(inputs) * 1e6,
+                "ops_per_sec": len(inputs) / secs if secs else float("inf"),
+                "peak_kib": peak_kib,
+                "retained_kib": kept_kib,
+            })
+            r = results[-1]
+            print(
+                f"{name:<18}{n:>8}{r['ops']:>9}{r['us_per_op']:>12.1f}{r['ops_per_sec']:>13.0f}"
+                f"{r['peak_kib']:>11.1f}{r['retained_kib']:>11.1f}",
+                flush=True,
+            )
+    return results
+
+
+def compare(results: list, baseline: list, max_slowdown: float) -> list:
+    """Stage nào có µs/op > baseline * max_slowdown (so theo (stage, sheets))."""
+    base = {(r["stage"], r["sheets"]): r for r in baseline}
+    slower = []
+    for r in results:
+        b = base.get((r["stage"], r["sheets"]))
+        if b and r["us_per_op"] > b["us_per_op"] * max_slowdown:
+            slower.append((r["stage"], r["sheets"], b["us_per_op"], r["us_per_op"]))
+    return slower
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.run", description="Benchmark các stage đặt tên")
+    parser.add_argument("--sizes", default="1,1000,100000", help="Số sheet mỗi lần chạy, cách nhau dấu phẩy")
+    parser.add_argument("--max-excel", type=int, default=1000, help="Tối đa số file .xlsx cho stage đọc Excel")
+    parser.add_argument("--stages", help="Chỉ chạy các stage này (cách nhau dấu phẩy)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-memo", action="store_true", help="Tắt memo simplifier (đo chi phí regex thật)")
+    parser.add_argument("--save", metavar="FILE", help="Ghi kết quả ra JSON")
+    parser.add_argument("--compare", metavar="FILE", help="So với JSON đã --save trước đó")
+    parser.add_argument("--max-slowdown", type=float, default=1.25, help="Ngưỡng chậm hơn baseline (mặc định 1.25x)")
+    args = parser.parse_args(argv)
+
+    if args.no_memo:
+        from product_name.memo import configure_memos
+
+        configure_memos(0)
+    sizes = [int(x) for x in args.sizes.split(",") if x]
+    only = args.stages.split(",") if args.stages else None
+    print(f"{'stage':<18}{'sheets':>8}{'ops':>9}{'µs/op':>12}{'ops/s':>13}{'peak KiB':>11}{'kept KiB':>11}")
+    results = run(sizes, args.max_excel, only, args.seed)
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=1)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            slower = compare(results, json.load(f), args.max_slowdown)
+        for stage, n, before, after in slower:
+            print(f"❌ {stage} ({n} sheet): {before:.1f} -> {after:.1f} µs/op", file=sys.stderr)
+        if slower:
+            return 1
+        print(f"✅ Không stage nào chậm hơn {args.max_slowdown}x baseline", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,94 @@
+# bench/startup.py
+# Thời gian khởi động: import từng module của product_name trong interpreter mới (python -X importtime)
+# + thời gian chạy `python -m product_name --help`; kiểm tra đường đặt tên thuần không nạp pandas/openpyxl...
+#
+#   python -m bench.startup                    # bảng ms + module nặng bị nạp
+#   python -m bench.startup --max-ms 150       # exit 1 nếu import product_name.cli > 150 ms hoặc nạp module nặng
+import argparse
+import subprocess
+import sys
+import time
+
+# chỉ được nạp khi thật sự đọc Excel / DataFrame / parquet hoặc ghi xlsx
+HEAVY = ("pandas", "numpy", "openpyxl", "xlsxwriter", "pyarrow")
+
+# module phải nhẹ: CLI, worker của pool, HTTP service, record ParsedSpec
+LIGHT = ("product_name", "product_name.core", "product_name.batch", "product_name.cli", "product_name.server",
+         "product_name.spec")
+
+
+def _import_us(module: str) -> int:
+    """
+    µs của `import module` trong interpreter mới: cộng cột cumulative của các dòng -X importtime cấp ngoài cùng
+    thuộc package gốc (import product_name.cli = package product_name + product_name.cli).
+    """
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                         capture_output=True, text=True, check=True).stderr
+    root = module.split(".")[0]
+    total = 0
+    for line in err.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  "):  # module con, đã tính trong dòng cha
+            continue
+        name = name.strip()
+        if name == root or name.startswith(root + "."):
+            total += int(cumulative)
+    if not total:
+        raise RuntimeError(f"không đọc được importtime của {module}")
+    return total
+
+
+def _heavy_loaded(module: str) -> list:
+    code = f"import sys, {module}; print(' '.join(m for m in {HEAVY!r} if m in sys.modules))"
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout.split()
+
+
+def _wall_ms(args: list, repeat: int) -> float:
+    """ms nhỏ nhất qua repeat lần chạy (ít nhiễu nhất)."""
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run([sys.executable, *args], capture_output=True, check=True)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000
+
+
+def run(repeat: int = 5) -> dict:
+    imports = []
+    for module in LIGHT + ("pandas",):
+        us = min(_import_us(module) for _ in range(repeat))
+        imports.append({"module": module, "ms": us / 1000, "heavy": [] if module == "pandas" else _heavy_loaded(module)})
+    return {
+        "imports": imports,
+        "python_ms": _wall_ms(["-c", "pass"], repeat),
+        "cli_help_ms": _wall_ms(["-m", "product_name", "--help"], repeat),
+    }
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m bench.startup", description="Benchmark thời gian khởi động")
+    parser.add_argument("--repeat", type=int, default=5, help="Số lần đo mỗi mục (lấy nhỏ nhất)")
+    parser.add_argument("--max-ms", type=float, default=None, help="Ngưỡng ms cho import product_name.cli")
+    args = parser.parse_args(argv)
+
+    r = run(args.repeat)
+    print(f"{'import':<22}{'ms':>8}  module nặng bị nạp")
+    for i in r["imports"]:
+        print(f"{i['module']:<22}{i['ms']:>8.1f}  {', '.join(i['heavy']) or '-'}")
+    print(f"\npython -c pass            {r['python_ms']:>8.1f} ms")
+    print(f"python -m product_name -h {r['cli_help_ms']:>8.1f} ms")
+
+    failed = [i["module"] for i in r["imports"] if i["heavy"]]
+    if failed:
+        print(f"❌ nạp module nặng khi import: {', '.join(failed)}", file=sys.stderr)
+    cli_ms = next(i["ms"] for i in r["imports"] if i["module"] == "product_name.cli")
+    if args.max_ms is not None and cli_ms > args.max_ms:
+        print(f"❌ import product_name.cli {cli_ms:.1f} ms > {args.max_ms} ms", file=sys.stderr)
+        failed.append("product_name.cli")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+# bench/synth.py
+# Sinh specsheet giả lập (Key | Value) cho từng nhóm NB / PC / AIO / Server / ACCY
+# Gồm các dạng khó mà parser phải xử lý: nhiều SSD (2x512GB + 1TB SSD), Core Ultra / Ryzen,
+# danh sách màu lẫn tính từ marketing, các kiểu ghi warranty.
+import io
+import random
+
+GROUPS = ["NB", "PC", "AIO", "Server", "ACCY"]
+
+_MODELS = ["X1504VA", "B1402CVA", "S500SE", "A3402WVA", "E410MA", "V440VA", "RS520A", "TUF504", "M3402RA"]
+
+_CPUS = [
+    "Intel® Core™ i5-1335U Processor 1.3 GHz (12M Cache, up to 4.6 GHz, 10 cores)",
+    "Intel® Core™ i7-13700 Processor",
+    "Intel® Core™ Ultra 7 Processor 155H 1.4 GHz (24MB Cache, up to 4.8 GHz, 16 cores)",
+    "Intel® Core™ Ultra 5 125U",
+    "Intel® Core™ 5 Processor 120U 1.4 GHz",
+    "AMD Ryzen™ 7 260 Processor 3.8GHz (24MB Cache, up to 5.1 GHz, 8 cores)",
+    "AMD Ryzen™ 5 Processor 7530U",
+    "AMD EPYC™ 9124 Processor",
+    "Intel® Xeon® E-2414 Processor",
+    "Intel Celeron N4500",
+]
+
+_RAMS = [
+    "16GB DDR5 5600MHz (2x8GB DIMM)", "8GB DDR4 on board", "32GB LPDDR5X on board",
+    "16GB DDR5 SO-DIMM", "8GB DDR5 U-DIMM *2", "4x16GB DDR5 4800 RDIMM ECC", "64GB DDR5 (4x16GB)",
+]
+
+_SSDS = [
+    "512GB M.2 NVMe™ PCIe® 4.0 SSD", "1TB M.2 NVMe™ PCIe® 4.0 SSD", "2x512GB + 1TB SSD",
+    "512GB*2 SSD", "256GB SSD / 1TB HDD", "2 x 1TB SSD, 4TB HDD", "960GB SATA SSD * 4 + 2x 3.84TB NVMe SSD",
+]
+
+_PANELS = ['14.0"', "15.6 inch", "23,8", "13.3-inch", "16"]
+_RESOLUTIONS = ["FHD 1920x1080", "1920x1200 WUXGA", "2560x1600 WQXGA", "2880x1800", "4K UHD 3840x2160", "QHD"]
+_TOUCH = ["Touch screen", "Non-touch screen", "Multi-touch screen", ""]
+_BATTERIES = ["3-cell 50WHrs", "42WHrs, 3S1P, 3-cell Li-ion", "4 cells 70Wh", "75WHrs, 4S1P, 4-cell Li-ion", "3 cell(s)"]
+_PSUS = ["65W AC Adapter", "2x180W", "180W*3", "ATX 500W 80+ Bronze", "2x 1600W Titanium redundant", "90W"]
+_WIRELESS = [
+    "Wi-Fi 6E(802.11ax) (Dual band) 2*2 + Bluetooth® 5.3",
+    "Wi-Fi 6(802.11ax) + Bluetooth® 5.2", "Wi-Fi 5(802.11ac) (Dual band) 1*1 + Bluetooth® 4.2",
+    "Wi-Fi 7(802.11be) + Bluetooth 5.4", "",
+]
+_KBM = ["Wireless keyboard & mouse combo", "USB Keyboard, USB Mouse", "2.4GHz wireless mouse", ""]
+_OS = ["Windows 11 Home", "Windows 11 Pro", "Windows 11 Home in S mode", "Without OS", ""]
+_WARRANTY = ["3Y Onsite", "2 Y PUR", "1Y Pick up and return", "3 years on-site service", "12 months", "2Y OSS NBD"]
+_COLORS = [
+    "Quiet Blue", "Star Black / Cool Silver", "Starry White", "Space Gray", "Mint Green & Black",
+    "Matte Dark Grey", "Graphite Black, Ice Silver", "Midnight Black + Pure White", "Rose Gold",
+]
+
+_FIELDS_BY_GROUP = {
+    "NB":     ["processor", "memory", "ssd", "panel", "touch", "battery", "wireless", "kbm", "os", "warranty", "color",
+               "fingerprint", "numpad"],
+    "PC":     ["processor", "memory", "ssd", "psu", "wireless", "kbm", "os", "warranty", "color"],
+    "AIO":    ["processor", "memory", "ssd", "panel", "touch", "psu", "wireless", "kbm", "os", "warranty", "color"],
+    "Server": ["processor", "memory", "ssd", "psu", "os", "warranty", "color"],
+    "ACCY":   ["wireless", "warranty", "color"],
+}
+
+# các hàng "nhiễu" hay gặp trong specsheet thật (không dùng để đặt tên)
+_FILLER = [
+    ("Graphics", "Intel® Iris Xᵉ Graphics"), ("Weight", "1.70 kg"), ("Dimensions (W x D x H)", "35.68 x 22.76 x 1.99 cm"),
+    ("Front-facing camera", "720p HD camera"), ("Audio", "Built-in speaker, Built-in array microphone"),
+    ("I/O Ports", "1x USB 2.0 Type-A, 1x USB 3.2 Gen 1 Type-C, 1x HDMI 1.4, 1x 3.5mm Combo Audio Jack"),
+    ("Keyboard", "Backlit Chiclet Keyboard"), ("Certification", "Energy Star, EPEAT Gold"),
+]
+
+
+def synth_rows(group: str, rng: random.Random) -> list:
+    """1 specsheet giả lập -> list (key, value) theo đúng thứ tự hàng trong Excel."""
+    model = rng.choice(_MODELS)
+    rows = [("Sales Model Name", f"{model}-{rng.choice(['NJ', 'EB', 'AM', 'R5'])}{rng.randint(100, 9999)}W")]
+    if rng.random() < 0.5:
+        rows.append(("Sales Model", f"90NB{rng.randint(1000, 9999):04X}-M00{rng.randint(100, 999)}"))
+
+    for field in _FIELDS_BY_GROUP[group]:
+        if rng.random() < 0.1:  # thiếu ngẫu nhiên 1 field
+            continue
+        if field == "processor":
+            rows.append((rng.choice(["Processor", "On board Processor", "CPU Processor"]), rng.choice(_CPUS)))
+        elif field == "memory":
+            rows.append((rng.choice(["Memory", "System Memory", "RAM"]), rng.choice(_RAMS)))
+        elif field == "ssd":
+            rows.append((rng.choice(["Storage", "SSD", "Storage 1"]), rng.choice(_SSDS)))
+            if rng.random() < 0.2:
+                rows.append(("Storage 2", rng.choice(_SSDS)))
+        elif field == "panel":
+            rows.append(("Panel Size", rng.choice(_PANELS)))
+            rows.append(("Resolution", rng.choice(_RESOLUTIONS)))
+        elif field == "touch":
+            rows.append(("Touch Panel", rng.choice(_TOUCH)))
+        elif field == "battery":
+            rows.append(("Battery", rng.choice(_BATTERIES)))
+        elif field == "psu":
+            rows.append(("Power Supply", rng.choice(_PSUS)))
+        elif field == "wireless":
+            rows.append((rng.choice(["Wireless", "Connectivity"]), rng.choice(_WIRELESS)))
+        elif field == "kbm":
+            rows.append((rng.choice(["Keyboard & Mouse", "Included in the box"]), rng.choice(_KBM)))
+        elif field == "os":
+            rows.append(("Operating System", rng.choice(_OS)))
+        elif field == "warranty":
+            rows.append((rng.choice(["Base Warranty", "Warranty", "Warranty Period"]), rng.choice(_WARRANTY)))
+        elif field == "color":
+            rows.append((rng.choice(["Color", "Colour", "Color ID"]), rng.choice(_COLORS)))
+        elif field == "fingerprint":
+            rows.append(("Finger Print", rng.choice(["Support", "N/A"])))
+        elif field == "numpad":
+            rows.append(("Number Pad", rng.choice(["Support", ""])))
+
+    rows.extend(rng.sample(_FILLER, rng.randint(2, len(_FILLER))))
+    # Sales Model Name luôn ở đầu, còn lại đảo thứ tự như file thật
+    rest = rows[1:]
+    rng.shuffle(rest)
+    return rows[:1] + rest
+
+
+def synth_kv(group: str, rng: random.Random) -> dict:
+    """Specsheet giả lập đã normalize (như output của _kv_map_from_specsheet)."""
+    from product_name.core import _norm_key, _to_str
+
+    return {_norm_key(k): _to_str(v) for k, v in synth_rows(group, rng)}
+
+
+def synth_xlsx(rows: list) -> bytes:
+    """Ghi rows (key, value) ra bytes .xlsx 2 cột, không header."""
+    from openpyxl import Workbook
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Specs")
+    for k, v in rows:
+        ws.append([k, v])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def synth_bytes(rows: list, fmt: str) -> bytes:
+    """Ghi rows (key, value) ra bytes theo format: xlsx / csv / tsv / jsonl / parquet."""
+    if fmt == "xlsx":
+        return synth_xlsx(rows)
+    if fmt in ("csv", "tsv"):
+        import csv
+
+        buf = io.StringIO()
+        csv.writer(buf, delimiter="\t" if fmt == "tsv" else ",", lineterminator="\n").writerows(rows)
+        return buf.getvalue().encode("utf-8")
+    if fmt == "jsonl":
+        import json
+
+        return "".join(json.dumps([k, v], ensure_ascii=False) + "\n" for k, v in rows).encode("utf-8")
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        buf = io.BytesIO()
+        pq.write_table(pa.table({"key": [k for k, _ in rows], "value": [v for _, v in rows]}), buf)
+        return buf.getvalue()
+    raise ValueError(fmt)
+
+
+def synth_long(corpus: list, fmt: str) -> bytes:
+    """Nhiều specsheet (group, rows) -> 1 bảng dài (sku, key, value) theo format (SKU = SKU00001, ...)."""
+    recs = [(f"SKU{i:05d}", k, v) for i, (_, rows) in enumerate(corpus, start=1) for k, v in rows]
+    if fmt == "parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        buf = io.BytesIO()
+        cols = list(zip(*recs))
+        pq.write_table(pa.table({"sku": cols[0], "key": cols[1], "value": cols[2]}), buf)
+        return buf.getvalue()
+    if fmt == "jsonl":
+        import json
+
+        return "".join(
+            json.dumps({"sku": s, "key": k, "value": v}, ensure_ascii=False) + "\n" for s, k, v in recs
+        ).encode("utf-8")
+    import csv
+
+    buf = io.StringIO()
+    w = csv.writer(buf, delimiter="\t" if fmt == "tsv" else ",", lineterminator="\n")
+    w.writerow(["sku", "key", "value"])
+    w.writerows(recs)
+    return buf.getvalue().encode("utf-8")
+
+
+def synth_corpus(n: int, seed: int = 0, groups=GROUPS) -> list:
+    """n specsheet (group, rows) rải đều qua các nhóm, tái lập được theo seed."""
+    rng = random.Random(seed)
+    return [(groups[i % len(groups)], synth_rows(groups[i % len(groups)], rng)) for i in range(n)]
@@ -0,0 +1,9 @@
+# product_name/__init__.py
+# Core đặt tên sản phẩm (không phụ thuộc Streamlit)
+from .core import DriveCapacity, SpecIndex, build_name_from_kv, parse_drive_capacities
+from .incremental import IncrementalNamer
+from .limits import configure_limits, current_limits
+from .memo import clear_memos, configure_memos, memo_stats
+from .metrics import disable_metrics, enable_metrics
+from .rules import reset_rule_stats, rule_stats
+from .spec import ParsedSpec, SpecTable, parse_spec
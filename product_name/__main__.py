@@ -0,0 +1,6 @@
+# python -m product_name build --group NB specs/*.xlsx
+import sys
+
+from .cli import main
+
+sys.exit(main())
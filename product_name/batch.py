@@ -0,0 +1,460 @@
+# product_name/batch.py
+# Batch mode: nhiều specsheet (.xlsx/.csv/.tsv/.jsonl/.parquet hoặc .zip chứa chúng)
+# -> đặt tên song song -> 1 workbook kết quả
+# Workbook nhiều sheet (mỗi sheet 1 SKU): expand_sheets() rồi run_batch() chia cụm sheet cho các worker
+# Gộp spec trùng (run_batch(dedup=True)): bytes giống hệt -> không đọc lại; kv giống nhau -> không đặt tên lại
+import contextlib
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import zipfile
+
+from . import metrics
+from .cache import DEFAULT_CACHE_PATH, FALLBACK_CACHE_PATH, NameCache, build_name_cached, build_names_cached
+from .core import build_name_outputs, kv_fingerprint, segment_fallbacks, segment_values
+from .export import RESULT_COLUMNS, XlsxResultWriter
+from .limits import current_limits, init_worker
+from .reader import iter_long_table, iter_sheet_rows, kv_from_rows, list_sheets, read_specsheet_kv, spec_format
+from .timing import StageTimer, log_timings
+
+logger = logging.getLogger("product_name.batch")  # không gắn handler: chưa cấu hình logging -> warning ra stderr
+
+
+def _is_specsheet_name(name: str) -> bool:
+    base = os.path.basename(name)
+    # bỏ thư mục, file rác của macOS và file lock của Excel (~$...)
+    return (
+        spec_format(base) is not None
+        and not base.startswith("~$")
+        and not name.startswith("__MACOSX/")
+    )
+
+
+class UploadTooLarge(ValueError):
+    """Zip bung ra quá max_bytes / quá max_members specsheet (zip bomb)."""
+
+
+_UNZIP_CHUNK = 1 << 20
+_LONG_CHUNK = 256  # số SKU của bảng dài tra cache 1 lần (get_many / put_many)
+
+
+def _read_member(zf: zipfile.ZipFile, info: zipfile.ZipInfo, budget: int) -> bytes:
+    """Đọc 1 file trong zip, tối đa budget byte: kiểm file_size khai báo trước, rồi đếm byte thật khi giải nén."""
+    if info.file_size > budget:
+        raise UploadTooLarge(f"{info.filename}: {info.file_size} byte sau giải nén, vượt giới hạn upload")
+    out = bytearray()
+    with zf.open(info) as f:
+        while True:
+            chunk = f.read(_UNZIP_CHUNK)
+            if not chunk:
+                break
+            out += chunk
+            if len(out) > budget:  # file_size trong header có thể khai gian
+                raise UploadTooLarge(f"{info.filename}: giải nén vượt giới hạn upload")
+    return bytes(out)
+
+
+def expand_uploads(files, max_bytes: int = None, max_members: int = None) -> list:
+    """
+    Nhận list (tên file, bytes) -> list (tên specsheet, bytes)
+    - specsheet (.xlsx/.csv/.tsv/.jsonl/.parquet): giữ nguyên
+    - .zip: bung từng specsheet bên trong, tên dạng "<zip>/<đường dẫn trong zip>"
+    max_bytes / max_members: tổng byte sau giải nén / số specsheet bung từ zip tối đa (server);
+    vượt -> UploadTooLarge. None = không giới hạn (CLI, UI đọc file của chính người dùng).
+    """
+    items = []
+    budget = max_bytes
+    members = 0
+    for name, data in files:
+        if name.lower().endswith(".zip"):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                for info in zf.infolist():
+                    if info.is_dir() or not _is_specsheet_name(info.filename):
+                        continue
+                    members += 1
+                    if max_members is not None and members > max_members:
+                        raise UploadTooLarge(f"{name}: quá {max_members} specsheet trong zip")
+                    if budget is None:
+                        data_i = zf.read(info)
+                    else:
+                        data_i = _read_member(zf, info, budget)
+                        budget -= len(data_i)
+                    items.append((f"{name}/{info.filename}", data_i))
+        elif _is_specsheet_name(name):
+            items.append((name, data))
+    return items
+
+
+def _observe(r: dict, group: str) -> None:
+    """Ở process gọi, mỗi kết quả: 1 dòng JSON timings + metrics (product_name.metrics, tắt thì không làm gì)."""
+    log_timings(r["timings"], file=r["file"], group=group)
+    metrics.METRICS.record(r)
+
+
+# (pid, cache_path) -> NameCache (None = mở không được), mỗi process 1 connection. Khóa theo pid vì pool fork
+# sau khi process cha đã mở cache (_run_dedup): process con không được dùng connection SQLite thừa kế từ cha,
+# cũng không được đóng nó (close có thể checkpoint / xóa WAL cha đang dùng) -> để nguyên entry của cha, mở mới.
+_worker_caches = {}
+
+
+def _open_cache(path: str):
+    """
+    NameCache của path, mở 1 lần mỗi process. Không mở được (thư mục chỉ đọc, đường dẫn sai, file hỏng)
+    -> ghi warning 1 lần và trả về None: batch chạy tiếp không cache thay vì lỗi mọi specsheet.
+    Path mặc định (~/.cache) mở không được thì thử FALLBACK_CACHE_PATH (thư mục tạm) trước.
+    """
+    key = (os.getpid(), path)
+    if key in _worker_caches:
+        return _worker_caches[key]
+    cache = None
+    for p in (path, FALLBACK_CACHE_PATH) if path == DEFAULT_CACHE_PATH else (path,):
+        try:
+            cache = NameCache(p)
+            break
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Không mở được cache %s (%s: %s)", p, type(e).__name__, e)
+    if cache is None:
+        logger.warning("Chạy không cache")
+    _worker_caches[key] = cache
+    return cache
+
+
+def _build(kv: dict, group: str, cache, detail: bool, timer) -> dict:
+    """
+    {"final_name", "errors", "fallbacks"[, "segments"]}; detail=True bỏ qua cache (cache chỉ lưu tên, không lưu
+    segment). fallbacks: node ra mã mặc định (metrics); cache hit lấy từ dòng cache.
+    """
+    if cache is not None and not detail:
+        fallbacks = []
+        final_name, errors = build_name_cached(kv, group, cache, timer=timer, fallbacks=fallbacks)
+        return {"final_name": final_name, "errors": errors, "fallbacks": fallbacks}
+    final_name, errors, outputs = build_name_outputs(kv, group=group, timer=timer)
+    out = {"final_name": final_name, "errors": errors, "fallbacks": segment_fallbacks(outputs)}
+    if detail:
+        out["segments"] = segment_values(outputs)
+    return out
+
+
+def name_specsheet(name: str, data: bytes, group: str, cache_path: str = None, detail: bool = False) -> dict:
+    """
+    Đọc 1 specsheet (bytes) và build tên; lỗi đọc/thiếu field được ghi vào 'errors' thay vì raise.
+    cache_path: file SQLite của NameCache -> specsheet đã gặp (cùng kv + group + rule) không build lại.
+    detail: kèm "segments" (cpu, ram, ssd, ... để xuất file, xem product_name.export).
+    Kết quả kèm "timings" (ms theo stage: read, cache_lookup, index, model, cpu, ...).
+    """
+    timer = StageTimer()
+    try:
+        kv = read_specsheet_kv(data, spec_format(name) or "xlsx")
+        timer.lap("read")
+        out = _build(kv, group, _open_cache(cache_path) if cache_path else None, detail, timer)
+    except Exception as e:
+        out = {"final_name": "", "errors": [f"{type(e).__name__}: {e}"]}
+    return {"file": name, "group": group, **out, "timings": timer.as_ms()}
+
+
+def name_long_table(name: str, src, group: str, cache_path: str = None, detail: bool = False):
+    """
+    Bảng dài (sku, key, value) nhiều sản phẩm -> yield kết quả từng SKU (file = "<name>:<sku>"),
+    đọc dần theo từng SKU (có cache: đặt tên theo cụm _LONG_CHUNK SKU). src: đường dẫn, bytes hoặc file-like;
+    format theo đuôi của name.
+    """
+    fmt = spec_format(name)
+    if fmt is None:
+        raise ValueError(f"Không hỗ trợ format: {name}")
+    cache = _open_cache(cache_path) if cache_path else None
+    chunk = _LONG_CHUNK if cache is not None and not detail else 1  # không cache: trả dần từng SKU
+    reads = []
+    timer = StageTimer()
+    for sku, kv in iter_long_table(src, fmt):
+        timer.lap("read")
+        reads.append((f"{name}:{sku}", kv, None, timer.as_ms()))
+        if len(reads) == chunk:
+            yield from _name_reads(reads, group, cache, detail)
+            reads = []
+        timer = StageTimer()
+    yield from _name_reads(reads, group, cache, detail)
+
+
+def expand_sheets(items: list) -> list:
+    """
+    Workbook nhiều sheet: list (tên, bytes) -> list (tên, bytes, tên sheet), 1 mục cho mỗi worksheet của .xlsx
+    (chỉ đọc mục lục, chưa giải mã sheet nào); file khác giữ 1 mục, sheet None.
+    """
+    out = []
+    for name, data in items:
+        if spec_format(name) == "xlsx":
+            try:
+                sheets = list_sheets(data)
+            except Exception:
+                sheets = [None]  # file hỏng -> name_specsheet ghi lỗi đọc vào 'errors'
+            out += [(name, data, sheet) for sheet in sheets]
+        else:
+            out.append((name, data, None))
+    return out
+
+
+def _read_kvs(name: str, data: bytes, sheets: list = None):
+    """
+    Đọc kv của 1 file (sheets None) hoặc lần lượt các sheet của 1 workbook (mở 1 lần, không dựng DataFrame).
+    Yield (tên kết quả, kv | None, lỗi | None, timings đọc); "<tên>:<sheet>" cho sheet; lỗi mở workbook -> mọi sheet.
+    """
+    timer = StageTimer()
+    if sheets is None:
+        try:
+            kv, err = read_specsheet_kv(data, spec_format(name) or "xlsx"), None
+        except Exception as e:
+            kv, err = None, f"{type(e).__name__}: {e}"
+        timer.lap("read")
+        yield name, kv, err, timer.as_ms()
+        return
+    done = 0
+    try:
+        for sheet, rows in iter_sheet_rows(data, sheets):
+            try:
+                kv, err = kv_from_rows(rows), None
+            except Exception as e:
+                kv, err = None, f"{type(e).__name__}: {e}"
+            timer.lap("read")
+            done += 1
+            yield f"{name}:{sheet}", kv, err, timer.as_ms()
+            timer = StageTimer()
+    except Exception as e:
+        timer.lap("read")
+        for sheet in sheets[done:]:
+            yield f"{name}:{sheet}", None, f"{type(e).__name__}: {e}", timer.as_ms()
+
+
+def _name_read(file: str, kv, err, read_ms: dict, group: str, cache, detail: bool) -> dict:
+    timer = StageTimer()
+    if err is not None:
+        out = {"final_name": "", "errors": [err]}
+    else:
+        try:
+            out = _build(kv, group, cache, detail, timer)
+        except Exception as e:
+            out = {"final_name": "", "errors": [f"{type(e).__name__}: {e}"]}
+    return {"file": file, "group": group, **out, "timings": {**read_ms, **timer.as_ms()}}
+
+
+def _name_reads(reads: list, group: str, cache, detail: bool) -> list:
+    """
+    list (file, kv | None, lỗi đọc | None, timings đọc) của 1 cụm -> list kết quả như _name_read, cùng thứ tự.
+    Có cache (không detail): tra cả cụm 1 lần (cache.build_names_cached: get_many + put_many)
+    thay vì 1 SELECT + 1 INSERT mỗi specsheet.
+    """
+    if cache is None or detail or len(reads) < 2:
+        return [_name_read(*read, group, cache, detail) for read in reads]
+    ok = [read for read in reads if read[2] is None]
+    timers = [StageTimer() for _ in ok]
+    built = iter(zip(build_names_cached([(kv, group) for _, kv, _, _ in ok], cache, timers=timers), timers))
+    out = []
+    for file, kv, err, read_ms in reads:
+        if err is not None:
+            out.append(_name_read(file, kv, err, read_ms, group, None, detail))
+            continue
+        (final_name, errors, fallbacks), timer = next(built)
+        out.append({"file": file, "group": group, "final_name": final_name, "errors": errors,
+                    "fallbacks": fallbacks, "timings": {**read_ms, **timer.as_ms()}})
+    return out
+
+
+def name_sheets(name: str, data: bytes, sheets: list, group: str, cache_path: str = None, detail: bool = False):
+    """
+    Đặt tên các sheet 'sheets' của 1 workbook (mở 1 lần, đọc từng sheet, không dựng DataFrame; cache tra 1 lần
+    cho cả cụm). Trả list kết quả từng sheet như name_specsheet, "file" = "<tên>:<sheet>";
+    lỗi mở workbook -> ghi cho mọi sheet.
+    """
+    cache = _open_cache(cache_path) if cache_path else None
+    return _name_reads(list(_read_kvs(name, data, sheets)), group, cache, detail)
+
+
+@contextlib.contextmanager
+def _pool(workers: int):
+    """
+    Process pool cho run_batch. Generator bị đóng giữa chừng (UI bấm Huỷ, caller break) -> huỷ các việc chưa chạy,
+    chỉ chờ việc đang chạy, thay vì chạy hết hàng đợi như `with ProcessPoolExecutor()`.
+    """
+    from concurrent.futures import ProcessPoolExecutor  # chỉ nạp khi chạy song song
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(current_limits(),))
+    try:
+        yield pool
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _run_task(name: str, data: bytes, sheets: list, group: str, cache_path: str, detail: bool) -> list:
+    """Chạy trong worker: 1 file (sheets None) hoặc 1 cụm sheet của cùng workbook -> list kết quả."""
+    if sheets is None:
+        return [name_specsheet(name, data, group, cache_path, detail)]
+    return name_sheets(name, data, sheets, group, cache_path, detail)
+
+
+def _tasks(items: list, workers: int) -> list:
+    """
+    items -> list (các index trong items, tên, bytes, list sheet | None).
+    Sheet của cùng workbook gom thành cụm (~4 cụm / worker): worker mở workbook 1 lần cho cả cụm,
+    bytes workbook chỉ gửi sang worker 1 lần / cụm, kết quả vẫn về dần theo từng cụm.
+    """
+    tasks = []
+    i = 0
+    while i < len(items):
+        name, data, *rest = items[i]
+        if not rest or rest[0] is None:
+            tasks.append(([i], name, data, None))
+            i += 1
+            continue
+        j = i
+        while j < len(items) and items[j][1] is data and len(items[j]) > 2 and items[j][2] is not None:
+            j += 1
+        size = max(1, -(-(j - i) // (workers * 4)))
+        for start in range(i, j, size):
+            idx = list(range(start, min(start + size, j)))
+            tasks.append((idx, name, data, [items[k][2] for k in idx]))
+        i = j
+    return tasks
+
+
+# =========================
+# Gộp spec trùng
+# =========================
+def _item_file(item: tuple) -> str:
+    name, _, *rest = item
+    return name if not rest or rest[0] is None else f"{name}:{rest[0]}"
+
+
+def _dedup_bytes(items: list) -> tuple:
+    """
+    Tầng 1: item có bytes giống hệt (sha256 qua memoryview, không copy) và cùng sheet -> 1 đại diện.
+    -> (list index đại diện theo thứ tự, {index đại diện: [index bản trùng]})
+    """
+    first = {}
+    reps, copies = [], {}
+    for i, (_, data, *rest) in enumerate(items):
+        key = (hashlib.sha256(memoryview(data)).digest(), rest[0] if rest else None)
+        j = first.setdefault(key, i)
+        if j == i:
+            reps.append(i)
+        else:
+            copies.setdefault(j, []).append(i)
+    return reps, copies
+
+
+def _read_task(name: str, data: bytes, sheets: list) -> list:
+    """Chạy trong worker khi gộp trùng: chỉ đọc kv; đặt tên ở process gọi sau khi so fingerprint."""
+    return list(_read_kvs(name, data, sheets))
+
+
+def _run_dedup(items: list, group: str, workers: int, cache_path: str, detail: bool):
+    """
+    Tầng 1 (_dedup_bytes) trước khi gửi đi đọc; tầng 2: kv_fingerprint của kv đã normalize (cùng SKU export lại,
+    khác định dạng ô) -> mỗi spec chỉ đặt tên 1 lần. Bản trùng nhận kết quả của bản đầu + "duplicate_of", không có
+    "timings" (không tốn CPU).
+    """
+    reps, copies = _dedup_bytes(items)
+    rep_items = [items[i] for i in reps]
+    cache = _open_cache(cache_path) if cache_path else None
+    named = {}  # fingerprint kv -> kết quả đã đặt tên
+
+    def fan_out(idx: list, reads: list):
+        """1 cụm đọc xong: kv chưa gặp đặt tên 1 lượt (_name_reads, cache tra 1 lần), bản trùng chép kết quả."""
+        fps = [kv_fingerprint(kv) if kv is not None else None for _, kv, _, _ in reads]
+        fresh, seen = [], set()
+        for k, fp in enumerate(fps):
+            if fp is None or (fp not in named and fp not in seen):
+                fresh.append(k)
+                seen.add(fp)
+        done = dict(zip(fresh, _name_reads([reads[k] for k in fresh], group, cache, detail)))
+        for k, (j, fp) in enumerate(zip(idx, fps)):
+            i = reps[j]
+            if k in done:
+                r = done[k]
+                _observe(r, group)
+                if fp is not None:
+                    named[fp] = r
+                source = r["file"]
+            else:
+                first = named[fp]
+                r = {key: v for key, v in first.items() if key != "timings"}
+                r.update(file=reads[k][0], errors=list(first["errors"]), duplicate_of=first["file"])
+                metrics.METRICS.record(r)
+                source = first["file"]
+            yield i, r
+            for c in copies.get(i, ()):
+                dup = {key: v for key, v in r.items() if key != "timings"}
+                dup.update(file=_item_file(items[c]), errors=list(r["errors"]), duplicate_of=source)
+                metrics.METRICS.record(dup)
+                yield c, dup
+
+    if workers == 1:
+        for idx, name, data, sheets in _tasks(rep_items, 1):
+            yield from fan_out(idx, list(_read_kvs(name, data, sheets)))
+        return
+    from concurrent.futures import as_completed
+
+    with _pool(workers) as pool:
+        futures = {
+            pool.submit(_read_task, name, data, sheets): idx
+            for idx, name, data, sheets in _tasks(rep_items, workers)
+        }
+        for fut in as_completed(futures):
+            yield from fan_out(futures[fut], fut.result())
+
+
+def duplicate_groups(results: list) -> list:
+    """Nhóm spec trùng từ kết quả run_batch(dedup=True): list [file đại diện, file trùng...] (nhóm >= 2 file)."""
+    groups = {}
+    for r in results:
+        if r.get("duplicate_of"):
+            groups.setdefault(r["duplicate_of"], [r["duplicate_of"]]).append(r["file"])
+    return list(groups.values())
+
+
+def run_batch(items: list, group: str, max_workers: int = None, cache_path: str = None, detail: bool = False,
+              dedup: bool = False):
+    """
+    Đặt tên cho list (tên, bytes) — hoặc (tên, bytes, sheet) từ expand_sheets — trên process pool
+    (max_workers=1: chạy tuần tự trong process hiện tại).
+    Yield (index trong items, kết quả) ngay khi từng file / cụm sheet xong để UI cập nhật progress bar.
+    Mỗi kết quả được ghi 1 dòng JSON timings (product_name.timing) + metrics (product_name.metrics) ở process gọi.
+    Đóng generator (close() / break) -> dừng pool, bỏ các file chưa chạy.
+    dedup: gộp spec trùng (bytes giống hệt / kv giống nhau) -> đặt tên 1 lần, bản trùng có "duplicate_of".
+    """
+    if not items:
+        return
+    workers = max_workers or min(len(items), os.cpu_count() or 1)
+    if dedup:
+        yield from _run_dedup(items, group, workers, cache_path, detail)
+        return
+    if workers == 1:
+        for idx, name, data, sheets in _tasks(items, 1):
+            results = (
+                [name_specsheet(name, data, group, cache_path, detail)] if sheets is None
+                else name_sheets(name, data, sheets, group, cache_path, detail)
+            )
+            for i, r in zip(idx, results):
+                _observe(r, group)
+                yield i, r
+        return
+    from concurrent.futures import as_completed
+
+    with _pool(workers) as pool:
+        futures = {
+            pool.submit(_run_task, name, data, sheets, group, cache_path, detail): idx
+            for idx, name, data, sheets in _tasks(items, workers)
+        }
+        for fut in as_completed(futures):
+            for i, r in zip(futures[fut], fut.result()):
+                _observe(r, group)
+                yield i, r
+
+
+def results_to_xlsx(results: list, columns: list = RESULT_COLUMNS) -> bytes:
+    """Ghi kết quả batch ra 1 workbook .xlsx (bytes); file lớn nên dùng export.write_results thẳng ra file."""
+    buf = io.BytesIO()
+    with XlsxResultWriter(buf, columns) as w:
+        for r in results:
+            w.write(r)
+    return buf.getvalue()
@@ -0,0 +1,267 @@
+# product_name/cache.py
+# Cache tên bền vững (SQLite) theo (kv_fingerprint, group, rules_version)
+# - rules_version = hash source các module quyết định tên (_RULE_MODULES) -> sửa rule là cache cũ tự mất hiệu lực;
+#   sửa module khác (server, UI, metrics...) không làm mất cache
+# - + hash cap độ dài (limits): tên tạo dưới cap khác (có / không lỗi "Value quá dài") không dùng lẫn
+# - giới hạn số dòng, evict dòng ít dùng gần đây nhất (last_used); last_used chỉ ghi lại khi đã cũ hơn
+#   LRU_REFRESH_S -> cache hit thường chỉ đọc, không tranh khoá ghi giữa các worker
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+from . import limits
+from .core import build_name_outputs, kv_fingerprint, segment_fallbacks
+from .limits import over_budget
+
+DEFAULT_CACHE_PATH = os.environ.get("PRODUCT_NAME_CACHE") or os.path.join(
+    os.path.expanduser("~"), ".cache", "product-name", "names.sqlite3"
+)
+# home không ghi được (container, user dịch vụ) -> batch thử file này trước khi chạy không cache
+FALLBACK_CACHE_PATH = os.path.join(tempfile.gettempdir(), "pn_cache.sqlite3")
+DEFAULT_MAX_ENTRIES = 200_000
+LRU_REFRESH_S = 600  # last_used mới hơn ngưỡng này thì hit không ghi lại (evict chỉ cần thứ tự thô)
+
+_SQL_CHUNK = 500  # số tham số '?' mỗi câu IN (...) — dưới giới hạn của SQLite cũ
+
+_RULE_MODULES = ("core.py", "rules.py", "limits.py")
+
+_rules_version = None
+
+
+def rules_version() -> str:
+    """Hash (sha1, 16 ký tự) source các module đặt tên (_RULE_MODULES); tính 1 lần mỗi process."""
+    global _rules_version
+    if _rules_version is None:
+        pkg_dir = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha1()
+        for fname in _RULE_MODULES:
+            h.update(fname.encode("utf-8"))
+            with open(os.path.join(pkg_dir, fname), "rb") as f:
+                h.update(f.read())
+        _rules_version = h.hexdigest()[:16]
+    return _rules_version
+
+
+_limits_key = _limits_version = None
+
+
+def limits_version() -> str:
+    """
+    Hash (8 ký tự) các cap độ dài đang dùng (limits.current_limits() bỏ budget_ms: kết quả hết budget không
+    được cache). Kiểm tra mỗi lần gọi vì configure_limits() đổi được lúc chạy; chỉ hash lại khi cap đổi.
+    """
+    global _limits_key, _limits_version
+    key = (limits.MAX_CELL_LEN, limits.DEFAULT_FIELD_LEN, tuple(sorted(limits.FIELD_LEN.items())))
+    if key != _limits_key:
+        _limits_key = key
+        _limits_version = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8]
+    return _limits_version
+
+
+class NameCache:
+    """
+    Cache (fingerprint, group) -> (final_name, errors, fallbacks) trong 1 file SQLite (fallbacks: node ra mã
+    mặc định, core.segment_fallbacks — cache hit vẫn đếm được metrics).
+    Dùng được từ nhiều process (WAL + busy_timeout); mỗi process mở connection riêng.
+    Cột rules_version = "<rules>:<limits_version()>"; mở cache không xoá gì (process khác có thể đang chạy bản
+    rule / cap khác trên cùng file). Dòng của version khác không bao giờ được hit, evict() xoá chúng trước.
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 version: str = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.rules = version or rules_version()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS names (
+                fingerprint   TEXT NOT NULL,
+                grp           TEXT NOT NULL,
+                rules_version TEXT NOT NULL,
+                final_name    TEXT NOT NULL,
+                errors        TEXT NOT NULL,
+                last_used     REAL NOT NULL,
+                fallbacks     TEXT,
+                PRIMARY KEY (fingerprint, grp, rules_version)
+            ) WITHOUT ROWID
+            """
+        )
+        # file tạo trước khi có cột fallbacks: thêm cột; dòng cũ (NULL) coi như chưa có, build lại 1 lần
+        if "fallbacks" not in {row[1] for row in self._conn.execute("PRAGMA table_info(names)")}:
+            with self._conn:
+                self._conn.execute("ALTER TABLE names ADD COLUMN fallbacks TEXT")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS names_last_used ON names (last_used)")
+        self._count = self._conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+
+    @property
+    def version(self) -> str:
+        return f"{self.rules}:{limits_version()}"
+
+    # ---- đọc ----
+    def get(self, fingerprint: str, group: str):
+        """(final_name, errors, fallbacks) hoặc None nếu chưa có."""
+        return self.get_many([(fingerprint, group)]).get((fingerprint, group))
+
+    def get_many(self, keys) -> dict:
+        """
+        Bulk lookup: list (fingerprint, group) -> {(fingerprint, group): (final_name, errors, fallbacks)}
+        cho các key đã có.
+        """
+        by_group = {}
+        for fp, grp in keys:
+            by_group.setdefault(grp, set()).add(fp)
+
+        found = {}
+        now = time.time()
+        version = self.version
+        stale = {}  # grp -> fingerprint có last_used cũ hơn LRU_REFRESH_S
+        for grp, fps in by_group.items():
+            fps = list(fps)
+            for i in range(0, len(fps), _SQL_CHUNK):
+                chunk = fps[i:i + _SQL_CHUNK]
+                rows = self._conn.execute(
+                    f"SELECT fingerprint, final_name, errors, fallbacks, last_used FROM names "
+                    f"WHERE grp = ? AND rules_version = ? AND fallbacks IS NOT NULL "
+                    f"AND fingerprint IN ({','.join('?' * len(chunk))})",
+                    (grp, version, *chunk),
+                ).fetchall()
+                for fp, final_name, errors, fallbacks, last_used in rows:
+                    found[(fp, grp)] = (final_name, json.loads(errors), json.loads(fallbacks))
+                    if now - last_used > LRU_REFRESH_S:
+                        stale.setdefault(grp, []).append(fp)
+        if stale:
+            # LRU: đánh dấu vừa dùng, chỉ các dòng đã cũ
+            with self._conn:
+                self._conn.executemany(
+                    "UPDATE names SET last_used = ? WHERE grp = ? AND rules_version = ? AND fingerprint = ?",
+                    [(now, grp, version, fp) for grp, fps in stale.items() for fp in fps],
+                )
+        return found
+
+    # ---- ghi ----
+    def put(self, fingerprint: str, group: str, final_name: str, errors: list, fallbacks: list = ()) -> None:
+        self.put_many([(fingerprint, group, final_name, errors, fallbacks)])
+
+    def put_many(self, rows) -> None:
+        """rows: list (fingerprint, group, final_name, errors, fallbacks)."""
+        now = time.time()
+        version = self.version
+        params = [
+            (fp, grp, version, final_name, json.dumps(errors, ensure_ascii=False), now, json.dumps(list(fallbacks)))
+            for fp, grp, final_name, errors, fallbacks in rows
+        ]
+        if not params:
+            return
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO names (fingerprint, grp, rules_version, final_name, errors, last_used, fallbacks) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                params,
+            )
+        self._count += len(params)
+        if self._count > self.max_entries:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Xoá dòng cho tới khi còn ~90% max_entries: dòng của version khác trước, rồi dòng cũ nhất (theo last_used).
+        Trả về số dòng đã xoá.
+        """
+        self._count = self._conn.execute("SELECT COUNT(*) FROM names").fetchone()[0]
+        excess = self._count - int(self.max_entries * 0.9)
+        if self._count <= self.max_entries or excess <= 0:
+            return 0
+        with self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM names WHERE (fingerprint, grp, rules_version) IN "
+                "(SELECT fingerprint, grp, rules_version FROM names ORDER BY rules_version = ?, last_used LIMIT ?)",
+                (self.version, excess),
+            ).rowcount
+        self._count -= deleted
+        return deleted
+
+    def clear(self) -> None:
+        with self._conn:
+            self._conn.execute("DELETE FROM names")
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def build_name_cached(kv: dict, group: str, cache: NameCache, timer=None, fallbacks: list = None):
+    """
+    Như build_name_from_kv nhưng tra cache trước; lỗi thiếu 'Sales Model Name' (raise) và
+    kết quả bị cắt vì hết budget (limits) không được cache.
+    fallbacks: list nhận thêm tên node ra mã mặc định (core.segment_fallbacks), lưu cùng dòng cache -> hit cũng có.
+    """
+    fp = kv_fingerprint(kv)
+    hit = cache.get(fp, group)
+    if timer is not None:
+        timer.lap("cache_lookup")
+    if hit is not None:
+        final_name, errors, hit_fallbacks = hit
+        if fallbacks is not None:
+            fallbacks += hit_fallbacks
+        return final_name, errors
+    final_name, errors, outputs = build_name_outputs(kv, group=group, timer=timer)
+    built = segment_fallbacks(outputs)
+    if fallbacks is not None:
+        fallbacks += built
+    if not over_budget(errors):
+        cache.put(fp, group, final_name, errors, built)
+    return final_name, errors
+
+
+def build_names_cached(items, cache: NameCache, timers: list = None) -> list:
+    """
+    Bulk: list (kv, group) -> list (final_name, errors, fallbacks) cùng thứ tự (batch: 1 cụm specsheet / sheet).
+    1 lần get_many cho cả list, chỉ build phần chưa có rồi put_many 1 lần.
+    Specsheet lỗi -> ("", ["<Loại lỗi>: thông báo"], []) và không được cache (kết quả hết budget cũng vậy).
+    fallbacks: như build_name_cached (lưu trong cache, hit cũng có).
+    timers: list StageTimer cùng thứ tự; thời gian get_many chia đều vào "cache_lookup" của từng mục.
+    """
+    t0 = time.perf_counter()
+    fps = [(kv_fingerprint(kv), group) for kv, group in items]
+    found = cache.get_many(fps)
+    if timers:
+        share = (time.perf_counter() - t0) / len(timers)
+        for t in timers:
+            t.stages["cache_lookup"] = share
+            t.reset()
+
+    out, new_rows = [], []
+    for k, ((kv, group), key) in enumerate(zip(items, fps)):
+        hit = found.get(key)
+        if hit is None:
+            timer = timers[k] if timers else None
+            if timer is not None:
+                timer.reset()  # bỏ thời gian build các mục trước
+            try:
+                final_name, errors, outputs = build_name_outputs(kv, group=group, timer=timer)
+            except Exception as e:
+                out.append(("", [f"{type(e).__name__}: {e}"], []))
+                continue
+            hit = found[key] = (final_name, errors, segment_fallbacks(outputs))
+            if not over_budget(errors):
+                new_rows.append((key[0], group, *hit))
+        out.append(hit)
+    cache.put_many(new_rows)
+    return out
@@ -0,0 +1,210 @@
+# product_name/cli.py
+# CLI: product-name build --group NB specs/*.xlsx  (không import Streamlit)
+#      product-name serve --port 8080                (HTTP service, xem product_name.server)
+import argparse
+import io
+import os
+import sys
+
+from . import metrics
+from .batch import expand_sheets, expand_uploads, name_long_table, run_batch
+from .cache import DEFAULT_CACHE_PATH
+from .core import GROUPS
+from .export import EXPORT_COLUMNS, RESULT_COLUMNS, CsvResultWriter, XlsxResultWriter
+from .limits import SERVICE_BUDGET_MS, configure_limits
+from .memo import memo_stats
+from .rules import rule_stats
+from .timing import enable_json_log, log_summary, log_timings, summarize
+
+
+def _iter_results(paths: list, group: str, jobs: int, cache_path: str = None, wide: bool = False,
+                  long: bool = False, detail: bool = False, sheets: bool = False, dedup: bool = False):
+    if long:
+        # bảng dài (sku, key, value): đọc dần từ file, không nạp cả file vào bộ nhớ
+        for p in paths:
+            for r in name_long_table(p, p, group, cache_path, detail):
+                log_timings(r["timings"], file=r["file"], group=group)
+                metrics.METRICS.record(r)
+                yield r
+        return
+
+    files = []
+    for p in paths:
+        with open(p, "rb") as f:
+            files.append((p, f.read()))
+    items = expand_uploads(files)
+    if sheets:
+        # mỗi sheet 1 SKU: chỉ đọc mục lục ở đây, worker đọc từng cụm sheet
+        items = expand_sheets(items)
+
+    if wide:
+        # mỗi cột value là 1 SKU; RAM/PSU/Battery/OS/WF vector hoá theo cột
+        import pandas as pd
+
+        from .wide import build_names_wide
+
+        for name, data in items:
+            for r in build_names_wide(pd.read_excel(io.BytesIO(data), header=None), group, label=name):
+                metrics.METRICS.record(r)
+                yield r
+        return
+
+    # jobs > 1: process pool, ra kết quả theo thứ tự hoàn thành
+    for _, r in run_batch(items, group, max_workers=jobs, cache_path=cache_path, detail=detail, dedup=dedup):
+        yield r
+
+
+def _cmd_build(args) -> int:
+    if args.format == "xlsx" and not args.output:
+        print("❌ --format xlsx cần --output", file=sys.stderr)
+        return 2
+    configure_limits(budget_ms=args.budget_ms)
+    columns = EXPORT_COLUMNS if args.segments else RESULT_COLUMNS
+    writer = None
+    if args.format == "xlsx":
+        # constant_memory: ghi từng dòng khi kết quả về, bộ nhớ không tăng theo số specsheet
+        out = sys.stdout
+        writer = XlsxResultWriter(args.output, columns)
+    else:
+        out = open(args.output, "w", newline="", encoding="utf-8") if args.output else sys.stdout
+        if args.format == "csv":
+            writer = CsvResultWriter(out, columns)
+
+    if args.timings:
+        enable_json_log()
+    if args.metrics_file:
+        metrics.enable_metrics()
+    timings = []
+    duplicates = {}  # file đại diện -> [file trùng]
+
+    failed = 0
+    try:
+        for r in _iter_results(args.files, args.group, args.jobs, args.cache_path if args.cache else None,
+                                args.wide, args.long, args.segments, args.sheets, args.dedup):
+            errors = " | ".join(r["errors"])
+            if "timings" in r:
+                timings.append(r["timings"])
+            if r.get("duplicate_of"):
+                duplicates.setdefault(r["duplicate_of"], []).append(r["file"])
+            if not r["final_name"]:
+                failed += 1
+            if writer:
+                writer.write(r)
+            else:
+                out.write(f"{r['file']}\t{r['final_name']}\n")
+                if errors:
+                    print(f"⚠️ {r['file']}: {errors}", file=sys.stderr)
+            out.flush()
+    except ValueError as e:
+        # vd: --long nhưng file không có header sku,key,value
+        print(f"❌ {e}", file=sys.stderr)
+        return 2
+    except BrokenPipeError:
+        # vd: product-name build ... | head — dừng im lặng như các CLI unix khác
+        sys.stdout = open(os.devnull, "w")
+        return 0
+    finally:
+        if writer:
+            writer.close()
+        if out is not sys.stdout:
+            out.close()
+    if duplicates:
+        n_dup = sum(len(v) for v in duplicates.values())
+        print(f"♻️ {n_dup} specsheet trùng ({len(duplicates)} nhóm), chỉ đặt tên 1 lần:", file=sys.stderr)
+        for first, dups in duplicates.items():
+            print(f"   {first} = {', '.join(dups)}", file=sys.stderr)
+    if args.timings and timings:
+        log_summary(summarize(timings), group=args.group, sheets=len(timings))
+    if args.rule_stats:
+        _print_rule_stats()
+    if args.metrics_file:
+        metrics.METRICS.write(args.metrics_file)
+    return 1 if failed else 0
+
+
+def _cmd_serve(args) -> int:
+    import asyncio
+
+    from .server import serve_forever
+
+    try:
+        asyncio.run(serve_forever(
+            args.host, args.port, workers=args.workers, batch_size=args.batch_size,
+            max_wait_ms=args.max_wait_ms, max_pending=args.max_pending, metrics=args.metrics,
+            budget_ms=args.budget_ms,
+        ))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def _print_rule_stats() -> None:
+    # chỉ có số liệu khi chạy trong process này (-j 1); worker của pool có bộ đếm riêng
+    print(f"{'rule':<28}{'calls':>10}{'hits':>10}{'hit%':>8}", file=sys.stderr)
+    for r in rule_stats():
+        name = f"{r['field']}.{r['name']}"
+        print(f"{name:<28}{r['calls']:>10}{r['hits']:>10}{r['hit_rate'] * 100:>7.1f}%", file=sys.stderr)
+    print(f"\n{'memo':<16}{'hits':>10}{'misses':>10}{'size':>8}{'max':>8}{'hit%':>8}", file=sys.stderr)
+    for m in memo_stats():
+        print(f"{m['name']:<16}{m['hits']:>10}{m['misses']:>10}{m['size']:>8}{m['maxsize']:>8}"
+              f"{m['hit_rate'] * 100:>7.1f}%", file=sys.stderr)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="product-name", description="Build tên sản phẩm từ specsheet")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_build = sub.add_parser("build", help="Đặt tên cho 1 hoặc nhiều specsheet")
+    p_build.add_argument("files", nargs="+", help="Specsheet .xlsx/.csv/.tsv/.jsonl/.parquet hoặc .zip")
+    p_build.add_argument("--group", "-g", required=True, choices=GROUPS, help="Nhóm sản phẩm")
+    p_build.add_argument("--format", "-f", choices=["text", "csv", "xlsx"], default="text",
+                         help="text: <file>\\t<tên> mỗi dòng; csv/xlsx: file,group,final_name,errors "
+                              "(xlsx cần -o, ghi dần từng dòng)")
+    p_build.add_argument("--segments", action="store_true",
+                         help="csv/xlsx kèm cột từng segment (model, cpu, ram, ssd, ...); bỏ qua --cache")
+    p_build.add_argument("--output", "-o", help="Ghi ra file thay vì stdout")
+    p_build.add_argument("--jobs", "-j", type=int, default=1, help="Số process song song (mặc định 1)")
+    p_build.add_argument("--wide", action="store_true",
+                         help="Sheet wide: cột A = Key, mỗi cột sau = 1 SKU (bỏ qua --jobs/--cache)")
+    p_build.add_argument("--long", action="store_true",
+                         help="Bảng dài nhiều sản phẩm: header sku,key,value (csv/tsv/jsonl/parquet/xlsx), "
+                              "đọc dần từng SKU (bỏ qua --jobs)")
+    p_build.add_argument("--sheets", action="store_true",
+                         help="Workbook nhiều sheet: đặt tên mọi sheet .xlsx (mỗi sheet 1 SKU), chia sheet cho -j worker")
+    p_build.add_argument("--dedup", action="store_true",
+                         help="Gộp specsheet trùng (cùng bytes hoặc cùng nội dung) -> đặt tên 1 lần, báo nhóm trùng")
+    p_build.add_argument("--cache", action="store_true", help="Dùng cache tên SQLite (bỏ qua specsheet đã gặp)")
+    p_build.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, metavar="PATH",
+                         help=f"File cache (mặc định {DEFAULT_CACHE_PATH}, hoặc env PRODUCT_NAME_CACHE)")
+    p_build.add_argument("--timings", action="store_true",
+                         help="Ghi thời gian từng stage dạng JSON lines ra stderr + dòng tổng hợp p50/p95/p99")
+    p_build.add_argument("--rule-stats", action="store_true",
+                         help="In bộ đếm calls/hits của từng rule + hits/misses memo ra stderr (chỉ với -j 1)")
+    p_build.add_argument("--metrics-file", metavar="PATH",
+                         help="Ghi metrics (số specsheet, lỗi theo loại, segment mặc định, cache, latency) "
+                              "dạng Prometheus text ra file khi chạy xong")
+    p_build.add_argument("--budget-ms", type=float, default=SERVICE_BUDGET_MS, metavar="MS",
+                         help=f"Thời gian tối đa đặt tên 1 specsheet (mặc định {SERVICE_BUDGET_MS:g}, 0 = không giới hạn)")
+    p_build.set_defaults(func=_cmd_build)
+
+    p_serve = sub.add_parser("serve", help="HTTP service: POST /name, POST /name/batch, GET /health, GET /metrics")
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8080)
+    p_serve.add_argument("--workers", "-w", type=int, help="Số process trong pool (mặc định = số CPU)")
+    p_serve.add_argument("--batch-size", type=int, default=64, help="Số tên mỗi lô gửi vào pool (mặc định 64)")
+    p_serve.add_argument("--max-wait-ms", type=float, default=2.0,
+                         help="Thời gian tối đa gom request /name thành lô (mặc định 2 ms)")
+    p_serve.add_argument("--max-pending", type=int, default=20_000,
+                         help="Số tên đang chờ tối đa, quá thì trả 503; 1 lô lớn hơn -> 413 (mặc định 20000)")
+    p_serve.add_argument("--metrics", action="store_true",
+                         help="Bật metrics Prometheus ở GET /metrics (đo thêm thời gian parse/build mỗi tên)")
+    p_serve.add_argument("--budget-ms", type=float, default=SERVICE_BUDGET_MS, metavar="MS",
+                         help=f"Thời gian tối đa đặt tên 1 specsheet (mặc định {SERVICE_BUDGET_MS:g}, 0 = không giới hạn)")
+    p_serve.set_defaults(func=_cmd_serve)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1117 @@
+# product_name/core.py
+# Logic đặt tên sản phẩm từ specsheet (Key | Value) — dùng chung cho UI Streamlit và batch worker
+# Không import pandas ở đây: CLI / worker / server chỉ cần dict -> tên; pandas chỉ nạp khi đọc DataFrame
+import hashlib
+import re
+import sys
+import time
+from typing import TYPE_CHECKING
+
+from . import limits
+from .memo import memoize
+from .rules import rule
+from .timing import NULL_TIMER
+
+if TYPE_CHECKING:  # chỉ cho type checker / pyflakes, lúc chạy không nạp pandas
+    import pandas as pd
+
+# =========================
+# Config & Helpers
+# =========================
+GROUPS = ["NB", "PC", "AIO", "Server", "ACCY"]
+
+RESOLUTION_MAP = {
+    "1366x768": "HD",
+    "1920x1080": "FHD",
+    "1920x1200": "WUXGA",
+    "2560x1440": "QHD",
+    "2560x1600": "WQXGA",
+    "3840x2160": "4K",
+}
+
+#Color ID -> map sang tiếng Việt IN HOA có dấu
+_ALLOWED_COLOR_MAP = {
+    "BLACK": "ĐEN",
+    "WHITE": "TRẮNG",
+    "SILVER": "BẠC",
+    "GRAY": "XÁM", "GREY": "XÁM", "GRAPHITE": "XÁM", "SPACE GRAY": "XÁM",
+}
+
+# màu ngoài 4 nhóm hợp lệ vẫn nhận ra để ghi N/A_<COLORID>
+_COLOR_OTHER = ["BLUE", "GREEN", "RED", "ORANGE", "PURPLE", "VIOLET", "PINK", "ROSE", "GOLD", "BROWN"]
+
+# =========================
+# Rules (regex compile 1 lần lúc import, xem product_name.rules)
+# Số đứng đầu pattern có (?<!\d): không thử lại từ giữa 1 dãy số dài (O(n²) với ô toàn chữ số),
+# kết quả không đổi vì match sớm nhất luôn bắt đầu ở đầu dãy số
+# =========================
+_R_SPACES = rule("text", "spaces", r"\s+")
+
+_R_BATTERY_CELLS = rule("battery", "cells", r"\b(\d+)\s*(?:-\s*)?cell(?:s|\(s\))?\b", re.IGNORECASE)
+_R_BATTERY_WH = rule("battery", "whr", r"\b(\d{2,4})\s*W\s*H(?:\s*R)?(?:s)?\b", re.IGNORECASE)
+
+# độ ưu tiên màu hợp lệ trong 1 mảnh (nhỏ = ưu tiên), không theo vị trí xuất hiện
+# SPACE là tính từ marketing -> SPACE GRAY xếp cùng hạng GRAY
+_COLOR_RANK = {"GRAPHITE": 0, "SILVER": 1, "BLACK": 2, "WHITE": 3, "SPACE GRAY": 4, "GRAY": 4, "GREY": 5}
+# 1 lượt quét: group 1 = dấu tách mảnh (/ , + ; &), group 2 = từ màu (cụm dài trước: SPACE GRAY trước GRAY)
+_R_COLOR_TOKENS = rule(
+    "color", "tokens",
+    r"([/,+;&])|\b(" + "|".join(re.escape(k) for k in sorted(_COLOR_RANK, key=len, reverse=True) + _COLOR_OTHER)
+    + r")\b",
+)
+
+_R_CPU_CORE_I = rule("cpu", "core_i", r"(i[3579]-\d+[A-Za-z0-9]*)")
+_R_CPU_ULTRA = rule("cpu", "core_ultra", r"Core\s*(?:™\s*)?Ultra\s*(\d+)\s*(?:Processor\s*)?([0-9]{3}[A-Za-z0-9]*)", re.I)
+_R_CPU_CORE_N = rule("cpu", "core_n", r"Core\s+(\d+)\s*Processor\s*([0-9]{3}[A-Za-z0-9]*)", re.I)
+_R_CPU_RYZEN = rule(
+    "cpu", "ryzen",
+    r"""
+    AMD\s*Ryzen\s*            # AMD Ryzen
+    (?P<tier>\d+)             # 5 / 7 / 9
+    \s*(?:Processor\s*)?      # optional 'Processor'
+    (?P<sku>\d{3})            # 260
+    """,
+    re.IGNORECASE | re.VERBOSE,
+)
+
+_R_RAM_SIZE = rule("ram", "size", r"(?<!\d)(\d+)\s*GB")
+_R_RAM_STICKS = rule("ram", "sticks", r"(?<!\d)(\d+)X\d+\s*GB")
+
+# 1 lượt quét storage (text đã upper): group 1 = dấu tách mảnh, còn lại = [N x] SIZE GB|TB [* N]
+# số tối đa 6 chữ số: dãy số dài (file cố ý) không thành token -> int() không gặp giới hạn 4300 chữ số của Python
+_R_DRIVE_TOKENS = rule(
+    "ssd", "tokens", r"([+,/;&])|(?<!\d)(?:(\d{1,6})\s*X\s*)?(\d{1,6})\s*(GB|TB)(?:\s*\*\s*(\d{1,6})(?!\d))?"
+)
+
+_R_DISPLAY_PANEL = rule("display", "panel_size", r"(\d+[.,]?\d*)")
+_R_DISPLAY_RES_NUM = rule("display", "resolution_num", r"\d{3,4}x\d{3,4}")
+_R_TOUCH_SCREEN = rule("touch", "touch_screen", r"\btouch\s*screen\b", re.I)
+
+_R_WIFI_6 = rule("wifi", "wf6", r"\b6\b")
+_R_WIFI_5 = rule("wifi", "wf5", r"\b5\b")
+
+_R_PSU_N_X_W = rule("psu", "n_x_watt", r"(?<!\d)(\d+)[Xx]\s*(\d+)\s*W")
+_R_PSU_W_X_N = rule("psu", "watt_x_n", r"(?<!\d)(\d+)\s*W\s*\*\s*(\d+)")
+_R_PSU_W = rule("psu", "watt", r"(?<!\d)(\d+)\s*W")
+
+_R_KBM_QUOTES = rule("kbm", "quotes", r'["“”]')
+_R_KBM_24G = rule("kbm", "2_4ghz", r"(2\.4g|2\.4 ghz)")
+
+_R_WARRANTY_YEARS = rule("warranty", "years", r"(?<!\d)(\d+)\s*Y\b", re.I)
+_R_WARRANTY_ONSITE = rule("warranty", "onsite", r"\bon[\s\-_]*site\b", re.I)
+_R_WARRANTY_OSS = rule("warranty", "oss", r"\boss\b", re.I)
+_R_WARRANTY_PUR = rule("warranty", "pur", r"\bPUR\b", re.I)
+_R_WARRANTY_PICKUP = rule("warranty", "pick_up_return", r"\bpick[\s\-_]*up[\s\-_]*and[\s\-_]*return\b", re.I)
+
+def _group_prefix(group: str) -> str:
+    g = (group or "").upper()
+    mapping = {
+        "NB":     "MÁY TÍNH XÁCH TAY (NB) ASUS",
+        "PC":     "MÁY TÍNH ĐỂ BÀN (PC) ASUS",
+        "AIO":    "MÁY TÍNH ĐỂ BÀN (PC) ASUS AIO",
+        "SERVER": "MÁY CHỦ (SERVER) ASUS",
+        "ACCY":   "(ACCY) ASUS",
+    }
+    return mapping.get(g, "")
+
+import re
+
+@memoize("battery")
+def simplify_battery(text: str, group: str) -> tuple[str, list]:
+    """
+    Battery (NB):
+    - Cells: chỉ lấy từ "N-cell" (chấp nhận: 3-cell / 3 cell / 3cell / 3 cells / 3 cell(s))
+    - WHr: chấp nhận WHr/WHrs/Wh/WH...
+    """
+    errors = []
+    if not text:
+        if group == "NB":
+            errors.append("Thiếu Battery cho NB")
+            return "N/A_Battery", errors
+        return "", errors
+
+    t = _to_str(text)
+
+    # Cells: linh hoạt hơn
+    m_cell = _R_BATTERY_CELLS.search(t)
+    cells = m_cell.group(1) if m_cell else ""
+
+    # WHr: linh hoạt hơn + chuẩn hoá
+    m_wh = _R_BATTERY_WH.search(t)
+    wh = f"{int(m_wh.group(1))}WHr" if m_wh else ""
+
+    if cells and wh:
+        return f"{cells}C{wh}", errors
+    if wh:
+        return f"?C{wh}", errors
+    if cells:
+        return f"{cells}C??WHr", errors
+
+    if group == "NB":
+        errors.append("Không nhận dạng được Battery cho NB")
+        return "N/A_Battery", errors
+    return "", errors
+
+
+def _extract_base_color_token(text: str) -> str:
+    """
+    Trả về token màu gốc đầu tiên (BLACK/WHITE/SILVER/GRAY/BLUE/RED/...)
+    - Quét 1 lượt trái -> phải; text chia mảnh theo / , + ; &, mảnh đầu tiên có màu quyết định
+    - Trong 1 mảnh: màu hợp lệ theo _COLOR_RANK (GRAPHITE > SILVER > BLACK > WHITE > GRAY > GREY),
+      không có thì lấy màu khác xuất hiện trước (BLUE, GREEN, ...)
+    - Tính từ marketing (STARRY, MATTE, MIDNIGHT...) tự bị bỏ qua vì chỉ khớp nguyên từ màu
+    """
+    t = _to_str(text).upper()
+    if not t:
+        return ""
+
+    best = other = None
+    best_rank = len(_COLOR_RANK)
+    for m in _R_COLOR_TOKENS.finditer(t):
+        tok = m.group(2)
+        if tok is None:  # hết 1 mảnh
+            if best or other:
+                break
+            continue
+        rank = _COLOR_RANK.get(tok)
+        if rank is not None:
+            if rank < best_rank:
+                best, best_rank = tok, rank
+        elif other is None:
+            other = tok
+    return best or other or ""
+
+def simplify_color_from_kv(kv) -> str:
+    """
+    - Tìm value từ mọi key chứa 'color' hoặc 'colour'
+    - Lấy màu đầu tiên
+    - Nếu thuộc 4 nhóm hợp lệ -> trả VI (ĐEN/TRẮNG/BẠC/XÁM)
+    - Nếu ra màu khác -> trả 'N/A_<COLORID>' (vd N/A_BLUE)
+    - Nếu không thấy -> trả ""
+    """
+    return _color_from_values(_spec_index(kv).colors)
+
+
+def _color_from_values(values) -> str:
+    """simplify_color_from_kv trên list value các key color/colour."""
+    if not values:
+        return ""
+    return _color_code(" / ".join(values))
+
+
+@memoize("color")
+def _color_code(text: str) -> str:
+    # specsheet cùng dòng sản phẩm lặp lại vài chuỗi màu -> nhớ theo chuỗi gốc
+    token = _extract_base_color_token(text)
+    if not token:
+        return ""
+
+    if token in _ALLOWED_COLOR_MAP:
+        return _ALLOWED_COLOR_MAP[token]  # ĐEN/TRẮNG/BẠC/XÁM
+    else:
+        return token  # ví dụ: BLUE, GREEN, RED...
+
+
+def _to_str(x):
+    if x is None or (isinstance(x, float) and x != x):  # NaN (kể cả numpy.float64) khác chính nó
+        return ""
+    s = str(x).strip()
+    return "" if s.lower() in ("nan", "none", "null", "-") else s
+
+class _CutStr(str):
+    """Ô bị _value_str cắt: nhớ độ dài gốc cho lỗi "Value quá dài" (đi kèm value qua pickle sang process khác)."""
+
+    __slots__ = ("full_len",)
+
+
+def _value_str(x) -> str:
+    """
+    _to_str + intern: value lặp lại giữa các specsheet (Windows 11 Home, 16GB DDR5...) dùng chung 1 object.
+    Ô dài hơn limits.MAX_CELL_LEN bị cắt (blob vài MB không đi tiếp vào kv / fingerprint / cache) -> _CutStr.
+    """
+    s = _to_str(x)
+    if len(s) <= limits.MAX_CELL_LEN:
+        return sys.intern(s)
+    cut = _CutStr(s[:limits.MAX_CELL_LEN])
+    cut.full_len = len(s)
+    return cut
+
+def _norm_key(s: str) -> str:
+    s = _to_str(s)
+    s = (s if len(s) <= limits.MAX_CELL_LEN else s[:limits.MAX_CELL_LEN]).lower()
+    s = _R_SPACES.sub(" ", s)
+    s = s.replace("&", "and")
+    return sys.intern(s)
+
+def kv_fingerprint(kv: dict) -> str:
+    """
+    Fingerprint ổn định (sha1 hex) của kv đã normalize.
+    Giữ thứ tự key vì rule lấy key 'processor'/'warranty' đầu tiên và nối màu theo thứ tự.
+    """
+    h = hashlib.sha1()
+    for k, v in kv.items():
+        h.update(k.encode("utf-8"))
+        h.update(b"\x00")
+        h.update(str(v).encode("utf-8"))
+        h.update(b"\x01")
+    return h.hexdigest()
+
+def _kv_map_from_specsheet(df: "pd.DataFrame") -> dict:
+    """
+    Nhận DataFrame specsheet 2 cột (Key|Value), trả về dict {key_norm: value}
+    - Nếu >2 cột: dùng 2 cột đầu
+    - Nếu chỉ 1 cột dạng "Key: Value" thì cố gắng tách
+    """
+    import pandas as pd  # df đã là DataFrame -> pandas đã được nạp, import chỉ tra sys.modules
+
+    if df.shape[1] < 2:
+        df2 = df.copy()
+        df2["__key__"] = df2.iloc[:, 0].apply(lambda x: str(x).split(":", 1)[0] if pd.notna(x) else "")
+        df2["__val__"] = df2.iloc[:, 0].apply(lambda x: str(x).split(":", 1)[1] if (pd.notna(x) and ":" in str(x)) else "")
+        key_col, val_col = "__key__", "__val__"
+        df = df2
+    else:
+        key_col, val_col = df.columns[0], df.columns[1]
+
+    kv = {}
+    for _, row in df.iterrows():
+        k = _norm_key(row.get(key_col, ""))
+        v = _value_str(row.get(val_col, ""))
+        if k:
+            kv[k] = v
+    return kv
+
+# field chuẩn -> các key alias theo thứ tự ưu tiên (key gốc trong specsheet, normalize lúc import)
+SPEC_FIELDS = {
+    "sales_model_name": ("Sales Model Name",),
+    "sales_model":      ("Sales Model",),
+    "ram":              ("Memory", "RAM", "System Memory", "Installed Memory", "DIMM Memory"),
+    "ssd":              ("SSD", "Solid State Drive"),
+    "storage":          ("Storage", "Primary Storage", "Storage 1", "Storage 2", "Drive Capacity"),
+    "hdd":              ("HDD",),
+    "panel_size":       ("Panel Size",),
+    "resolution":       ("Resolution",),
+    "touch_panel":      ("Touch Panel",),
+    "fingerprint":      ("Finger Print", "Fingerprint"),
+    "numpad":           ("Number Pad", "NumberPad"),
+    "power_supply":     ("Power Supply",),
+    "battery":          ("Battery",),
+    "wireless":         ("Wireless", "Connectivity", "LAN/WLAN"),
+    "kb_mouse":         ("Keyboard & Mouse", "Keyboard and Mouse"),
+    "included_box":     ("Included in the box",),
+    "os":               ("Operating System",),
+    "base_warranty":    ("Base Warranty",),
+}
+
+# key_norm -> (field, thứ tự ưu tiên); "keyboard & mouse" và "keyboard and mouse" cùng 1 key sau normalize
+_ALIAS_INDEX = {}
+for _field, _aliases in SPEC_FIELDS.items():
+    for _prio, _alias in enumerate(_aliases):
+        _ALIAS_INDEX.setdefault(_norm_key(_alias), (_field, _prio))
+del _field, _aliases, _prio, _alias
+
+# field có cap độ dài riêng (limits.configure_limits): field chuẩn + value lấy theo chữ trong key
+LIMIT_FIELDS = (*SPEC_FIELDS, "processor", "warranty", "color")
+
+_MISSING = object()
+
+
+class SpecIndex:
+    """
+    Index các field của 1 specsheet, dựng 1 lượt qua kv:
+    - get(field): value khác rỗng đầu tiên theo thứ tự alias (như _get cũ), O(1)
+    - get_all(field): mọi value khác rỗng theo thứ tự alias (SSD/Storage)
+    - processor / any_warranty: value của key ĐẦU TIÊN chứa 'processor' / 'warranty'
+    - colors: value (khác rỗng) của mọi key chứa 'color'/'colour', theo thứ tự (tối đa limits.MAX_COLOR_VALUES)
+    Value dài hơn cap của field (limits) bị cắt trước khi tới simplifier;
+    truncated: field -> {value đã cắt: độ dài gốc} (kể cả ô đã bị cắt lúc đọc file, xem _value_str)
+    """
+
+    __slots__ = ("kv", "_values", "processor", "any_warranty", "colors", "truncated")
+
+    def __init__(self, kv: dict):
+        self.kv = kv
+        self._values = {}
+        self.colors = []
+        self.truncated = {}
+        caps, cap = limits.FIELD_LEN, limits.DEFAULT_FIELD_LEN
+        processor = warranty = _MISSING
+        for k, v in kv.items():
+            hit = _ALIAS_INDEX.get(k)
+            if hit is not None and v:
+                field, prio = hit
+                slots = self._values.get(field)
+                if slots is None:
+                    slots = self._values[field] = [None] * len(SPEC_FIELDS[field])
+                # value không phải str (dict truyền thẳng, vd. 16) giữ nguyên như trước: simplifier tự _to_str
+                slots[prio] = (
+                    v if not isinstance(v, str) or len(v) < limits.MAX_CELL_LEN and len(v) <= caps.get(field, cap)
+                    else self._cut(field, v)
+                )
+            if processor is _MISSING and "processor" in k:
+                processor = self._cut("processor", v)
+            if warranty is _MISSING and "warranty" in k:
+                warranty = self._cut("warranty", v)
+            if ("color" in k or "colour" in k) and _to_str(v) and len(self.colors) < limits.MAX_COLOR_VALUES:
+                self.colors.append(self._cut("color", v if isinstance(v, str) else str(v)))
+        self.processor = None if processor is _MISSING else processor
+        self.any_warranty = None if warranty is _MISSING else warranty
+
+    def _cut(self, field: str, v):
+        if not isinstance(v, str):
+            return v
+        cap = limits.FIELD_LEN.get(field, limits.DEFAULT_FIELD_LEN)
+        full = getattr(v, "full_len", len(v))  # _CutStr: độ dài trước khi cắt ở ingest
+        if full <= cap:
+            return v
+        short = v[:cap] if len(v) > cap else v
+        self.truncated.setdefault(field, {})[short] = full
+        return short
+
+    @classmethod
+    def from_rows(cls, rows) -> "SpecIndex":
+        """Dựng từ các cặp (key, value) thô (chưa normalize), bỏ key rỗng; key trùng -> lấy dòng sau."""
+        kv = {}
+        for key, val in rows:
+            k = _norm_key(key)
+            if k:
+                kv[k] = _value_str(val)
+        return cls(kv)
+
+    def get(self, field: str) -> str:
+        slots = self._values.get(field)
+        if slots:
+            for v in slots:
+                if v is not None:
+                    return v
+        return ""
+
+    def get_all(self, field: str) -> list:
+        slots = self._values.get(field)
+        return [v for v in slots if v is not None] if slots else []
+
+
+def _spec_index(kv) -> SpecIndex:
+    return kv if isinstance(kv, SpecIndex) else SpecIndex(kv)
+
+def _normalize_resolution(res: str) -> str:
+    raw = _to_str(res)
+    if not raw:
+        return ""
+    s = raw.upper().replace(" ", "")
+    # đã là mã (FHD/WUXGA/...) -> giữ
+    if s in {v.upper() for v in RESOLUTION_MAP.values()}:
+        return s
+    # map theo số: 1920x1080 -> FHD ...
+    mapped = RESOLUTION_MAP.get(s.lower(), "")
+    return mapped if mapped else raw
+
+@memoize("cpu")
+def simplify_cpu(text: str) -> str:
+    t = text.replace("®", "").replace("™", "").strip()
+
+    # Rule 1: Core i3/i5/i7/i9
+    m = _R_CPU_CORE_I.search(t)
+    if m:
+        return m.group(1)
+
+    # Rule 2: Core Ultra
+    m0 = _R_CPU_ULTRA.search(t)
+    if m0:
+        return f"U{m0.group(1)}-{m0.group(2)}"
+
+    # Rule 3: Core (chỉ số thế hệ, không có i, không Ultra)
+    m3 = _R_CPU_CORE_N.search(t)
+    if m3:
+        return f"Core {m3.group(1)}-{m3.group(2)}"
+
+    # Rule AMD Ryzen: "AMD Ryzen™ 7 260" -> "R7-260"
+    m_amd = _R_CPU_RYZEN.search(t)
+    if m_amd:
+        return f"R{m_amd.group('tier')}-{m_amd.group('sku')}"
+    
+    # fallback: giữ nguyên
+    return t
+
+@memoize("ram")
+def simplify_ram(text: str) -> str:
+    """
+    Chuẩn hóa RAM: <Dung lượng><DDR>*<Số thanh nếu >1>
+    - "16GB DDR5 5600MHz (2x8GB DIMM)" -> "16GD5*2"
+    - "8GB DDR4" -> "8GD4"
+    - "32GB LPDDR5X" -> "32GD5X"
+    - "16GB DDR5 SO-DIMM" -> "16GD5"
+    - "8GB DDR5 U-DIMM *2" -> "8GD5*2"
+    """
+    t = _to_str(text).upper()
+
+    # dung lượng (GB)
+    m_total = _R_RAM_SIZE.search(t)
+    size = f"{m_total.group(1)}G" if m_total else ""
+
+    # loại DDR
+    ddr = ""
+    if "LPDDR5X" in t:
+        ddr = "D5X"
+    elif "DDR5" in t:
+        ddr = "D5"
+    elif "DDR4" in t:
+        ddr = "D4"
+
+    # số thanh (pattern 2x8GB, 4x…)
+    m_stick = _R_RAM_STICKS.search(t)
+    qty = m_stick.group(1) if m_stick else ""
+
+    # build kết quả
+    result = size + ddr
+    if qty and qty != "1":
+        result += f"*{qty}"
+    return result if result else t
+
+#Chuẩn hóa cách đọc SSD - Storage
+from collections import OrderedDict
+
+
+# GB/TB theo hệ thập phân như hãng ổ cứng ghi
+_UNIT_BYTES = {"G": 10**9, "T": 10**12}
+
+
+class DriveCapacity:
+    """1 cụm dung lượng ổ trong spec: size + unit ('G'|'T') đúng như ghi (không đổi GB<->TB), qty ổ."""
+
+    __slots__ = ("size", "unit", "qty")
+
+    def __init__(self, size: int, unit: str, qty: int = 1):
+        self.size = size
+        self.unit = unit
+        self.qty = qty
+
+    @property
+    def label(self) -> str:
+        return f"{self.size}{self.unit}"  # 512G, 1T
+
+    @property
+    def bytes(self) -> int:
+        """Dung lượng 1 ổ (byte)."""
+        return self.size * _UNIT_BYTES[self.unit]
+
+    @property
+    def total_bytes(self) -> int:
+        return self.bytes * self.qty
+
+    def __repr__(self):
+        return f"DriveCapacity({self.label}*{self.qty})"
+
+
+def parse_drive_capacities(text: str, kind: str = "SSD", assume: bool = False) -> list:
+    """
+    Quét 1 lượt chuỗi storage -> list DriveCapacity theo thứ tự xuất hiện.
+    - Mảnh tách theo + , / ; &; chỉ nhận mảnh có chữ 'kind' (SSD/HDD), trừ khi assume=True
+      (ví dụ key là 'SSD' -> coi toàn bộ text là SSD).
+    - Token: 2x512GB (NxSIZE), 512GB*2 (SIZE*N), 512GB (đơn lẻ); trong 1 mảnh giữ thứ tự
+      NxSIZE -> SIZE*N -> đơn lẻ như parser cũ (3 lượt finditer).
+    """
+    t = _to_str(text).upper()
+    if not t or (not assume and kind not in t):
+        return []
+
+    caps = []
+    n_x, x_n, single = [], [], []
+    start = 0
+    for m in _R_DRIVE_TOKENS.finditer(t):
+        sep, qty_before, size, unit, qty_after = m.groups()
+        if sep:
+            _take_chunk(caps, n_x, x_n, single, assume or t.find(kind, start, m.start()) >= 0)
+            start = m.end()
+            continue
+        unit = unit[0]  # GB|TB -> G|T
+        if qty_before:
+            n_x.append(DriveCapacity(int(size), unit, int(qty_before)))
+        if qty_after:
+            x_n.append(DriveCapacity(int(size), unit, int(qty_after)))
+        if not qty_before and not qty_after:
+            single.append(DriveCapacity(int(size), unit))
+    _take_chunk(caps, n_x, x_n, single, assume or t.find(kind, start) >= 0)
+    return caps
+
+
+def _take_chunk(caps: list, n_x: list, x_n: list, single: list, keep: bool) -> None:
+    if keep:
+        caps += n_x
+        caps += x_n
+        caps += single
+    n_x.clear()
+    x_n.clear()
+    single.clear()
+
+
+def _ssd_parse_counts(text: str, assume_is_ssd: bool = False) -> OrderedDict:
+    """
+    Trả về OrderedDict { '512G': 2, '256G': 1, '1T': 1, ... } theo đúng thứ tự xuất hiện.
+    - Chỉ lấy các cụm dung lượng SSD trong 'text'.
+    - Nếu assume_is_ssd=True (ví dụ key là 'SSD'), coi toàn bộ text là SSD, không cần từ 'SSD'.
+    """
+    counts = OrderedDict()
+    for cap in parse_drive_capacities(text, "SSD", assume=assume_is_ssd):
+        counts[cap.label] = counts.get(cap.label, 0) + cap.qty
+    return counts
+
+def _ssd_format_output(counts: OrderedDict) -> str:
+    """
+    Biến counts -> chuỗi theo rule:
+    - Nếu chỉ 1 loại dung lượng: 512G-SSD hoặc 512G-SSD*2
+    - Nếu nhiều loại: 512G+256G*2-SSD (nối bằng '+', mỗi loại có *qty nếu >1, '-SSD' ở cuối)
+    """
+    if not counts:
+        return ""
+    parts = []
+    for size, qty in counts.items():
+        if qty > 1:
+            parts.append(f"{size}*{qty}")
+        else:
+            parts.append(size)
+    return "+".join(parts) + "-SSD"
+
+
+def simplify_display(panel: str, res: str, group: str) -> tuple[str, list]:
+    """
+    Chuẩn hóa Display theo rule:
+    - Panel Size: chuẩn hóa xx.x (1 chữ số thập phân).
+    - Resolution: giữ nguyên FHD/WUXGA/...; nếu chỉ số thì giữ nguyên dạng số.
+    - Ghép thành <size><res>.
+    - Nếu thiếu 1 phần -> thêm N/A.
+    - Nếu thiếu cả 2 -> bỏ qua (trừ NB/AIO thì báo lỗi).
+    """
+    errors = []
+
+    panel_val = ""
+    res_val = ""
+
+    # --- Panel Size ---
+    if panel:
+        m = _R_DISPLAY_PANEL.search(str(panel))
+        if m:
+            try:
+                panel_num = float(m.group(1).replace(",", "."))
+                panel_val = f"{panel_num:.1f}"  # 1 số thập phân
+            except:
+                panel_val = "N/A"
+        else:
+            panel_val = "N/A"
+
+    # --- Resolution ---
+    if res:
+        r = str(res).upper()
+        # lấy các từ khoá gọn
+        if any(short in r for short in ["FHD", "WUXGA", "WQXGA", "QHD", "4K"]):
+            if "FHD" in r: res_val = "FHD"
+            elif "WUXGA" in r: res_val = "WUXGA"
+            elif "WQXGA" in r: res_val = "WQXGA"
+            elif "QHD" in r: res_val = "QHD"
+            elif "4K" in r: res_val = "4K"
+        else:
+            # nếu chỉ có dạng số (1920x1080 …) thì giữ nguyên
+            m = _R_DISPLAY_RES_NUM.search(r)
+            if m:
+                res_val = m.group(0)
+            else:
+                res_val = "N/A"
+
+    # --- Build result ---
+    if not panel_val and not res_val:
+        # thiếu cả 2
+        if group in {"NB", "AIO"}:
+            errors.append(f"Thiếu Display (Panel Size/Resolution) cho nhóm {group}")
+        return "", errors
+    elif panel_val and res_val:
+        return f"{panel_val}{res_val}", errors
+    elif panel_val and not res_val:
+        return f"{panel_val}N/A", errors
+    elif not panel_val and res_val:
+        return f"N/A{res_val}", errors
+
+def has_fingerprint(kv) -> bool:
+    """Trả về True nếu specsheet có Finger Print/Fingerprint với value chứa 'Support'."""
+    val = _spec_index(kv).get("fingerprint")
+    return "support" in val.lower() if val else False
+
+def has_numpad(kv) -> bool:
+    """Trả về True nếu specsheet có Number Pad/NumberPad với value chứa 'Support'."""
+    val = _spec_index(kv).get("numpad")
+    return "support" in val.lower() if val else False
+
+
+@memoize("wifi")
+def _wifi_code(wireless: str) -> str:
+    t = _to_str(wireless).upper()
+    if not t:
+        return ""
+    if "6E" in t or "WI-FI 6E" in t or "WIFI 6E" in t:
+        return "WF6E"
+    if _R_WIFI_6.search(t) or "WI-FI 6" in t or "WIFI 6" in t:
+        return "WF6"
+    if _R_WIFI_5.search(t) or "WI-FI 5" in t or "WIFI 5" in t:
+        return "WF5"
+    if "WIFI" in t or "WI-FI" in t:
+        return "WF"
+    return ""
+
+def _has_bt(wireless: str) -> bool:
+    t = _to_str(wireless).upper()
+    return "BT" in t or "BLUETOOTH" in t
+
+def _touch_code(val: str) -> str:
+    t = _to_str(val).lower()
+    return "T" if any(x in t for x in ["yes", "touch", "capacitive", "multi-touch", "multi touch"]) else ""
+
+@memoize("psu")
+def simplify_psu(text: str) -> str:
+    """
+    Chuẩn hóa PSU: <Watt>*<qty>
+    - "180W" -> "180W"
+    - "2x180W" -> "180W*2"
+    - "180W*3" -> "180W*3"
+    """
+    t = _to_str(text).upper()
+    if not t:
+        return ""
+
+    # pattern 2x180W
+    m = _R_PSU_N_X_W.search(t)
+    if m:
+        qty = m.group(1)
+        watts = m.group(2)
+        return f"{watts}W*{qty}"
+
+    # pattern 180W*3
+    m = _R_PSU_W_X_N.search(t)
+    if m:
+        watts = m.group(1)
+        qty = m.group(2)
+        return f"{watts}W*{qty}"
+
+    # pattern đơn lẻ 180W
+    m = _R_PSU_W.search(t)
+    if m:
+        return f"{m.group(1)}W"
+
+    return ""
+
+
+def _truthy(val: str) -> bool:
+    t = _to_str(val).lower()
+    return bool(t) and t not in ("no", "không", "none", "n/a", "na", "0")
+
+
+def _kbm_code(kb_mouse: str, included_box: str, group: str) -> str:
+    """
+    PC/AIO:  KB&M | WL_KB&M
+    NB:      M | WL_M
+    Khác:    không ghi gì
+    """
+    src = f"{_to_str(kb_mouse)} {_to_str(included_box)}".lower()
+    src = _R_KBM_QUOTES.sub(" ", src)
+    src = _R_SPACES.sub(" ", src).strip()
+    if not src:
+        return ""
+
+    is_wireless = ("wireless" in src) or ("bluetooth" in src) or bool(
+        _R_KBM_24G.search(src)
+    )
+    has_kb = ("keyboard" in src) or ("kb" in src) or ("keyboard&mouse" in src) or ("combo" in src)
+    has_m  = ("mouse" in src)
+
+    if group in {"PC", "AIO"}:
+        # chỉ xuất khi thấy dấu hiệu có bộ KB/M
+        if has_kb or has_m or "combo" in src:
+            return "WL_KB&M" if is_wireless else "KB&M"
+        return ""
+
+    if group == "NB":
+        if has_m:  # chỉ quan tâm chuột
+            return "WL_M" if is_wireless else "M"
+        return ""
+
+    # Server/ACCY: bỏ qua
+    return ""
+
+
+@memoize("os")
+def _os_code(os_text: str) -> str:
+    """
+    Chuẩn hóa hệ điều hành:
+    1. Có 'Windows 11 Home' -> W11H
+    2. Có 'Windows 11 Pro' (mà không có Home) -> W11P
+    3. Có 'Windows' nhưng không rõ Home/Pro -> WIN
+    4. Nếu trống -> NOS
+    """
+    t = _to_str(os_text).upper()
+    if not t:
+        return "NOS"
+
+    if "WINDOWS 11 HOME" in t:
+        return "W11H"
+    if "WINDOWS 11 PRO" in t:
+        return "W11P"
+    if "WINDOWS" in t:
+        return "WIN"
+
+    return "NOS"
+
+@memoize("warranty")
+def _warranty_code_from_text(txt: str) -> str:
+    """
+    Format: ?Y-Type
+    Type:
+      - Onsite / On-site / On site / on_site / OSS  -> OSS
+      - PUR / Pick up and return                    -> PUR
+    """
+    if not txt:
+        return "Warranty_input"
+
+    
+    t = _to_str(txt)  # giữ nguyên, dùng re.I để không phân biệt hoa/thường
+
+    # years: '3Y', '3 Y', '3y'...
+    m_year = _R_WARRANTY_YEARS.search(t)
+    years = m_year.group(1) if m_year else "?"
+
+    is_onsite = bool(
+        _R_WARRANTY_ONSITE.search(t) or
+        _R_WARRANTY_OSS.search(t)
+    )
+    is_pur = bool(
+        _R_WARRANTY_PUR.search(t) or
+        _R_WARRANTY_PICKUP.search(t)
+    )
+
+    if is_onsite:
+        return f"{years}Y-OSS"
+    if is_pur:
+        return f"{years}Y-PUR"
+    return "Warranty_input"
+
+def _warranty_code_from_kv(kv) -> str:
+    # Ưu tiên 'Base Warranty', nếu không có thì lấy dòng đầu tiên có chữ 'warranty' trong key.
+    idx = _spec_index(kv)
+    val = idx.get("base_warranty")
+    if not val:
+        val = idx.any_warranty
+    return _warranty_code_from_text(val)
+
+
+# =========================
+# Core build logic
+# =========================
+# Tên = ghép output của các node theo thứ tự dưới đây. Mỗi node chỉ đọc vài field của specsheet
+# (+ group nếu cần) -> product_name.incremental chỉ tính lại node có input đổi.
+# Node: (tên, đọc input từ SpecIndex, dùng group?, tính (values, group, segments) -> (parts, errors))
+
+def _seg_model(v, group, seg):
+    smn, sales_model = v
+    if not smn:
+        raise ValueError("Thiếu 'Sales Model Name'")
+    model = smn.split("-", 1)[0].strip() if "-" in smn else smn.strip()
+    # Sales Model (trong ngoặc) — ưu tiên "Sales Model", nếu không có thì dùng "Sales Model Name"
+    return [model, sales_model if sales_model else smn], []
+
+
+def _seg_cpu(v, group, seg):
+    cpu_raw = v[0] or ""
+    return [simplify_cpu(cpu_raw) if cpu_raw else ""], []  # luôn có phần tử, rỗng nếu không có CPU
+
+
+def _seg_ram(v, group, seg):
+    ram_raw = v[0]
+    if not ram_raw:
+        return [], []
+    return [seg["ram"] if "ram" in seg else simplify_ram(ram_raw)], []
+
+
+def _seg_ssd(v, group, seg):
+    # dedupe nguồn + parse theo rule; key SSD trước (coi cả chuỗi là SSD), rồi tới các key Storage
+    ssd_vals, storage_vals = v
+    ssd_counts = OrderedDict()
+    seen_values = set()
+    for val, is_ssd in [(x, True) for x in ssd_vals] + [(x, False) for x in storage_vals]:
+        val_norm = _to_str(val)
+        if not val_norm:
+            continue
+        # ❗ tránh đếm 2 lần cùng một chuỗi (ví dụ cả ở SSD và Storage)
+        if val_norm in seen_values:
+            continue
+        seen_values.add(val_norm)
+
+        for cap in parse_drive_capacities(val_norm, "SSD", assume=is_ssd):
+            ssd_counts[cap.label] = ssd_counts.get(cap.label, 0) + cap.qty
+
+    ssd_out = _ssd_format_output(ssd_counts)
+    return ([ssd_out] if ssd_out else []), []
+
+
+def _seg_hdd(v, group, seg):
+    # HDD (nếu có) + TPM (luôn có)
+    hdd = v[0]
+    return ([f"{hdd}-HDD", "TPM"] if hdd else ["TPM"]), []
+
+
+def _seg_display(v, group, seg):
+    # Panel Size + Resolution (chuẩn hóa; thiếu 1 nửa -> N/A; thiếu cả 2 -> bỏ)
+    display, errs = simplify_display(v[0], v[1], group)
+    return ([display] if display else []), errs
+
+
+def _seg_touch_fp_cam(v, group, seg):
+    touch_val, fp, numpad = v
+    parts = []
+    # Touch — chỉ với nhóm NB/AIO, value "Touch screen"; PC/Server/ACCY: bỏ qua
+    if group in {"NB", "AIO"} and touch_val:
+        tv = str(touch_val).strip().lower()
+        # chặn các phủ định trước, rồi chỉ chấp nhận đúng "touch screen"
+        negatives = ["non-touch", "non touch", "without touch", "no touch"]
+        is_negative = any(n in tv for n in negatives)
+        if (not is_negative) and _R_TOUCH_SCREEN.search(tv):
+            parts.append("T")
+    # Finger Print / Number Pad: value chứa 'Support'
+    if fp and "support" in fp.lower():
+        parts.append("FP")
+    if numpad and "support" in numpad.lower():
+        parts.append("num-pad")
+    # CAM & MIC — auto cho AIO
+    if group == "AIO":
+        parts += ["CAM", "MIC"]
+    return parts, []
+
+
+def _seg_psu(v, group, seg):
+    # Power Supply — bắt buộc cho PC/Server
+    psu = seg["psu"] if "psu" in seg else simplify_psu(v[0])
+    if psu:
+        return [psu], []
+    if group in {"PC", "Server"}:
+        return ["PSU_N/A"], [f"Thiếu Power Supply cho nhóm {group}"]
+    return [], []
+
+
+def _seg_battery(v, group, seg):
+    # Battery - bắt buộc cho NB
+    battery, berrs = seg["battery"] if "battery" in seg else simplify_battery(v[0], group)
+    return ([battery] if battery else []), berrs
+
+
+def _seg_wireless(v, group, seg):
+    # WF + BT (từ dòng Wireless)
+    wireless = v[0]
+    wf = seg["wf"] if "wf" in seg else _wifi_code(wireless)
+    parts = [wf] if wf else []
+    if _has_bt(wireless):
+        parts.append("BT")
+    return parts, []
+
+
+def _seg_kbm(v, group, seg):
+    # KB&M (Keyboard & Mouse hoặc Included in the box)
+    kbm = _kbm_code(v[0], v[1], group)
+    return ([kbm] if kbm else []), []
+
+
+def _seg_os(v, group, seg):
+    # Windows (bắt buộc -> nếu trống => NOS)
+    return [seg["os"] if "os" in seg else _os_code(v[0])], []
+
+
+def _seg_warranty(v, group, seg):
+    # Ưu tiên 'Base Warranty', nếu không có thì lấy dòng đầu tiên có chữ 'warranty' trong key
+    warr = _warranty_code_from_text(v[0] or v[1])
+    return ([warr] if warr else []), []
+
+
+def _seg_color(v, group, seg):
+    # key nào có COLOR/COLOUR đều lấy; chỉ chấp nhận 4 màu, còn lại -> N/A_<COLORID>
+    color_token = _color_from_values(v[0])
+    if color_token:
+        return [color_token], []
+    return ["N/A_Color"], ["Thiếu Color"]
+
+
+SEGMENT_NODES = (
+    ("model",        lambda i: (i.get("sales_model_name"), i.get("sales_model")), False, _seg_model),
+    ("cpu",          lambda i: (i.processor,),                                     False, _seg_cpu),
+    ("ram",          lambda i: (i.get("ram"),),                                    False, _seg_ram),
+    ("ssd",          lambda i: (tuple(i.get_all("ssd")), tuple(i.get_all("storage"))), False, _seg_ssd),
+    ("hdd",          lambda i: (i.get("hdd"),),                                    False, _seg_hdd),
+    ("display",      lambda i: (i.get("panel_size"), i.get("resolution")),         True,  _seg_display),
+    ("touch_fp_cam", lambda i: (i.get("touch_panel"), i.get("fingerprint"), i.get("numpad")), True, _seg_touch_fp_cam),
+    ("psu",          lambda i: (i.get("power_supply"),),                           True,  _seg_psu),
+    ("battery",      lambda i: (i.get("battery"),),                                True,  _seg_battery),
+    ("wireless",     lambda i: (i.get("wireless"),),                               False, _seg_wireless),
+    ("kbm",          lambda i: (i.get("kb_mouse"), i.get("included_box")),         True,  _seg_kbm),
+    ("os",           lambda i: (i.get("os"),),                                     False, _seg_os),
+    ("warranty",     lambda i: (i.get("base_warranty"), i.any_warranty),           False, _seg_warranty),
+    ("color",        lambda i: (tuple(i.colors),),                                 False, _seg_color),
+)
+
+
+# field (SpecIndex / limits) mà read của từng node đọc -> lỗi "Value quá dài" chỉ gắn vào node đọc value bị cắt
+NODE_FIELDS = {
+    "model": ("sales_model_name", "sales_model"),
+    "cpu": ("processor",),
+    "ram": ("ram",),
+    "ssd": ("ssd", "storage"),
+    "hdd": ("hdd",),
+    "display": ("panel_size", "resolution"),
+    "touch_fp_cam": ("touch_panel", "fingerprint", "numpad"),
+    "psu": ("power_supply",),
+    "battery": ("battery",),
+    "wireless": ("wireless",),
+    "kbm": ("kb_mouse", "included_box"),
+    "os": ("os",),
+    "warranty": ("base_warranty", "warranty"),
+    "color": ("color",),
+}
+
+
+# cột segment khi xuất kết quả (product_name.export): model + sales model + output từng node
+SEGMENT_COLUMNS = ["model", "sales_model"] + [name for name, _, _, _ in SEGMENT_NODES[1:]]
+
+
+def segment_values(outputs: dict) -> dict:
+    """Output các node -> {cột SEGMENT_COLUMNS: chuỗi} (nhiều phần trong 1 node nối bằng '/')."""
+    (model, end_token), _ = outputs["model"]
+    values = {"model": model, "sales_model": end_token}
+    for name, _, _, _ in SEGMENT_NODES[1:]:
+        values[name] = "/".join(outputs[name][0])
+    return values
+
+
+# node -> mã mặc định khi rule không đọc được value (display: nửa thiếu ra "N/A", xem simplify_display)
+FALLBACK_CODES = {"color": "N/A_Color", "psu": "PSU_N/A", "battery": "N/A_Battery", "warranty": "Warranty_input",
+                  "os": "NOS"}
+
+
+def segment_fallbacks(outputs: dict) -> list:
+    """Output các node -> tên các node ra mã mặc định (metrics đếm theo node, không dò trong final_name)."""
+    out = [name for name, code in FALLBACK_CODES.items() if code in outputs[name][0]]
+    display = outputs["display"][0]
+    if display and "N/A" in display[0]:
+        out.append("display")
+    return out
+
+
+def segment_sources(kv) -> dict:
+    """
+    Key nào của specsheet đã cấp value cho từng node -> {tên node: [key_norm, ...]} (UI highlight dòng nguồn).
+    Chạy đúng hàm read của SEGMENT_NODES trên SpecIndex {key: key} thay cho {key: value}.
+    """
+    keys = SpecIndex({k: (k if _to_str(v) else "") for k, v in kv.items()})
+    out = {}
+    for name, read, _, _ in SEGMENT_NODES:
+        found = []
+        for x in read(keys):
+            for k in (x if isinstance(x, tuple) else (x,)):
+                if k and k not in found:
+                    found.append(k)
+        out[name] = found
+    return out
+
+
+def assemble_name(outputs: dict, group: str):
+    """
+    Ghép output các node ({tên node: (parts, errors)}) -> (final_name, errors).
+    Model + CPU + body (luôn có TPM) + Color dính Sales Model, thêm prefix nhóm.
+    """
+    (model, end_token), errors = outputs["model"]
+    first_segment = f"{model} {outputs['cpu'][0][0]}".strip()
+    errors = errors + outputs["cpu"][1]  # thường rỗng; có khi value bị cắt / hết budget
+    parts = []
+    for name, _, _, _ in SEGMENT_NODES[2:]:
+        p, e = outputs[name]
+        parts += p
+        errors += e
+    final_name = f"{first_segment}/" + "/".join(parts) + f"({end_token})"
+
+    # Prefix nhóm (NB/PC/AIO/Server/ACCY)
+    prefix = _group_prefix(group)
+    if prefix:
+        final_name = f"{prefix} {final_name}"
+    return final_name, errors
+
+
+def _empty_values(values: tuple) -> tuple:
+    return tuple(() if isinstance(x, tuple) else "" for x in values)
+
+
+def _node_output(name: str, compute, values: tuple, group: str, seg: dict, idx: SpecIndex, deadline):
+    """
+    compute(values, group, seg) có chặn (product_name.limits) — chỉ gọi khi có deadline hoặc value bị cắt:
+    - đã quá deadline của specsheet -> ra như thiếu field + lỗi budget, không chạy rule (model luôn chạy: không regex)
+    - value bị cắt vì quá dài -> thêm lỗi cho node đọc value đó
+    """
+    if deadline is not None and name != "model" and time.perf_counter() > deadline:
+        parts, _ = compute(_empty_values(values), group, {})
+        out = (parts, [f"{limits.BUDGET_ERROR} ({limits.SHEET_BUDGET_MS:g} ms): {name}"])
+    else:
+        out = compute(values, group, seg)
+    if idx.truncated:
+        read = [v for x in values for v in (x if isinstance(x, tuple) else (x,))]
+        extra = [
+            f"Value quá dài ở {field}: {full} ký tự, chỉ đọc {len(short)} ký tự đầu"
+            for field in NODE_FIELDS[name]
+            for short, full in idx.truncated.get(field, {}).items()
+            if short in read  # field nhiều alias: chỉ báo khi node thật sự đọc value bị cắt
+        ]
+        if extra:
+            out = (out[0], out[1] + extra)
+    return out
+
+
+def _run_nodes(kv, group: str, segments: dict, timer) -> dict:
+    # deadline kiểm trước mỗi node (_node_output), không trong vòng lặp của node: input mỗi node đã bị cap
+    # (SpecIndex) nên 1 node có trần thời gian, chèn kiểm giờ vào vòng màu / ổ cứng chỉ tốn thêm ở đường nóng
+    timer = timer or NULL_TIMER
+    timer.reset()
+    lap = timer.lap
+    deadline = limits.deadline()
+    idx = _spec_index(kv)
+    seg = segments or {}
+    lap("index")
+
+    outputs = {}
+    guarded = deadline is not None or bool(idx.truncated)
+    for name, read, _, compute in SEGMENT_NODES:
+        if guarded:
+            outputs[name] = _node_output(name, compute, read(idx), group, seg, idx, deadline)
+        else:
+            outputs[name] = compute(read(idx), group, seg)
+        lap(name)
+    return outputs
+
+
+def build_name_from_kv(kv, group: str, segments: dict = None, timer=None):
+    """
+    Note: chưa hoàn thiện logic HDD, wireless KB&M,GPU warranty
+    kv: dict {key_norm: value} hoặc SpecIndex đã dựng sẵn
+    segments: mã đã tính sẵn (vd. vector hoá theo cột ở product_name.wide), key:
+              "ram", "psu", "wf", "os" -> str; "battery" -> (str, errors)
+    timer: StageTimer (product_name.timing) để đo từng bước; None -> không đo
+    """
+    outputs = _run_nodes(kv, group, segments, timer)
+    result = assemble_name(outputs, group)
+    if timer is not None:
+        timer.lap("assemble")
+    return result
+
+
+def build_name_outputs(kv, group: str, segments: dict = None, timer=None):
+    """Như build_name_from_kv nhưng trả thêm output từng node: (final_name, errors, outputs)."""
+    outputs = _run_nodes(kv, group, segments, timer)
+    final_name, errors = assemble_name(outputs, group)
+    if timer is not None:
+        timer.lap("assemble")
+    return final_name, errors, outputs
+
+
+def build_name_detail(kv, group: str, segments: dict = None, timer=None):
+    """Như build_name_from_kv nhưng trả thêm segment: (final_name, errors, {cột SEGMENT_COLUMNS: chuỗi})."""
+    final_name, errors, outputs = build_name_outputs(kv, group, segments, timer)
+    return final_name, errors, segment_values(outputs)
@@ -0,0 +1,91 @@
+# product_name/export.py
+# Xuất kết quả đặt tên theo dòng, ghi ngay khi kết quả về (không giữ cả batch trong bộ nhớ)
+# - .xlsx: xlsxwriter constant_memory (mỗi dòng flush xuống file tạm, bộ nhớ phẳng)
+# - .csv: csv.writer, flush từng dòng
+# Cột: file, group, final_name, [segment: model, sales_model, cpu, ram, ssd, ...], errors
+import csv
+
+from .core import SEGMENT_COLUMNS
+
+RESULT_COLUMNS = ["file", "group", "final_name", "errors"]
+EXPORT_COLUMNS = ["file", "group", "final_name", *SEGMENT_COLUMNS, "errors"]
+
+
+def _row(r: dict, columns: list) -> list:
+    segs = r.get("segments") or {}
+    out = []
+    for c in columns:
+        if c == "errors":
+            out.append(" | ".join(r["errors"]))
+        elif c in r:
+            out.append(r[c])
+        else:
+            out.append(segs.get(c, ""))
+    return out
+
+
+class CsvResultWriter:
+    """Ghi kết quả ra CSV (file-like text) từng dòng."""
+
+    def __init__(self, f, columns: list = EXPORT_COLUMNS):
+        self.columns = columns
+        self.rows = 0
+        self._f = f
+        self._writer = csv.writer(f)
+        self._writer.writerow(columns)
+
+    def write(self, r: dict) -> None:
+        self._writer.writerow(_row(r, self.columns))
+        self.rows += 1
+
+    def close(self) -> None:
+        self._f.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class XlsxResultWriter:
+    """
+    Ghi kết quả ra .xlsx (đường dẫn hoặc file-like nhị phân) bằng xlsxwriter constant_memory:
+    dòng phải ghi theo thứ tự và được đẩy xuống file tạm ngay -> bộ nhớ không tăng theo số dòng.
+    """
+
+    def __init__(self, target, columns: list = EXPORT_COLUMNS):
+        import xlsxwriter
+
+        self.columns = columns
+        self.rows = 0
+        self._wb = xlsxwriter.Workbook(target, {"constant_memory": True})
+        self._ws = self._wb.add_worksheet("Results")
+        # set_column/freeze_panes phải gọi trước khi ghi dòng (constant_memory)
+        widths = {"file": 40, "final_name": 100, "errors": 60}
+        for i, c in enumerate(columns):
+            self._ws.set_column(i, i, widths.get(c, 14))
+        self._ws.freeze_panes(1, 0)
+        self._ws.write_row(0, 0, columns, self._wb.add_format({"bold": True}))
+
+    def write(self, r: dict) -> None:
+        self.rows += 1
+        self._ws.write_row(self.rows, 0, _row(r, self.columns))
+
+    def close(self) -> None:
+        self._wb.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def write_results(results, target, fmt: str = "xlsx", columns: list = EXPORT_COLUMNS) -> int:
+    """Ghi iterable kết quả (dict như batch.name_specsheet) ra target theo fmt 'xlsx' | 'csv'. Trả về số dòng."""
+    writer_cls = XlsxResultWriter if fmt == "xlsx" else CsvResultWriter
+    with writer_cls(target, columns) as w:
+        for r in results:
+            w.write(r)
+    return w.rows
@@ -0,0 +1,54 @@
+# product_name/incremental.py
+# Đặt tên tăng dần: nhớ output từng node (core.SEGMENT_NODES) của lần build trước,
+# lần sau chỉ tính lại node có input đổi rồi ghép lại
+# - đổi group: chỉ tính lại display / touch_fp_cam / psu / battery / kbm (+ prefix khi ghép)
+# - sửa 1 dòng spec: chỉ tính lại node đọc field đó
+from . import limits
+from .core import SEGMENT_NODES, _node_output, _spec_index, assemble_name
+from .timing import NULL_TIMER
+
+
+class IncrementalNamer:
+    """
+    1 namer cho 1 specsheet đang mở (UI: theo file upload / SKU).
+    recomputed: tên các node đã tính lại ở lần build gần nhất (debug / đo).
+    """
+
+    __slots__ = ("_memo", "recomputed")
+
+    def __init__(self):
+        self._memo = {}  # tên node -> (key input, (parts, errors))
+        self.recomputed = []
+
+    def build(self, kv, group: str, timer=None):
+        """Như build_name_from_kv(kv, group) -> (final_name, errors)."""
+        timer = timer or NULL_TIMER
+        timer.reset()
+        deadline = limits.deadline()
+        idx = _spec_index(kv)
+        timer.lap("index")
+
+        outputs = {}
+        recomputed = []
+        for name, read, uses_group, compute in SEGMENT_NODES:
+            values = read(idx)
+            key = (values, group) if uses_group else values
+            hit = self._memo.get(name)
+            if hit is not None and hit[0] == key:
+                outputs[name] = hit[1]
+                continue
+            out = _node_output(name, compute, values, group, {}, idx, deadline)
+            if not limits.over_budget(out[1]):  # kết quả bị cắt vì hết giờ: lần sau tính lại
+                self._memo[name] = (key, out)
+            outputs[name] = out
+            recomputed.append(name)
+            timer.lap(name)
+        self.recomputed = recomputed
+
+        result = assemble_name(outputs, group)
+        timer.lap("assemble")
+        return result
+
+    def clear(self) -> None:
+        self._memo.clear()
+        self.recomputed = []
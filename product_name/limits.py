@@ -0,0 +1,70 @@
+# product_name/limits.py
+# Chặn value bất thường (blob marketing vài KB dán vào 1 ô, file cố ý gây chậm) trước khi tới regex:
+# - ingest: mỗi ô key / value đọc từ file cắt còn MAX_CELL_LEN ký tự (core._value_str / _norm_key)
+# - rule: value của từng field cắt còn cap riêng trước khi vào simplifier (core.SpecIndex), tên có lỗi "Value quá dài"
+# - budget: mỗi specsheet có tối đa SHEET_BUDGET_MS cho các node đặt tên; quá hạn -> các node còn lại ra như
+#   thiếu field (N/A_Battery, NOS, ...) + lỗi "Quá thời gian xử lý", không giữ worker.
+#   Tên phụ thuộc tải máy nên mặc định tắt (thư viện, UI); CLI / server bật SERVICE_BUDGET_MS (--budget-ms).
+#   Deadline chỉ kiểm giữa các node, không ngắt giữa 1 node (vòng màu, vòng token ổ cứng...): 1 node chạy trên
+#   input đã bị cap field (và tối đa MAX_COLOR_VALUES màu) nên tự có trần; budget có thể lố tối đa 1 node như vậy
+# Đổi bằng env PRODUCT_NAME_MAX_CELL / PRODUCT_NAME_MAX_FIELD / PRODUCT_NAME_SHEET_BUDGET_MS hoặc configure_limits()
+import os
+import time
+
+MAX_CELL_LEN = int(os.environ.get("PRODUCT_NAME_MAX_CELL", "4096"))
+DEFAULT_FIELD_LEN = int(os.environ.get("PRODUCT_NAME_MAX_FIELD", "512"))
+SHEET_BUDGET_MS = float(os.environ.get("PRODUCT_NAME_SHEET_BUDGET_MS", "0"))  # 0 = tắt
+SERVICE_BUDGET_MS = float(os.environ.get("PRODUCT_NAME_SHEET_BUDGET_MS", "1000"))  # mặc định của CLI / server
+MAX_COLOR_VALUES = 16  # số key màu tối đa đọc từ 1 specsheet (mọi key chứa 'color' đều được đọc)
+
+FIELD_LEN = {}  # field -> cap riêng, vd. configure_limits(ram=200)
+
+BUDGET_ERROR = "Quá thời gian xử lý"
+
+
+def deadline():
+    """perf_counter() hết budget của specsheet bắt đầu từ bây giờ; None = không giới hạn."""
+    return time.perf_counter() + SHEET_BUDGET_MS / 1000 if SHEET_BUDGET_MS > 0 else None
+
+
+def over_budget(errors) -> bool:
+    """Kết quả bị cắt vì hết budget (phụ thuộc tải máy) -> không lưu cache / memo."""
+    return any(e.startswith(BUDGET_ERROR) for e in errors)
+
+
+def configure_limits(max_cell: int = None, max_field: int = None, budget_ms: float = None, **fields) -> None:
+    """
+    configure_limits(max_cell=8192, max_field=1024, budget_ms=500) hoặc cap theo field: configure_limits(ram=200).
+    Field: tên trong core.SPEC_FIELDS + "processor", "warranty" (key bất kỳ chứa chữ đó), "color".
+    budget_ms=0 -> tắt budget.
+    """
+    global MAX_CELL_LEN, DEFAULT_FIELD_LEN, SHEET_BUDGET_MS
+    from .core import LIMIT_FIELDS
+
+    unknown = set(fields) - set(LIMIT_FIELDS)
+    if unknown:
+        raise ValueError(f"Không có field: {sorted(unknown)}")
+    if max_cell is not None:
+        MAX_CELL_LEN = max_cell
+    if max_field is not None:
+        DEFAULT_FIELD_LEN = max_field
+    if budget_ms is not None:
+        SHEET_BUDGET_MS = budget_ms
+    FIELD_LEN.update(fields)
+
+
+def init_worker(snapshot: dict) -> None:
+    """
+    initializer của process pool: initializer=init_worker, initargs=(current_limits(),) -> worker dùng cap / budget
+    của process cha (pool spawn không thừa kế configure_limits()).
+    """
+    configure_limits(snapshot["max_cell"], snapshot["max_field"], snapshot["budget_ms"], **snapshot["fields"])
+
+
+def current_limits() -> dict:
+    return {
+        "max_cell": MAX_CELL_LEN,
+        "max_field": DEFAULT_FIELD_LEN,
+        "budget_ms": SHEET_BUDGET_MS,
+        "fields": dict(FIELD_LEN),
+    }
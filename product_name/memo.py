@@ -0,0 +1,78 @@
+# product_name/memo.py
+# Memo cho các simplifier thuần (chuỗi -> mã): catalog lặp lại rất nhiều value giống nhau
+# ("16GB DDR5 ...", "Windows 11 Home", "3-cell 50WHrs") -> tra LRU thay vì chạy lại regex.
+# - mỗi hàm 1 LRU có giới hạn (functools.lru_cache), đổi kích thước bằng configure_memos()
+# - memo_stats(): hits / misses / size theo từng hàm; clear_memos(): xoá khi đổi rule lúc chạy
+import functools
+import os
+
+DEFAULT_MAXSIZE = int(os.environ.get("PRODUCT_NAME_MEMO_SIZE", "4096"))
+
+MEMOS = {}  # name -> Memo, theo thứ tự đăng ký
+
+
+class Memo:
+    """Bọc 1 hàm thuần bằng LRU có giới hạn. Kết quả được dùng chung giữa các lần gọi -> không sửa tại chỗ."""
+
+    def __init__(self, name: str, func, maxsize: int):
+        functools.update_wrapper(self, func)
+        self.name = name
+        self.func = func
+        self.maxsize = maxsize
+        self._cached = functools.lru_cache(maxsize=maxsize)(func)
+
+    def __call__(self, *args):
+        return self._cached(*args)
+
+    def configure(self, maxsize: int) -> None:
+        """Đổi kích thước (xoá nội dung cũ); maxsize=0 -> tắt memo."""
+        self.maxsize = maxsize
+        self._cached = functools.lru_cache(maxsize=maxsize)(self.func)
+
+    def clear(self) -> None:
+        self._cached.cache_clear()
+
+    def info(self) -> dict:
+        i = self._cached.cache_info()
+        calls = i.hits + i.misses
+        return {
+            "name": self.name,
+            "hits": i.hits,
+            "misses": i.misses,
+            "size": i.currsize,
+            "maxsize": self.maxsize,
+            "hit_rate": (i.hits / calls) if calls else 0.0,
+        }
+
+    def __repr__(self):
+        return f"Memo({self.name}, maxsize={self.maxsize})"
+
+
+def memoize(name: str, maxsize: int = None):
+    """Decorator: đăng ký hàm vào MEMOS. Trùng tên là lỗi lập trình -> raise."""
+    def wrap(func):
+        if name in MEMOS:
+            raise ValueError(f"Memo trùng tên: {name}")
+        m = MEMOS[name] = Memo(name, func, DEFAULT_MAXSIZE if maxsize is None else maxsize)
+        return m
+    return wrap
+
+
+def memo_stats() -> list:
+    return [m.info() for m in MEMOS.values()]
+
+
+def clear_memos() -> None:
+    for m in MEMOS.values():
+        m.clear()
+
+
+def configure_memos(maxsize: int = None, **sizes) -> None:
+    """configure_memos(8192) cho mọi hàm, hoặc theo tên: configure_memos(cpu=20_000, os=0)."""
+    unknown = set(sizes) - set(MEMOS)
+    if unknown:
+        raise ValueError(f"Không có memo: {sorted(unknown)}")
+    for name, m in MEMOS.items():
+        size = sizes.get(name, maxsize)
+        if size is not None:
+            m.configure(size)
@@ -0,0 +1,198 @@
+# product_name/metrics.py
+# Metrics trong process cho pipeline đặt tên, xuất dạng Prometheus text (0.0.4)
+# - counter: số specsheet theo group, specsheet lỗi, lỗi theo loại, segment rơi về mặc định (N/A_Color, PSU_N/A,
+#   N/A_Battery, Warranty_input, NOS, display N/A — theo "fallbacks" của kết quả, tính từ output từng node,
+#   xem core.segment_fallbacks; cache hit dùng danh sách lưu cùng dòng cache), cache hit/miss, bản trùng (dedup)
+# - histogram: thời gian parse (đọc file -> kv) và build (cache + đặt tên) mỗi specsheet
+# - METRICS mặc định là NULL_METRICS: record() không làm gì -> gần như 0 chi phí khi tắt;
+#   enable_metrics() bật cho cả process (CLI --metrics-file, server --metrics -> GET /metrics)
+# Ghi ở process gọi (như log_timings): worker của pool trả kết quả kèm "timings", process cha đếm.
+import bisect
+import os
+import re
+
+# giây; đặt tên 1 specsheet thường < 1 ms, đọc .xlsx vài ms
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+MAX_SERIES = 500  # số bộ label tối đa mỗi metric; quá -> gộp vào label "other" (lỗi lạ không làm phình registry)
+
+_R_EXC_PREFIX = re.compile(r"([A-Za-z_][\w.]*): ")  # "KeyError: ..." (batch ghi exception dạng này)
+_R_GROUP_SUFFIX = re.compile(r"\s+cho\s+(?:nhóm\s+)?\S+$")
+
+
+def error_type(msg: str) -> str:
+    """
+    Thông báo lỗi -> loại (label ít giá trị):
+    'Thiếu Battery cho NB' -> 'Thiếu Battery'; 'Value quá dài ở ram: 4096 ký tự...' -> 'Value quá dài ở ram';
+    'KeyError: ...' -> 'KeyError'.
+    """
+    m = _R_EXC_PREFIX.match(msg)
+    if m:
+        return m.group(1)
+    return _R_GROUP_SUFFIX.sub("", msg.split(":", 1)[0]).strip()
+
+
+def _fmt(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return str(int(v)) if v == int(v) else repr(v)
+
+
+def _labels(names: tuple, values: tuple) -> str:
+    if not names:
+        return ""
+    esc = (str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') for v in values)
+    return "{" + ",".join(f'{n}="{v}"' for n, v in zip(names, esc)) + "}"
+
+
+class Counter:
+    __slots__ = ("name", "help", "labelnames", "values")
+
+    def __init__(self, name: str, help: str, labelnames: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.values = {}  # tuple label -> số
+
+    def inc(self, *labels, n: float = 1) -> None:
+        if labels not in self.values and len(self.values) >= MAX_SERIES:
+            labels = ("other",) * len(self.labelnames)
+        self.values[labels] = self.values.get(labels, 0) + n
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, v in self.values.items():
+            lines.append(f"{self.name}{_labels(self.labelnames, labels)} {_fmt(v)}")
+        return lines
+
+
+class Gauge(Counter):
+    __slots__ = ()
+
+    def set(self, v: float, *labels) -> None:
+        self.values[labels] = v
+
+    def render(self) -> list:
+        lines = super().render()
+        lines[1] = f"# TYPE {self.name} gauge"
+        return lines
+
+
+class Histogram:
+    __slots__ = ("name", "help", "buckets", "counts", "sum", "count")
+
+    def __init__(self, name: str, help: str, buckets: tuple = LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # ô cuối = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, v)] += 1
+        self.sum += v
+        self.count += 1
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        acc = 0
+        for le, c in zip((*self.buckets, float("inf")), self.counts):
+            acc += c
+            lines.append(f'{self.name}_bucket{{le="{_fmt(le)}"}} {acc}')
+        lines.append(f"{self.name}_sum {_fmt(self.sum)}")
+        lines.append(f"{self.name}_count {self.count}")
+        return lines
+
+
+class Metrics:
+    """Registry của 1 process; record(r) nhận 1 kết quả như batch.name_specsheet."""
+
+    enabled = True
+
+    def __init__(self):
+        self.sheets = Counter("product_name_sheets_total", "Số specsheet đã đặt tên", ("group",))
+        self.failed = Counter("product_name_sheets_failed_total", "Số specsheet không ra được tên", ("group",))
+        self.errors = Counter("product_name_errors_total", "Lỗi / cảnh báo trong kết quả theo loại", ("type",))
+        self.fallbacks = Counter("product_name_segment_fallbacks_total",
+                                 "Segment ra mã mặc định (N/A_Color, PSU_N/A, N/A_Battery, ...)",
+                                 ("segment",))
+        self.cache = Counter("product_name_cache_requests_total", "Tra cache tên", ("result",))
+        self.duplicates = Counter("product_name_duplicates_total", "Specsheet trùng dùng lại kết quả (dedup)")
+        self.parse = Histogram("product_name_parse_seconds", "Thời gian đọc specsheet -> kv")
+        self.build = Histogram("product_name_build_seconds", "Thời gian tra cache + đặt tên 1 specsheet")
+        self.gauges = {}
+
+    def record(self, r: dict) -> None:
+        self.sheets.inc(r["group"])
+        name = r["final_name"]
+        if not name:
+            self.failed.inc(r["group"])
+        for e in r["errors"]:
+            self.errors.inc(error_type(e))
+        for segment in r.get("fallbacks", ()):
+            self.fallbacks.inc(segment)
+        if r.get("duplicate_of"):
+            self.duplicates.inc()
+        t = r.get("timings")
+        if not t:
+            return
+        # cache hit: có bước tra cache nhưng không có bước build (index, node, assemble)
+        if "cache_lookup" in t:
+            self.cache.inc("hit" if "index" not in t else "miss")
+        read_ms = t.get("read")
+        if read_ms is not None:
+            self.parse.observe(read_ms / 1000)
+        self.build.observe((sum(t.values()) - (read_ms or 0)) / 1000)
+
+    def gauge(self, name: str, help: str, value: float) -> None:
+        """Giá trị tức thời (vd. số tên đang chờ trong server), đặt lại mỗi lần xuất."""
+        g = self.gauges.get(name)
+        if g is None:
+            g = self.gauges[name] = Gauge(name, help)
+        g.set(value)
+
+    def render(self) -> str:
+        lines = []
+        for m in (self.sheets, self.failed, self.errors, self.fallbacks, self.cache, self.duplicates,
+                  self.parse, self.build, *self.gauges.values()):
+            lines += m.render()
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> None:
+        """Ghi ra file (textfile collector của node_exporter): ghi file tạm rồi đổi tên, không ai đọc file dở."""
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp, path)
+
+
+class _NullMetrics:
+    __slots__ = ()
+    enabled = False
+
+    def record(self, r: dict) -> None:
+        pass
+
+    def gauge(self, name: str, help: str, value: float) -> None:
+        pass
+
+    def render(self) -> str:
+        return ""
+
+
+NULL_METRICS = _NullMetrics()
+METRICS = NULL_METRICS
+
+
+def enable_metrics() -> Metrics:
+    """Bật metrics cho process (gọi nhiều lần vẫn giữ registry cũ)."""
+    global METRICS
+    if not METRICS.enabled:
+        METRICS = Metrics()
+    return METRICS
+
+
+def disable_metrics() -> None:
+    global METRICS
+    METRICS = NULL_METRICS
@@ -0,0 +1,254 @@
+# product_name/reader.py
+# Đọc specsheet dạng streaming -> dict {key_norm: value}, không dựng DataFrame
+# - .xlsx (openpyxl read-only): cùng kết quả với pd.read_excel(..., header=None) + _kv_map_from_specsheet
+# - .csv / .tsv / .jsonl / .parquet: export trực tiếp từ PIM, cùng cách chuẩn hoá key/value
+# - bảng dài (sku, key, value) nhiều sản phẩm: iter_long_table() đọc dần, trả từng SKU một
+# - workbook nhiều sheet (mỗi sheet 1 SKU): list_sheets() chỉ đọc mục lục, iter_sheet_rows() đọc lần lượt từng sheet
+import contextlib
+import csv
+import io
+import itertools
+import json
+import os
+
+from .core import _norm_key, _to_str, _value_str
+
+# đuôi file -> format
+SPEC_FORMATS = {".xlsx": "xlsx", ".csv": "csv", ".tsv": "tsv", ".jsonl": "jsonl", ".ndjson": "jsonl",
+                ".parquet": "parquet"}
+
+# chuỗi mà pd.read_excel mặc định coi là NaN (pandas STR_NA_VALUES)
+_PANDAS_NA_STRINGS = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+    "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+# ô lỗi công thức (openpyxl trả về dạng chuỗi, pandas đổi thành NaN)
+_EXCEL_ERRORS = frozenset({"#NULL!", "#DIV/0!", "#VALUE!", "#REF!", "#NAME?", "#NUM!", "#N/A"})
+
+
+def _cell_value(v):
+    """Chuẩn hoá giá trị ô giống pandas: số nguyên dạng float -> int, ô lỗi/chuỗi NA -> None."""
+    if isinstance(v, float):
+        return int(v) if v.is_integer() else v
+    if isinstance(v, str) and (v in _PANDAS_NA_STRINGS or v in _EXCEL_ERRORS):
+        return None
+    return v
+
+
+def spec_format(name: str):
+    """'xlsx' / 'csv' / 'tsv' / 'jsonl' / 'parquet' theo đuôi file, None nếu không hỗ trợ."""
+    return SPEC_FORMATS.get(os.path.splitext(name)[1].lower())
+
+
+@contextlib.contextmanager
+def _open_binary(src):
+    """Đường dẫn / bytes / file-like -> file-like nhị phân (chỉ đóng file tự mở)."""
+    if isinstance(src, (bytes, bytearray, memoryview)):
+        yield io.BytesIO(src)
+    elif isinstance(src, (str, os.PathLike)):
+        with open(src, "rb") as f:
+            yield f
+    else:
+        yield src
+
+
+def iter_rows(src, fmt: str = "xlsx", sheet: str = None):
+    """
+    Các hàng thô (tuple giá trị ô) của sheet/bảng đầu tiên (xlsx: hoặc sheet tên 'sheet'), đọc dần theo format.
+    - csv/tsv: không header, mọi ô là chuỗi (UTF-8, bỏ BOM)
+    - jsonl: mỗi dòng [key, value] hoặc {"key": ..., "value": ...}
+    - parquet: 2 cột đầu, đọc theo từng batch (cần pyarrow)
+    """
+    with _open_binary(src) as f:
+        if fmt == "xlsx":
+            from openpyxl import load_workbook
+
+            wb = load_workbook(f, read_only=True, data_only=True)
+            try:
+                ws = wb[sheet] if sheet is not None else wb.worksheets[0]
+                # file từ một số tool ghi sai <dimension>; tính lại theo dữ liệu thật
+                ws.reset_dimensions()
+                yield from ws.iter_rows(values_only=True)
+            finally:
+                wb.close()
+        elif fmt in ("csv", "tsv"):
+            text = io.TextIOWrapper(f, encoding="utf-8-sig", newline="")
+            try:
+                yield from csv.reader(text, delimiter="\t" if fmt == "tsv" else ",")
+            finally:
+                text.detach()  # không đóng file của caller
+        elif fmt == "jsonl":
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    yield (obj.get("key"), obj.get("value")) if isinstance(obj, dict) else tuple(obj)
+        elif fmt == "parquet":
+            pf = _parquet_file(f)
+            cols = pf.schema_arrow.names[:2]
+            for batch in pf.iter_batches(batch_size=_PARQUET_BATCH, columns=cols):
+                yield from zip(*(c.to_pylist() for c in batch.columns))
+        else:
+            raise ValueError(f"Không hỗ trợ format specsheet: {fmt}")
+
+
+_PARQUET_BATCH = 8192
+
+
+def _parquet_file(f):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Đọc .parquet cần pyarrow: pip install 'product-name-tool[parquet]'") from e
+    return pq.ParquetFile(f)
+
+
+def kv_from_rows(rows) -> dict:
+    """
+    Hàng thô -> dict {key_norm: value} như _kv_map_from_specsheet
+    - 1 lượt, chỉ giữ giá trị 2 ô đầu (Key | Value)
+    - Nếu cả bảng chỉ có 1 cột dạng "Key: Value" thì tách theo ':'
+    """
+    kv = {}
+    kv_split = {}  # dùng khi bảng chỉ có 1 cột; bỏ ngay khi thấy cột thứ 2
+    for row in rows:
+        if not row:
+            continue
+        key = _cell_value(row[0])
+        if kv_split is not None and any(_cell_value(x) is not None for x in row[1:]):
+            kv_split = None
+
+        k = _norm_key(key)
+        if k:
+            kv[k] = _value_str(_cell_value(row[1])) if len(row) > 1 else ""
+        if kv_split is not None:
+            s = "" if key is None else str(key)
+            k1 = _norm_key(s.split(":", 1)[0])
+            if k1:
+                kv_split[k1] = _value_str(s.split(":", 1)[1]) if ":" in s else ""
+    return kv if kv_split is None else kv_split
+
+
+def read_specsheet_kv(src, fmt: str = "xlsx", sheet: str = None) -> dict:
+    """Đọc specsheet (đường dẫn, bytes hoặc file-like) theo format -> dict {key_norm: value}."""
+    return kv_from_rows(iter_rows(src, fmt, sheet))
+
+
+# =========================
+# Workbook nhiều sheet
+# =========================
+_NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+
+def list_sheets(src) -> list:
+    """
+    Tên các worksheet của .xlsx theo thứ tự tab (bỏ chartsheet).
+    Chỉ đọc xl/workbook.xml + rels trong zip, không giải mã sheet / shared strings nào.
+    """
+    import xml.etree.ElementTree as ET
+    import zipfile
+
+    with _open_binary(src) as f, zipfile.ZipFile(f) as zf:
+        try:
+            rels = ET.fromstring(zf.read("xl/_rels/workbook.xml.rels"))
+            workbook = ET.fromstring(zf.read("xl/workbook.xml"))
+        except KeyError:
+            workbook = None
+        if workbook is not None:
+            types = {r.get("Id"): r.get("Type", "") for r in rels.iter(f"{_NS_PKG_REL}Relationship")}
+            return [s.get("name") for s in workbook.iter(f"{_NS_MAIN}sheet")
+                    if types.get(s.get(f"{_NS_REL}id"), "").endswith("/worksheet")]
+
+    # workbook đặt ở đường dẫn khác chuẩn -> để openpyxl tự tìm (vẫn không đọc dữ liệu sheet)
+    from openpyxl import load_workbook
+
+    with _open_binary(src) as f:
+        wb = load_workbook(f, read_only=True)
+        try:
+            return [ws.title for ws in wb.worksheets]
+        finally:
+            wb.close()
+
+
+def iter_sheet_rows(src, sheets: list = None):
+    """
+    Yield (tên sheet, iterator hàng thô) lần lượt cho các sheet 'sheets' (None: mọi worksheet), mở workbook 1 lần.
+    Đọc xong sheet này mới sang sheet sau -> chỉ 1 sheet nằm trong bộ nhớ.
+    """
+    from openpyxl import load_workbook
+
+    with _open_binary(src) as f:
+        wb = load_workbook(f, read_only=True, data_only=True)
+        try:
+            for name in sheets if sheets is not None else [ws.title for ws in wb.worksheets]:
+                yield name, _sheet_rows(wb, name)
+        finally:
+            wb.close()
+
+
+def _sheet_rows(wb, name: str):
+    # tra sheet khi bắt đầu đọc -> sheet không tồn tại chỉ làm lỗi sheet đó (KeyError), không dừng cả workbook
+    ws = wb[name]
+    ws.reset_dimensions()
+    yield from ws.iter_rows(values_only=True)
+
+
+# =========================
+# Bảng dài: mỗi hàng (sku, key, value), nhiều sản phẩm trong 1 file
+# =========================
+_LONG_COLUMNS = ("sku", "key", "value")
+
+
+def _long_indices(header) -> list:
+    names = [_to_str(h).lower() for h in header]
+    try:
+        return [names.index(c) for c in _LONG_COLUMNS]
+    except ValueError:
+        raise ValueError(
+            f"Bảng dài cần header có các cột {', '.join(_LONG_COLUMNS)} (đang có: {names})"
+        ) from None
+
+
+def _iter_records(src, fmt: str):
+    """(sku, key, value) theo thứ tự trong file."""
+    if fmt == "jsonl":
+        with _open_binary(src) as f:
+            for line in f:
+                if line.strip():
+                    obj = json.loads(line)
+                    yield obj.get("sku"), obj.get("key"), obj.get("value")
+        return
+    if fmt == "parquet":
+        with _open_binary(src) as f:
+            pf = _parquet_file(f)
+            names = pf.schema_arrow.names
+            cols = [names[i] for i in _long_indices(names)]
+            for batch in pf.iter_batches(batch_size=_PARQUET_BATCH, columns=cols):
+                yield from zip(*(batch.column(c).to_pylist() for c in cols))
+        return
+
+    rows = iter_rows(src, fmt)
+    header = next(rows, None)
+    if header is None:
+        return
+    i_sku, i_key, i_val = _long_indices(header)
+    for row in rows:
+        n = len(row)
+        yield (row[i_sku] if i_sku < n else None, row[i_key] if i_key < n else None,
+               row[i_val] if i_val < n else None)
+
+
+def iter_long_table(src, fmt: str):
+    """
+    Bảng dài (sku, key, value) -> yield (sku, kv) lần lượt từng SKU, không đọc cả file vào bộ nhớ.
+    Các hàng của 1 SKU phải nằm liền nhau (export sort theo sku); hàng thiếu sku bị bỏ.
+    """
+    records = ((sku, k, v) for sku, k, v in _iter_records(src, fmt) if _to_str(_cell_value(sku)))
+    for sku, group in itertools.groupby(records, key=lambda r: r[0]):
+        kv = {}
+        for _, key, val in group:
+            k = _norm_key(_cell_value(key))
+            if k:
+                kv[k] = _value_str(_cell_value(val))
+        yield _to_str(_cell_value(sku)), kv
@@ -0,0 +1,78 @@
+# product_name/rules.py
+# Rule engine: mọi regex của các simplifier được compile 1 lần lúc import vào registry,
+# kèm bộ đếm calls/hits cho từng rule để kiểm tra thứ tự rule có hợp lý không.
+import re
+
+RULES = {}  # (field, name) -> Rule, theo thứ tự đăng ký
+
+
+class Rule:
+    """1 regex đã compile của 1 field. calls = số lần chạy, hits = số lần match (hoặc số match/số chỗ thay)."""
+
+    __slots__ = ("field", "name", "pattern", "calls", "hits")
+
+    def __init__(self, field: str, name: str, pattern: str, flags: int = 0):
+        self.field = field
+        self.name = name
+        self.pattern = re.compile(pattern, flags)
+        self.calls = 0
+        self.hits = 0
+
+    def search(self, text: str):
+        self.calls += 1
+        m = self.pattern.search(text)
+        if m:
+            self.hits += 1
+        return m
+
+    def finditer(self, text: str) -> list:
+        self.calls += 1
+        ms = list(self.pattern.finditer(text))
+        self.hits += len(ms)
+        return ms
+
+    def sub(self, repl: str, text: str) -> str:
+        self.calls += 1
+        out, n = self.pattern.subn(repl, text)
+        self.hits += n
+        return out
+
+    def split(self, text: str) -> list:
+        self.calls += 1
+        parts = self.pattern.split(text)
+        self.hits += len(parts) - 1
+        return parts
+
+    def __repr__(self):
+        return f"Rule({self.field}.{self.name}, calls={self.calls}, hits={self.hits})"
+
+
+def rule(field: str, name: str, pattern: str, flags: int = 0) -> Rule:
+    """Compile + đăng ký rule vào RULES. Trùng (field, name) là lỗi lập trình -> raise."""
+    key = (field, name)
+    if key in RULES:
+        raise ValueError(f"Rule trùng tên: {field}.{name}")
+    r = Rule(field, name, pattern, flags)
+    RULES[key] = r
+    return r
+
+
+def rule_stats(field: str = None) -> list:
+    """Bộ đếm theo thứ tự đăng ký: [{field, name, calls, hits, hit_rate}, ...]."""
+    return [
+        {
+            "field": r.field,
+            "name": r.name,
+            "calls": r.calls,
+            "hits": r.hits,
+            "hit_rate": (r.hits / r.calls) if r.calls else 0.0,
+        }
+        for r in RULES.values()
+        if field is None or r.field == field
+    ]
+
+
+def reset_rule_stats() -> None:
+    for r in RULES.values():
+        r.calls = 0
+        r.hits = 0
@@ -0,0 +1,418 @@
+# product_name/server.py
+# HTTP service đặt tên cho ERP (asyncio, chỉ dùng thư viện chuẩn) — chạy: product-name serve --port 8080
+#   GET  /health        -> trạng thái pool, số việc đang chờ
+#   POST /name          -> {"group": "NB", "kv": {"Sales Model Name": "...", ...}}
+#   POST /name/batch    -> JSON lines (mỗi dòng {"group", "kv", "id"?}) hoặc body .xlsx / .zip (?group=NB);
+#                          application/octet-stream: nhận dạng theo magic bytes (PK.. = xlsx/zip, PAR1 = parquet)
+#                          hoặc đuôi của ?name=, không đoán được -> 415
+#   GET  /metrics       -> Prometheus text (chạy với --metrics, xem product_name.metrics)
+# - build tên chạy trên process pool; các request /name lẻ được gom thành lô (micro-batch) trước khi gửi
+# - backpressure: quá max_pending tên đang chờ -> 503 + Retry-After, không xếp hàng vô hạn;
+#   1 request /name/batch nhiều hơn max_pending tên thì không bao giờ vào được -> 413 (chia nhỏ lô), không 503
+import asyncio
+import io
+import json
+import os
+import sys
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from .batch import UploadTooLarge, expand_uploads, name_specsheet
+from .core import GROUPS, SpecIndex, build_name_from_kv, build_name_outputs, segment_fallbacks
+from .limits import SERVICE_BUDGET_MS, configure_limits, current_limits, init_worker
+from .metrics import enable_metrics
+from .reader import spec_format
+from .timing import StageTimer
+
+MAX_BODY = 64 * 1024 * 1024
+MAX_UNZIPPED = 512 * 1024 * 1024  # tổng byte sau khi bung 1 upload .zip (body chỉ giới hạn kích thước nén)
+MAX_ZIP_MEMBERS = 10_000  # số specsheet tối đa trong 1 .zip
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+            411: "Length Required", 413: "Payload Too Large", 415: "Unsupported Media Type",
+            431: "Request Header Fields Too Large", 503: "Service Unavailable"}
+
+_XLSX_TYPES = ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",)
+_ZIP_TYPES = ("application/zip", "application/x-zip-compressed")
+_BINARY_TYPES = ("application/octet-stream",)
+
+
+def _name_chunk(items: list, timed: bool = False) -> list:
+    """
+    Chạy trong worker: list (kv thô, group) -> list {"final_name", "errors"}; lỗi ghi vào errors.
+    timed: kèm "timings" (read = dựng SpecIndex, các bước build) và "fallbacks" (node ra mã mặc định)
+    cho metrics ở process server.
+    """
+    out = []
+    for kv, group in items:
+        timer = StageTimer() if timed else None
+        fallbacks = []
+        try:
+            idx = SpecIndex.from_rows(kv.items())
+            if timer is None:
+                final_name, errors = build_name_from_kv(idx, group=group)
+            else:
+                timer.lap("read")
+                final_name, errors, outputs = build_name_outputs(idx, group=group, timer=timer)
+                fallbacks = segment_fallbacks(outputs)
+        except Exception as e:
+            final_name, errors = "", [f"{type(e).__name__}: {e}"]
+        r = {"final_name": final_name, "errors": errors}
+        if timer is not None:
+            r["timings"] = timer.as_ms()
+            r["fallbacks"] = fallbacks
+        out.append(r)
+    return out
+
+
+class HttpError(Exception):
+    def __init__(self, status: int, message: str, headers: dict = None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+class Overloaded(HttpError):
+    def __init__(self):
+        super().__init__(503, "Quá tải, thử lại sau", {"Retry-After": "1"})
+
+
+class BatchTooLarge(HttpError):
+    def __init__(self, n: int, limit: int):
+        super().__init__(413, f"Lô {n} tên vượt giới hạn {limit} tên mỗi request, chia nhỏ lô rồi gửi lại")
+
+
+class NamingService:
+    """
+    Process pool + micro-batch cho /name + đếm việc đang chờ (backpressure).
+    pending = số tên đã nhận nhưng chưa trả kết quả (đang gom lô + đang chạy trong pool).
+    """
+
+    def __init__(self, workers: int = None, batch_size: int = 64, max_wait_ms: float = 2.0,
+                 max_pending: int = 20_000, metrics: bool = False, budget_ms: float = SERVICE_BUDGET_MS):
+        self.workers = workers or os.cpu_count() or 1
+        # service bật budget mỗi specsheet (thư viện mặc định tắt); budget_ms=0 -> tắt
+        configure_limits(budget_ms=budget_ms)
+        # metrics=False: METRICS là NULL_METRICS, worker không đo timings
+        self.metrics = enable_metrics() if metrics else None
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.max_pending = max_pending
+        self.pending = 0
+        self.served = 0
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker,
+                                         initargs=(current_limits(),))
+        self._queue = []  # (kv, group, future) chờ gom lô
+        self._flush_handle = None
+
+    def close(self) -> None:
+        self._pool.shutdown(cancel_futures=True)
+
+    def _reserve(self, n: int) -> None:
+        if n > self.max_pending:
+            raise BatchTooLarge(n, self.max_pending)  # chờ bao lâu cũng không đủ chỗ: retry vô ích
+        if self.pending + n > self.max_pending:
+            raise Overloaded()
+        self.pending += n
+
+    def _release(self, n: int) -> None:
+        self.pending -= n
+        self.served += n
+
+    def _observe(self, results: list, groups) -> list:
+        """Đếm metrics (nếu bật) rồi bỏ "timings" / "fallbacks" khỏi kết quả trả cho client."""
+        if self.metrics is not None:
+            for r, group in zip(results, groups):
+                self.metrics.record({"group": group, **r})
+                r.pop("timings", None)
+                r.pop("fallbacks", None)
+        return results
+
+    # ---- /name: gom lô ----
+    def name_one(self, kv: dict, group: str) -> asyncio.Future:
+        self._reserve(1)
+        loop = asyncio.get_running_loop()
+        fut = loop.create_future()
+        self._queue.append((kv, group, fut))
+        if len(self._queue) >= self.batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+        return fut
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        chunk, self._queue = self._queue, []
+        if not chunk:
+            return
+        loop = asyncio.get_running_loop()
+        done = loop.run_in_executor(self._pool, _name_chunk, [(kv, group) for kv, group, _ in chunk],
+                                    self.metrics is not None)
+
+        def deliver(f):
+            self._release(len(chunk))
+            if f.exception() is not None:
+                for *_, fut in chunk:
+                    if not fut.done():
+                        fut.set_exception(f.exception())
+                return
+            for (*_, fut), r in zip(chunk, self._observe(f.result(), [group for _, group, _ in chunk])):
+                if not fut.done():
+                    fut.set_result(r)
+
+        done.add_done_callback(deliver)
+
+    # ---- /name/batch ----
+    async def name_many(self, items: list) -> list:
+        """list (kv, group) -> list kết quả cùng thứ tự; chia lô batch_size chạy song song trên pool."""
+        self._reserve(len(items))
+        loop = asyncio.get_running_loop()
+        try:
+            chunks = [items[i:i + self.batch_size] for i in range(0, len(items), self.batch_size)]
+            timed = self.metrics is not None
+            parts = await asyncio.gather(*(loop.run_in_executor(self._pool, _name_chunk, c, timed) for c in chunks))
+        finally:
+            self._release(len(items))
+        return self._observe([r for part in parts for r in part], [group for _, group in items])
+
+    async def name_files(self, files: list, group: str) -> list:
+        """list (tên, bytes .xlsx/.zip) -> list dict như batch.name_specsheet (bỏ timings)."""
+        loop = asyncio.get_running_loop()
+        try:
+            # bung zip ngoài event loop, có giới hạn byte sau giải nén + số file (zip bomb)
+            items = await loop.run_in_executor(None, expand_uploads, files, MAX_UNZIPPED, MAX_ZIP_MEMBERS)
+        except UploadTooLarge as e:
+            raise HttpError(413, str(e))
+        except zipfile.BadZipFile as e:
+            raise HttpError(400, f"Zip không hợp lệ: {e}")
+        self._reserve(len(items))
+        try:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(self._pool, name_specsheet, name, data, group) for name, data in items)
+            )
+        finally:
+            self._release(len(items))
+        if self.metrics is not None:
+            for r in results:
+                self.metrics.record(r)
+        return [{k: r[k] for k in ("file", "group", "final_name", "errors")} for r in results]
+
+    def health(self) -> dict:
+        return {
+            "status": "ok",
+            "workers": self.workers,
+            "pending": self.pending,
+            "max_pending": self.max_pending,
+            "served": self.served,
+        }
+
+    def metrics_text(self) -> str:
+        """Prometheus text: metrics đặt tên + trạng thái pool lúc gọi."""
+        m = self.metrics
+        m.gauge("product_name_server_pending", "Số tên đang chờ (gom lô + trong pool)", self.pending)
+        m.gauge("product_name_server_max_pending", "Ngưỡng tên đang chờ trước khi trả 503", self.max_pending)
+        m.gauge("product_name_server_workers", "Số process trong pool", self.workers)
+        return m.render()
+
+
+# =========================
+# HTTP/1.1 tối giản (keep-alive, Content-Length; không hỗ trợ chunked upload)
+# =========================
+def _parse_kv_request(obj, default_group: str = None) -> tuple:
+    if not isinstance(obj, dict):
+        raise HttpError(400, "Body phải là JSON object")
+    group = obj.get("group") or default_group
+    if group not in GROUPS:
+        raise HttpError(400, f"group phải là 1 trong {GROUPS}")
+    kv = obj.get("kv")
+    if not isinstance(kv, dict):
+        raise HttpError(400, "Thiếu 'kv' (object Key -> Value)")
+    return kv, group
+
+
+def _json_body(body: bytes):
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise HttpError(400, f"JSON không hợp lệ: {e}")
+
+
+def _sniff_upload(body: bytes, name: str) -> str:
+    """
+    Body application/octet-stream -> đuôi file ('.xlsx' / '.zip' / '.parquet' / đuôi của ?name=), None = JSON lines
+    request ({"group", "kv"} mỗi dòng). PK.. là zip; zip có [Content_Types].xml là workbook .xlsx.
+    Không đoán được -> 415 (không mặc định đọc như xlsx).
+    """
+    if body[:4] == b"PK\x03\x04":
+        try:
+            with zipfile.ZipFile(io.BytesIO(body)) as zf:  # chỉ đọc mục lục
+                return ".xlsx" if "[Content_Types].xml" in zf.namelist() else ".zip"
+        except zipfile.BadZipFile as e:
+            raise HttpError(400, f"Zip không hợp lệ: {e}")
+    if body[:4] == b"PAR1":
+        return ".parquet"
+    if name and spec_format(name) in ("csv", "tsv", "jsonl"):
+        return os.path.splitext(name)[1].lower()
+    if body.lstrip()[:1] == b"{":
+        return None
+    raise HttpError(415, "Không nhận dạng được body (cần .xlsx / .zip / .parquet, ?name= có đuôi .csv / .tsv / .jsonl, "
+                         "hoặc JSON lines)")
+
+
+async def _handle(service: NamingService, method: str, target: str, headers: dict, body: bytes):
+    """-> (status, content_type, bytes)."""
+    url = urlsplit(target)
+    query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+    if url.path == "/health":
+        if method != "GET":
+            raise HttpError(405, "Chỉ hỗ trợ GET")
+        return 200, "application/json", json.dumps(service.health()).encode()
+
+    if url.path == "/metrics":
+        if method != "GET":
+            raise HttpError(405, "Chỉ hỗ trợ GET")
+        if service.metrics is None:
+            raise HttpError(404, "Metrics đang tắt (chạy serve với --metrics)")
+        return 200, "text/plain; version=0.0.4", service.metrics_text().encode()
+
+    if url.path == "/name":
+        if method != "POST":
+            raise HttpError(405, "Chỉ hỗ trợ POST")
+        kv, group = _parse_kv_request(_json_body(body), query.get("group"))
+        r = await service.name_one(kv, group)
+        return 200, "application/json", json.dumps({"group": group, **r}, ensure_ascii=False).encode()
+
+    if url.path == "/name/batch":
+        if method != "POST":
+            raise HttpError(405, "Chỉ hỗ trợ POST")
+        ctype = headers.get("content-type", "").split(";")[0].strip().lower()
+        ext = None
+        if ctype in _BINARY_TYPES:
+            ext = _sniff_upload(body, query.get("name"))
+        elif ctype in _XLSX_TYPES:
+            ext = ".xlsx"
+        elif ctype in _ZIP_TYPES:
+            ext = ".zip"
+        if ext is not None:
+            group = query.get("group")
+            if group not in GROUPS:
+                raise HttpError(400, f"?group= phải là 1 trong {GROUPS}")
+            name = query.get("name") or f"upload{ext}"
+            if spec_format(name) is None and not name.lower().endswith(".zip"):
+                name += ext
+            results = await service.name_files([(name, body)], group)
+        else:
+            # JSON lines: mỗi dòng {"group", "kv", "id"?}; kết quả trả theo đúng thứ tự dòng
+            reqs, ids = [], []
+            for line in body.splitlines():
+                if line.strip():
+                    obj = _json_body(line)
+                    reqs.append(_parse_kv_request(obj, query.get("group")))
+                    ids.append(obj.get("id"))
+            results = await service.name_many(reqs)
+            results = [
+                {**({"id": i} if i is not None else {}), "group": g, **r}
+                for i, (_, g), r in zip(ids, reqs, results)
+            ]
+        lines = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in results)
+        return 200, "application/x-ndjson", lines.encode()
+
+    raise HttpError(404, f"Không có endpoint {url.path}")
+
+
+def _write_response(writer, status: int, ctype: str, payload: bytes, keep_alive: bool, extra: dict = None) -> None:
+    head = [f"HTTP/1.1 {status} {_REASONS.get(status, 'Internal Server Error')}",
+            f"Content-Type: {ctype}; charset=utf-8",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    head += [f"{k}: {v}" for k, v in (extra or {}).items()]
+    writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + payload)
+
+
+def _error_payload(message: str) -> bytes:
+    return json.dumps({"error": message}, ensure_ascii=False).encode()
+
+
+async def _read_head(reader):
+    """-> (request line, headers) hoặc None khi client đóng; dòng dài hơn limit của StreamReader -> HttpError 431."""
+    try:
+        line = await reader.readline()
+        if not line:
+            return None
+        headers = {}
+        while True:
+            h = await reader.readline()
+            if h in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = h.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+    except (asyncio.LimitOverrunError, ValueError):
+        # readline báo dòng quá dài bằng ValueError (readuntil: LimitOverrunError); phần còn lại của dòng vẫn
+        # nằm trong buffer -> trả lỗi rồi đóng connection
+        raise HttpError(431, "Dòng request / header quá dài")
+    return line, headers
+
+
+async def _serve_conn(service: NamingService, reader, writer) -> None:
+    try:
+        while True:
+            try:
+                head = await _read_head(reader)
+            except HttpError as e:
+                _write_response(writer, e.status, "application/json", _error_payload(str(e)), False)
+                await writer.drain()
+                break
+            if head is None:
+                break
+            line, headers = head
+            try:
+                method, target, version = line.decode("latin-1").split()
+            except ValueError:
+                _write_response(writer, 400, "application/json", _error_payload("Request line không hợp lệ"), False)
+                await writer.drain()
+                break
+            conn = headers.get("connection", "").lower()
+            keep_alive = conn != "close" if version == "HTTP/1.1" else conn == "keep-alive"
+
+            extra = {}
+            body = None
+            try:
+                if "chunked" in headers.get("transfer-encoding", "").lower():
+                    raise HttpError(411, "Cần Content-Length (không hỗ trợ chunked)")
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY:
+                    raise HttpError(413, f"Body lớn hơn {MAX_BODY} byte")
+                body = await reader.readexactly(length) if length else b""
+                status, ctype, payload = await _handle(service, method, target, headers, body)
+            except HttpError as e:
+                status, ctype, extra = e.status, "application/json", e.headers
+                payload = _error_payload(str(e))
+                if body is None:
+                    keep_alive = False  # body chưa đọc -> không dùng lại connection được
+            except Exception as e:
+                status, ctype = 500, "application/json"
+                payload = _error_payload(f"{type(e).__name__}: {e}")
+
+            _write_response(writer, status, ctype, payload, keep_alive, extra)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_forever(host: str = "127.0.0.1", port: int = 8080, **service_kw) -> None:
+    service = NamingService(**service_kw)
+    server = await asyncio.start_server(lambda r, w: _serve_conn(service, r, w), host, port, backlog=1024)
+    print(f"🧩 product-name serve: http://{host}:{port} ({service.workers} worker)", file=sys.stderr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
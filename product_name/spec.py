@@ -0,0 +1,227 @@
+# product_name/spec.py
+# Bản ghi gọn cho catalog lớn (100k+ sản phẩm giữ trong bộ nhớ để dedup / diff / xuất file)
+# - ParsedSpec: __slots__, field chuẩn có kiểu (ram_gb: int, panel_size: float, ssd: tuple DriveCapacity...),
+#   chuỗi được intern -> các SKU cùng CPU / OS / màu dùng chung 1 object
+# - SpecTable: lưu theo cột; số trong array.array, chuỗi mã hoá từ điển (list giá trị + array mã)
+# Field có kiểu được đọc lại từ mã segment (16GD5*2, 3C50WHr, 15.6FHD, ...) -> không chạy lại rule
+import re
+import sys
+from array import array
+
+from .core import DriveCapacity, _run_nodes, assemble_name
+
+_R_RAM_CODE = re.compile(r"(\d+)G(D5X|D5|D4)?(?:\*(\d+))?")
+_R_SSD_CODE = re.compile(r"(\d+)([GT])(?:\*(\d+))?")
+_R_DISPLAY_CODE = re.compile(r"(N/A|\d+\.\d)?(.*)")
+_R_BATTERY_CODE = re.compile(r"(\?|\d+)C(\?\?|\d+)WHr")
+
+_intern = sys.intern
+
+
+def _ram_fields(code: str) -> tuple:
+    """'16GD5*2' -> (16, 'D5', 2); mã không chuẩn (giữ nguyên text) -> (None, '', None)."""
+    m = _R_RAM_CODE.fullmatch(code)
+    if not m:
+        return None, "", None
+    return int(m.group(1)), m.group(2) or "", int(m.group(3) or 1)
+
+
+def _ssd_fields(code: str) -> tuple:
+    """'512G*2+1T-SSD' -> (DriveCapacity(512G*2), DriveCapacity(1T*1))."""
+    if not code:
+        return ()
+    caps = []
+    for part in code[:-len("-SSD")].split("+"):
+        m = _R_SSD_CODE.fullmatch(part)
+        if m:
+            caps.append(DriveCapacity(int(m.group(1)), m.group(2), int(m.group(3) or 1)))
+    return tuple(caps)
+
+
+def _display_fields(code: str) -> tuple:
+    """'15.6FHD' -> (15.6, 'FHD'); 'N/AWQXGA' -> (None, 'WQXGA'); '14.0N/A' -> (14.0, '')."""
+    if not code:
+        return None, ""
+    size, res = _R_DISPLAY_CODE.fullmatch(code).groups()
+    return (float(size) if size and size != "N/A" else None), ("" if res == "N/A" else res)
+
+
+def _battery_fields(code: str) -> tuple:
+    """'3C50WHr' -> (3, 50); '?C50WHr' -> (None, 50); 'N/A_Battery' -> (None, None)."""
+    m = _R_BATTERY_CODE.fullmatch(code) if code else None
+    if not m:
+        return None, None
+    cells, whr = m.groups()
+    return (None if cells == "?" else int(cells)), (None if whr == "??" else int(whr))
+
+
+class ParsedSpec:
+    """
+    Kết quả đặt tên 1 specsheet ở dạng gọn thay cho dict: tên + lỗi + field chuẩn có kiểu.
+    Thiếu / không nhận dạng được -> None (số) hoặc "" (chuỗi).
+    """
+
+    __slots__ = (
+        "file", "group", "final_name", "errors",
+        "model", "sales_model", "cpu", "ram_gb", "ddr", "ram_sticks", "ssd",
+        "panel_size", "resolution", "battery_cells", "battery_whr",
+        "wifi", "bt", "os", "warranty", "color",
+    )
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            setattr(self, name, fields.get(name))
+
+    @classmethod
+    def from_outputs(cls, outputs: dict, group: str, final_name: str, errors: list, file: str = "") -> "ParsedSpec":
+        """Từ output các node (core.SEGMENT_NODES) của 1 lần build."""
+        (model, sales_model), _ = outputs["model"]
+        ram = outputs["ram"][0]
+        ssd = outputs["ssd"][0]
+        display = outputs["display"][0]
+        battery = outputs["battery"][0]
+        wireless = outputs["wireless"][0]
+        ram_gb, ddr, ram_sticks = _ram_fields(ram[0]) if ram else (None, "", None)
+        panel_size, resolution = _display_fields(display[0] if display else "")
+        battery_cells, battery_whr = _battery_fields(battery[0] if battery else "")
+        wifi = wireless[0] if wireless and wireless[0].startswith("WF") else ""
+        color = outputs["color"][0][0]
+        return cls(
+            file=_intern(file), group=_intern(group), final_name=final_name,
+            errors=tuple(_intern(e) for e in errors),
+            model=_intern(model), sales_model=_intern(sales_model),
+            cpu=_intern(outputs["cpu"][0][0]),
+            ram_gb=ram_gb, ddr=ddr, ram_sticks=ram_sticks,
+            ssd=_ssd_fields(ssd[0] if ssd else ""),
+            panel_size=panel_size, resolution=_intern(resolution),
+            battery_cells=battery_cells, battery_whr=battery_whr,
+            wifi=wifi, bt="BT" in wireless,
+            os=_intern(outputs["os"][0][0]), warranty=_intern(outputs["warranty"][0][0]),
+            color=_intern(color if color != "N/A_Color" else ""),
+        )
+
+    def as_result(self) -> dict:
+        """Dict như batch.name_specsheet (file, group, final_name, errors) để xuất file / so sánh."""
+        return {"file": self.file, "group": self.group, "final_name": self.final_name,
+                "errors": list(self.errors)}
+
+    def __eq__(self, other):
+        if not isinstance(other, ParsedSpec):
+            return NotImplemented
+        return all(getattr(self, n) == getattr(other, n) for n in self.__slots__ if n != "ssd") and \
+            [(c.size, c.unit, c.qty) for c in self.ssd] == [(c.size, c.unit, c.qty) for c in other.ssd]
+
+    def __repr__(self):
+        return f"ParsedSpec({self.file!r}, {self.final_name!r})"
+
+
+def parse_spec(kv, group: str, file: str = "", timer=None) -> ParsedSpec:
+    """Như build_name_from_kv(kv, group) nhưng trả ParsedSpec thay vì tuple (final_name, errors)."""
+    outputs = _run_nodes(kv, group, None, timer)
+    final_name, errors = assemble_name(outputs, group)
+    if timer is not None:
+        timer.lap("assemble")
+    return ParsedSpec.from_outputs(outputs, group, final_name, errors, file)
+
+
+# =========================
+# SpecTable: lưu theo cột
+# =========================
+_INT_FIELDS = ("ram_gb", "ram_sticks", "battery_cells", "battery_whr")  # array('i'), -1 = None
+_INT_MAX = 2 ** 31 - 1  # số rule đọc được nhưng ngoài int32 ("99999999999GB") -> lưu như None, không raise
+_NAN = float("nan")
+
+
+class _DictColumn:
+    """Cột mã hoá từ điển: mỗi giá trị khác nhau lưu 1 lần, mỗi dòng chỉ là 1 mã 4 byte."""
+
+    __slots__ = ("values", "_index", "codes")
+
+    def __init__(self):
+        self.values = []
+        self._index = {}
+        self.codes = array("I")
+
+    def append(self, v) -> None:
+        code = self._index.get(v)
+        if code is None:
+            code = self._index[v] = len(self.values)
+            self.values.append(v)
+        self.codes.append(code)
+
+    def __getitem__(self, i):
+        return self.values[self.codes[i]]
+
+
+class SpecTable:
+    """
+    Nhiều ParsedSpec lưu theo cột (catalog cả trăm nghìn dòng).
+    - số nguyên: array('i') (-1 = None, số ngoài 0..2^31-1 cũng thành None); panel_size: array('d') (NaN = None);
+      bt: array('b')
+    - chuỗi / lỗi / ssd: _DictColumn (CPU, OS, màu... lặp lại rất nhiều)
+    table[i] dựng lại ParsedSpec; column(name) -> list giá trị của 1 field.
+    """
+
+    __slots__ = ("_cols",)
+
+    def __init__(self, specs=()):
+        self._cols = {}
+        for name in ParsedSpec.__slots__:
+            if name in _INT_FIELDS:
+                self._cols[name] = array("i")
+            elif name == "panel_size":
+                self._cols[name] = array("d")
+            elif name == "bt":
+                self._cols[name] = array("b")
+            else:
+                self._cols[name] = _DictColumn()
+        self.extend(specs)
+
+    def append(self, spec: ParsedSpec) -> None:
+        for name, col in self._cols.items():
+            v = getattr(spec, name)
+            if name in _INT_FIELDS:
+                col.append(v if v is not None and 0 <= v <= _INT_MAX else -1)
+            elif name == "panel_size":
+                col.append(_NAN if v is None else v)
+            elif name == "bt":
+                col.append(bool(v))
+            elif name == "ssd":
+                col.append(tuple((c.size, c.unit, c.qty) for c in v))
+            else:
+                col.append(v)
+
+    def extend(self, specs) -> None:
+        for spec in specs:
+            self.append(spec)
+
+    def __len__(self):
+        return len(self._cols["file"].codes)
+
+    def _value(self, name: str, i: int):
+        v = self._cols[name][i]
+        if name in _INT_FIELDS:
+            return None if v == -1 else v
+        if name == "panel_size":
+            return None if v != v else v
+        if name == "bt":
+            return bool(v)
+        if name == "ssd":
+            return tuple(DriveCapacity(*c) for c in v)
+        return v
+
+    def __getitem__(self, i: int) -> ParsedSpec:
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError(i)
+        return ParsedSpec(**{name: self._value(name, i) for name in self._cols})
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def column(self, name: str) -> list:
+        if name not in self._cols:
+            raise KeyError(f"Không có field: {name}")
+        return [self._value(name, i) for i in range(len(self))]
@@ -0,0 +1,101 @@
+# product_name/timing.py
+# Đo thời gian từng stage của pipeline (đọc file, kv map, từng bước build tên)
+# - StageTimer.lap(name): cộng thời gian từ lần lap trước vào stage 'name' (không phải thụt code vào with)
+# - NULL_TIMER: lap() không làm gì -> gần như 0 chi phí khi không đo
+# - log_timings(): ghi 1 dòng JSON qua logger "product_name.timing"
+# - summarize(): gom nhiều lần đo thành p50/p95/p99 theo stage (batch)
+import json
+import logging
+import math
+import time
+
+logger = logging.getLogger("product_name.timing")
+logger.addHandler(logging.NullHandler())
+
+
+class StageTimer:
+    __slots__ = ("stages", "_last")
+
+    def __init__(self):
+        self.stages = {}  # name -> giây, theo thứ tự gặp
+        self._last = time.perf_counter()
+
+    def reset(self) -> None:
+        """Bắt đầu đếm lại từ bây giờ (bỏ khoảng thời gian trước đó khỏi stage kế tiếp)."""
+        self._last = time.perf_counter()
+
+    def lap(self, name: str) -> None:
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + (now - self._last)
+        self._last = now
+
+    def as_ms(self) -> dict:
+        return {k: round(v * 1000, 3) for k, v in self.stages.items()}
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def reset(self) -> None:
+        pass
+
+    def lap(self, name: str) -> None:
+        pass
+
+
+NULL_TIMER = _NullTimer()
+
+
+def enable_json_log(stream=None, level=logging.INFO) -> None:
+    """Gắn handler in mỗi dòng JSON ra stream (mặc định stderr); gọi nhiều lần không bị nhân đôi."""
+    if any(getattr(h, "_product_name_json", False) for h in logger.handlers):
+        return
+    handler = logging.StreamHandler(stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler._product_name_json = True
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False
+
+
+def log_timings(timings_ms: dict, **fields) -> None:
+    """1 dòng JSON: {"event": "timings", ...fields, "stages_ms": {...}, "total_ms": ...}."""
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    record = {"event": "timings", **fields, "stages_ms": timings_ms,
+              "total_ms": round(sum(timings_ms.values()), 3)}
+    logger.info(json.dumps(record, ensure_ascii=False))
+
+
+def log_summary(summary: dict, **fields) -> None:
+    """1 dòng JSON: {"event": "timings_summary", ...fields, "stages_ms": summarize(...)}."""
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(json.dumps({"event": "timings_summary", **fields, "stages_ms": summary}, ensure_ascii=False))
+
+
+def _percentile(sorted_vals: list, p: float) -> float:
+    """Nearest-rank percentile trên list đã sort."""
+    if not sorted_vals:
+        return 0.0
+    k = max(0, math.ceil(p / 100 * len(sorted_vals)) - 1)
+    return sorted_vals[k]
+
+
+def summarize(timings: list) -> dict:
+    """list {stage: ms} (mỗi sheet 1 dict) -> {stage: {n, mean, p50, p95, p99, max}} theo ms."""
+    by_stage = {}
+    for t in timings:
+        for stage, ms in t.items():
+            by_stage.setdefault(stage, []).append(ms)
+    out = {}
+    for stage, vals in by_stage.items():
+        vals.sort()
+        out[stage] = {
+            "n": len(vals),
+            "mean": round(sum(vals) / len(vals), 3),
+            "p50": _percentile(vals, 50),
+            "p95": _percentile(vals, 95),
+            "p99": _percentile(vals, 99),
+            "max": vals[-1],
+        }
+    return out
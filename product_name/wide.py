@@ -0,0 +1,189 @@
+# product_name/wide.py
+# Specsheet dạng "wide": 1 cột Key + mỗi cột Value là 1 SKU (so sánh 10–40 model cạnh nhau)
+# RAM / PSU / Battery / OS / WF được tính vector hoá (pandas .str) cho mọi SKU cùng lúc,
+# phần còn lại của tên vẫn đi qua build_name_from_kv như specsheet 2 cột.
+import numpy as np
+import pandas as pd
+
+from .core import (
+    _R_BATTERY_CELLS, _R_BATTERY_WH, _R_PSU_N_X_W, _R_PSU_W, _R_PSU_W_X_N, _R_RAM_SIZE,
+    _R_RAM_STICKS, _R_WIFI_5, _R_WIFI_6, SpecIndex, _norm_key, build_name_outputs, segment_fallbacks,
+)
+
+_NULL_TEXT = ["nan", "none", "null", "-"]
+
+
+def _str_series(values) -> pd.Series:
+    """_to_str vector hoá: None/NaN/'nan'/'none'/'null'/'-' -> '', còn lại str().strip()."""
+    s = pd.Series(values, dtype=object)
+    s = s.where(s.notna(), "").astype(str).str.strip()
+    return s.where(~s.str.lower().isin(_NULL_TEXT), "")
+
+
+def _extract(r, s: pd.Series) -> pd.DataFrame:
+    """Series.str.extract bằng pattern đã compile của rule; cộng dồn bộ đếm calls/hits như Rule.search."""
+    out = s.str.extract(r.pattern, expand=True)
+    r.calls += len(s)
+    r.hits += int(out[0].notna().sum())
+    return out
+
+
+def _contains(r, s: pd.Series) -> pd.Series:
+    out = s.str.contains(r.pattern, regex=True)
+    r.calls += len(s)
+    r.hits += int(out.sum())
+    return out
+
+
+def ram_codes(raw: pd.Series) -> pd.Series:
+    """simplify_ram cho cả Series."""
+    t = _str_series(raw).str.upper()
+    size = _extract(_R_RAM_SIZE, t)[0]
+    qty = _extract(_R_RAM_STICKS, t)[0]
+    ddr = np.select(
+        [t.str.contains("LPDDR5X", regex=False), t.str.contains("DDR5", regex=False),
+         t.str.contains("DDR4", regex=False)],
+        ["D5X", "D5", "D4"], "",
+    )
+    result = (
+        (size + "G").fillna("")
+        + ddr
+        + ("*" + qty).where(qty.notna() & (qty != "1"), "")
+    )
+    return result.where(result != "", t)
+
+
+def psu_codes(raw: pd.Series) -> pd.Series:
+    """simplify_psu cho cả Series: 2x180W -> 180W*2, 180W*3, 180W."""
+    t = _str_series(raw).str.upper()
+    m1 = _extract(_R_PSU_N_X_W, t)
+    m2 = _extract(_R_PSU_W_X_N, t)
+    m3 = _extract(_R_PSU_W, t)
+    return pd.Series(
+        np.select(
+            [m1[0].notna(), m2[0].notna(), m3[0].notna()],
+            [m1[1] + "W*" + m1[0], m2[0] + "W*" + m2[1], m3[0] + "W"],
+            "",
+        ),
+        index=t.index,
+    )
+
+
+def battery_codes(raw: pd.Series, group: str) -> list:
+    """simplify_battery cho cả Series -> list (code, errors) theo thứ tự."""
+    t = _str_series(raw)
+    cells = _extract(_R_BATTERY_CELLS, t)[0]
+    wh = _extract(_R_BATTERY_WH, t)[0]
+    wh = (pd.to_numeric(wh).astype("Int64").astype(str) + "WHr").where(wh.notna(), "")
+    cells = cells.fillna("")
+    code = pd.Series(
+        np.select(
+            [(cells != "") & (wh != ""), wh != "", cells != ""],
+            [cells + "C" + wh, "?C" + wh, cells + "C??WHr"],
+            "",
+        ),
+        index=t.index,
+    )
+
+    missing = raw.isna() | (raw.astype(str) == "")
+    out = []
+    for is_missing, c in zip(missing, code):
+        if c:
+            out.append((c, []))
+        elif group == "NB":
+            msg = "Thiếu Battery cho NB" if is_missing else "Không nhận dạng được Battery cho NB"
+            out.append(("N/A_Battery", [msg]))
+        else:
+            out.append(("", []))
+    return out
+
+
+def os_codes(raw: pd.Series) -> pd.Series:
+    """_os_code cho cả Series."""
+    t = _str_series(raw).str.upper()
+    return pd.Series(
+        np.select(
+            [t.str.contains("WINDOWS 11 HOME", regex=False), t.str.contains("WINDOWS 11 PRO", regex=False),
+             t.str.contains("WINDOWS", regex=False)],
+            ["W11H", "W11P", "WIN"], "NOS",
+        ),
+        index=t.index,
+    )
+
+
+def wifi_codes(raw: pd.Series) -> pd.Series:
+    """_wifi_code cho cả Series."""
+    t = _str_series(raw).str.upper()
+    has = lambda sub: t.str.contains(sub, regex=False)  # noqa: E731
+    return pd.Series(
+        np.select(
+            [
+                t == "",
+                has("6E"),
+                _contains(_R_WIFI_6, t) | has("WI-FI 6") | has("WIFI 6"),
+                _contains(_R_WIFI_5, t) | has("WI-FI 5") | has("WIFI 5"),
+                has("WIFI") | has("WI-FI"),
+            ],
+            ["", "WF6E", "WF6", "WF5", "WF"], "",
+        ),
+        index=t.index,
+    )
+
+
+def wide_kv_maps(df: pd.DataFrame) -> list:
+    """
+    DataFrame wide (header=None): cột 0 = Key, cột 1..n = SKU
+    -> list (vị trí cột, kv) cho các cột có dữ liệu; kv giống _kv_map_from_specsheet cho từng cột.
+    """
+    if df.shape[1] < 2:
+        return []
+    keys = [_norm_key(k) for k in df.iloc[:, 0]]
+    out = []
+    for col in range(1, df.shape[1]):
+        values = _str_series(df.iloc[:, col].tolist())
+        kv = {}
+        for k, v in zip(keys, values):
+            if k:
+                kv[k] = v
+        if any(kv.values()):
+            out.append((col, kv))
+    return out
+
+
+def build_names_wide(df: pd.DataFrame, group: str, label: str = "") -> list:
+    """
+    Đặt tên cho mọi SKU của 1 sheet wide -> list dict (file, group, final_name, errors, fallbacks) như batch.
+    file = "<label>:<cột Excel>" (vd. "spec.xlsx:C").
+    """
+    from openpyxl.utils import get_column_letter
+
+    maps = wide_kv_maps(df)
+    if not maps:
+        return []
+    idxs = [SpecIndex(kv) for _, kv in maps]
+
+    def column(field):
+        return pd.Series([idx.get(field) for idx in idxs], dtype=object)
+
+    ram = ram_codes(column("ram"))
+    psu = psu_codes(column("power_supply"))
+    battery = battery_codes(column("battery"), group)
+    os_ = os_codes(column("os"))
+    wf = wifi_codes(column("wireless"))
+
+    results = []
+    for i, ((col, _), idx) in enumerate(zip(maps, idxs)):
+        segments = {"ram": ram[i], "psu": psu[i], "battery": battery[i], "os": os_[i], "wf": wf[i]}
+        try:
+            final_name, errors, outputs = build_name_outputs(idx, group=group, segments=segments)
+            fallbacks = segment_fallbacks(outputs)
+        except Exception as e:
+            final_name, errors, fallbacks = "", [f"{type(e).__name__}: {e}"], []
+        results.append({
+            "file": f"{label}:{get_column_letter(col + 1)}",
+            "group": group,
+            "final_name": final_name,
+            "errors": errors,
+            "fallbacks": fallbacks,
+        })
+    return results
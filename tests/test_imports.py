@@ -0,0 +1,18 @@
+# tests/test_imports.py
+# Đường đặt tên thuần (core, CLI, worker, server) không được nạp thư viện nặng lúc import (xem bench.startup)
+import json
+import subprocess
+import sys
+
+import pytest
+
+HEAVY = ("pandas", "numpy", "openpyxl", "xlsxwriter", "pyarrow", "streamlit")
+
+
+@pytest.mark.parametrize("module", ["product_name", "product_name.core", "product_name.batch", "product_name.cli",
+                                    "product_name.server", "product_name.spec"])
+def test_import_does_not_load_heavy_modules(module):
+    # interpreter mới: trong process pytest các test khác có thể đã nạp pandas
+    code = f"import json, sys, {module}; print(json.dumps(sorted(m for m in {HEAVY!r} if m in sys.modules)))"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert json.loads(out) == []
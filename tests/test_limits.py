@@ -0,0 +1,132 @@
+# tests/test_limits.py
+# Cap độ dài + budget (product_name.limits) với đồng hồ giả: kết quả không phụ thuộc tốc độ máy
+import itertools
+import time
+
+import pytest
+
+from product_name import limits
+from product_name.cache import NameCache, build_name_cached
+from product_name.core import SpecIndex, _value_str, build_name_from_kv, parse_drive_capacities
+
+BASE = [
+    ("Sales Model Name", "X1504VA-NJ1234W"),
+    ("Processor", "Intel® Core™ i5-1335U Processor 1.3 GHz (12M Cache, up to 4.6 GHz, 10 cores)"),
+    ("Memory", "16GB DDR5 5600MHz (2x8GB DIMM)"),
+    ("SSD", "512GB M.2 NVMe™ PCIe® 4.0 SSD"),
+    ("Panel Size", "15.6-inch"),
+    ("Resolution", "FHD (1920 x 1080) 16:9"),
+    ("Battery", "42WHrs, 3S1P, 3-cell Li-ion"),
+    ("Wireless", "Wi-Fi 6E(802.11ax) (Dual band) 2*2 + Bluetooth® 5.3"),
+    ("Operating System", "Windows 11 Home"),
+    ("Base Warranty", "2 years Pick up and Return"),
+    ("Color", "Quiet Blue"),
+]
+
+# (key, value) bất thường: dãy số / khoảng trắng dài, blob, value không phải str
+ADVERSARIAL = [
+    ("Memory", "1" * 100_000),
+    ("SSD", "2 X " * 25_000),
+    ("SSD", "9" * 5_000 + "GB"),
+    ("Processor", "Core" + " " * 100_000 + "x"),
+    ("Battery", "3-cell 50WHrs " + "Thiết kế mỏng nhẹ. " * 5_000),
+    ("Resolution", "1920x" * 20_000),
+    ("Keyboard & Mouse", '"' * 100_000),
+    ("Base Warranty", "pick up " * 12_500),
+    ("Color", "SPACE " * 16_000),
+    ("x" * 100_000, "1"),
+    ("Memory", 16),
+    ("Panel Size", 15.6),
+]
+
+
+def _kv(rows) -> dict:
+    return SpecIndex.from_rows(rows).kv
+
+
+def _with(key, value) -> list:
+    rows = [(k, value if k == key else v) for k, v in BASE]
+    return rows if key in dict(BASE) else rows + [(key, value)]
+
+
+@pytest.fixture(autouse=True)
+def _limits(monkeypatch):
+    # mỗi test tự đặt cap / budget, không rò sang test khác
+    monkeypatch.setattr(limits, "SHEET_BUDGET_MS", 0.0)
+    monkeypatch.setattr(limits, "FIELD_LEN", {})
+
+
+def _clock(monkeypatch, *times):
+    """time.perf_counter giả: trả lần lượt times, sau đó giữ giá trị cuối (deadline() gọi lần đầu)."""
+    ticks = itertools.chain(times, itertools.repeat(times[-1]))
+    monkeypatch.setattr(time, "perf_counter", lambda: next(ticks))
+
+
+def test_budget_off_by_default():
+    assert limits.deadline() is None
+
+
+def test_within_budget_matches_unlimited(monkeypatch):
+    kv = _kv(BASE)
+    expected = build_name_from_kv(kv, "NB")
+    monkeypatch.setattr(limits, "SHEET_BUDGET_MS", 1000.0)
+    _clock(monkeypatch, 0.0, 0.5)  # mọi node kiểm giờ ở 500 ms < 1000 ms
+    assert build_name_from_kv(kv, "NB") == expected
+
+
+def test_over_budget_falls_back_like_missing_fields(monkeypatch):
+    monkeypatch.setattr(limits, "SHEET_BUDGET_MS", 1000.0)
+    _clock(monkeypatch, 0.0, 2.0)  # hết giờ ngay sau node đầu
+    final_name, errors = build_name_from_kv(_kv(BASE), "NB")
+    assert final_name.startswith("MÁY TÍNH XÁCH TAY (NB)")  # model luôn chạy
+    assert "N/A_Battery" in final_name and "NOS" in final_name and "N/A_Color" in final_name
+    assert limits.over_budget(errors)
+    assert any(e.startswith(limits.BUDGET_ERROR) and e.endswith(": battery") for e in errors)
+
+
+def test_over_budget_result_is_not_cached(monkeypatch):
+    monkeypatch.setattr(limits, "SHEET_BUDGET_MS", 1000.0)
+    _clock(monkeypatch, 0.0, 2.0)
+    with NameCache(":memory:") as cache:
+        _, errors = build_name_cached(_kv(BASE), "NB", cache)
+        assert limits.over_budget(errors)
+        assert len(cache) == 0
+
+
+def test_truncation_reports_original_length_and_field():
+    blob = "Windows 11 Home " + "x" * 10_000
+    kv = _kv(_with("Operating System", blob))
+    assert len(kv["operating system"]) == limits.MAX_CELL_LEN  # cắt lúc đọc
+    _, errors = build_name_from_kv(kv, "NB")
+    assert f"Value quá dài ở os: {len(blob)} ký tự, chỉ đọc {limits.DEFAULT_FIELD_LEN} ký tự đầu" in errors
+
+
+def test_truncation_only_flags_the_field_that_was_cut():
+    same = "z" * 600
+    kv = _kv(_with("Operating System", same) + [("Fingerprint", same[:limits.DEFAULT_FIELD_LEN])])
+    _, errors = build_name_from_kv(kv, "NB")
+    assert [e for e in errors if e.startswith("Value quá dài")] == ["Value quá dài ở os: 600 ký tự, chỉ đọc 512 ký tự đầu"]
+
+
+def test_value_str_keeps_short_values_interned():
+    assert _value_str("16GB DDR5") is _value_str("16GB " + "DDR5")
+
+
+def test_drive_digit_run_past_int_limit_is_skipped(monkeypatch):
+    # field cap lớn hơn giới hạn 4300 chữ số của int(): dãy số dài không thành token, không ValueError
+    monkeypatch.setattr(limits, "FIELD_LEN", {"ssd": 10_000})
+    caps = parse_drive_capacities("9" * 5000 + "GB SSD + 512GB SSD")
+    assert [repr(c) for c in caps] == ["DriveCapacity(512G*1)"]
+    final_name, _ = build_name_from_kv(_kv(_with("SSD", "9" * 5000 + "GB")), "NB")
+    assert final_name
+
+
+@pytest.mark.parametrize("budget_ms", [0.0, 1000.0])
+@pytest.mark.parametrize("clock", [(0.0, 0.0), (0.0, 2.0)], ids=["in-time", "late"])
+@pytest.mark.parametrize("key,value", ADVERSARIAL, ids=lambda x: repr(x)[:20])
+def test_adversarial_inputs_never_raise(monkeypatch, key, value, budget_ms, clock):
+    monkeypatch.setattr(limits, "SHEET_BUDGET_MS", budget_ms)
+    _clock(monkeypatch, *clock)
+    final_name, errors = build_name_from_kv(_kv(_with(key, value)), "NB")
+    assert isinstance(final_name, str) and final_name
+    assert all(isinstance(e, str) for e in errors)